@@ -1,6 +1,25 @@
-from arcadia_pycolor import colors, cvd, gradients, mpl, palettes, plot, style_defaults
+from arcadia_pycolor import (
+    bivariate,
+    color_assigner,
+    color_index,
+    colors,
+    colorspace,
+    cvd,
+    export_cache,
+    gradients,
+    mpl,
+    multichannel,
+    norms,
+    palettes,
+    plot,
+    sketch,
+    style_defaults,
+    tile_pyramid,
+    uniformity,
+)
 from arcadia_pycolor import plotly_utils as plotly
 
+from .bivariate import BivariateGradient
 from .colors import *
 from .gradient import Gradient
 from .hexcode import HexCode
@@ -10,16 +29,27 @@ from .palette import Palette
 __version__ = "0.0.0"
 
 __all__ = [
+    "bivariate",
+    "BivariateGradient",
+    "color_assigner",
+    "color_index",
+    "colorspace",
     "cvd",
+    "export_cache",
     "Gradient",
     "gradients",
     "HexCode",
     "mpl",
+    "multichannel",
+    "norms",
     "Palette",
     "palettes",
     "plot",
     "plotly",
+    "sketch",
     "style_defaults",
+    "tile_pyramid",
+    "uniformity",
 ]
 
 colors_all = [name for name in dir(colors) if isinstance(getattr(colors, name), HexCode)]
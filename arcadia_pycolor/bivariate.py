@@ -0,0 +1,401 @@
+from __future__ import annotations
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+import plotly.graph_objects as go
+from matplotlib.axes import Axes
+from numpy.typing import ArrayLike, NDArray
+
+from arcadia_pycolor import colorspace
+from arcadia_pycolor.gradient import (
+    BAD_COLOR,
+    DEFAULT_CHUNK_ELEMENTS,
+    INTERPOLATION_MODES,
+    Gradient,
+)
+from arcadia_pycolor.hexcode import HexCode
+from arcadia_pycolor.norms import LinearNorm, Norm
+from arcadia_pycolor.utils import iter_chunk_slices
+
+# The default number of colors along each axis of the lookup table of a bivariate gradient.
+DEFAULT_SIZE = 64
+
+
+def _to_lookup_table(rgb1: NDArray[np.float64], bad: HexCode | None) -> NDArray[np.uint8]:
+    """Returns the flattened (N * M + 1, 4) RGBA table of a grid of colors and the bad color."""
+    num_colors = rgb1.shape[0] * rgb1.shape[1]
+    lookup_table = np.empty((num_colors + 1, 4), dtype=np.uint8)
+    lookup_table[:num_colors, :3] = np.round(rgb1.reshape(-1, 3) * 255)
+    lookup_table[:num_colors, 3] = 255
+    bad_rgba = BAD_COLOR if bad is None else np.round(np.array(mcolors.to_rgba(bad)) * 255)
+    lookup_table[num_colors] = bad_rgba
+    return lookup_table
+
+
+class BivariateGradient:
+    """A two-dimensional colormap that maps pairs of values to colors.
+
+    The colors are precomputed in a perceptually uniform color space on a grid of N by M
+    positions, where the first axis corresponds to the first (x) values and the second axis
+    to the second (y) values. Pairs of values are mapped by normalizing each value to a
+    position from 0 to 1 and picking the color of the grid cell, so mapping is a single
+    vectorized gather. Values outside of the range are clipped to it, and pairs with a NaN
+    or masked value are assigned the `bad` color.
+
+    Example:
+    >>> import arcadia_pycolor as apc
+    >>> bivariate = apc.BivariateGradient.from_gradients(
+    ...     "expression_confidence", apc.gradients.blues.reverse(), apc.gradients.reds.reverse()
+    ... )
+    >>> rgba = bivariate.map_arrays(expression, confidence)
+
+    Attributes:
+        name (str): The name of the bivariate gradient.
+        colors (NDArray): The (N, M, 3) grid of sRGB values in [0, 1].
+        bad (HexCode or None): The color of NaN and masked values, if not transparent.
+    """
+
+    def __init__(self, name: str, colors: ArrayLike, bad: HexCode | None = None):
+        """Initializes a BivariateGradient from a grid of colors.
+
+        Most bivariate gradients are built with `from_gradients` or `from_corners`.
+
+        Args:
+            name: The name of the bivariate gradient.
+            colors: An (N, M, 3) array of sRGB values in [0, 1].
+            bad: An optional HexCode for pairs with a NaN or masked value.
+
+        Raises:
+            ValueError: If `colors` does not have shape (N, M, 3) with N and M of at least 2,
+                or if `bad` is not a HexCode.
+        """
+        colors = np.asarray(colors, dtype=np.float64)
+        if colors.ndim != 3 or colors.shape[2] != 3 or min(colors.shape[:2]) < 2:
+            raise ValueError(
+                f"colors must be an array of shape (N, M, 3) with N, M >= 2, got {colors.shape}."
+            )
+        if not isinstance(bad, HexCode | None):
+            raise ValueError("The bad color must be a HexCode object.")
+
+        self.name = name
+        self.colors = np.clip(colors, 0, 1)
+        self.bad = bad
+        self._lookup_table = _to_lookup_table(self.colors, bad)
+
+    @classmethod
+    def from_gradients(
+        cls,
+        name: str,
+        x_gradient: Gradient,
+        y_gradient: Gradient,
+        shape: tuple[int, int] = (DEFAULT_SIZE, DEFAULT_SIZE),
+        bad: HexCode | None = None,
+    ) -> BivariateGradient:
+        """Creates a bivariate gradient that combines two gradients.
+
+        The gradients are combined in CAM02-UCS so that the colors along the first row and
+        column match the gradients: the changes in hue and chroma along the two gradients
+        are added, and the relative changes in lightness are multiplied. The gradients
+        should start from the same light color, so Arcadia's sequential gradients, which
+        end with their lightest color, are reversed first.
+
+        Example:
+        >>> bivariate = apc.BivariateGradient.from_gradients(
+        ...     "blue_red", apc.gradients.blues.reverse(), apc.gradients.reds.reverse()
+        ... )
+
+        Args:
+            name: The name of the bivariate gradient.
+            x_gradient: The gradient of the first values.
+            y_gradient: The gradient of the second values.
+            shape: The number of colors along each axis.
+            bad: An optional HexCode for pairs with a NaN or masked value.
+        """
+        num_x, num_y = shape
+        x_cam02ucs = colorspace.rgb1_to_cam02ucs(x_gradient.sample(np.linspace(0, 1, num_x)))
+        y_cam02ucs = colorspace.rgb1_to_cam02ucs(y_gradient.sample(np.linspace(0, 1, num_y)))
+        x_cam02ucs = x_cam02ucs[:, np.newaxis]
+        y_cam02ucs = y_cam02ucs[np.newaxis, :]
+        # If the gradients start from different colors, they share the midpoint of the two.
+        start = (x_cam02ucs[0, 0] + y_cam02ucs[0, 0]) / 2
+
+        cam02ucs = x_cam02ucs + y_cam02ucs - start
+        start_lightness = max(start[0], 1e-6)
+        cam02ucs[..., 0] = np.clip(
+            x_cam02ucs[..., 0] * y_cam02ucs[..., 0] / start_lightness, 0, 100
+        )
+        return cls(name, colorspace.cam02ucs_to_rgb1(cam02ucs), bad=bad)
+
+    @classmethod
+    def from_corners(
+        cls,
+        name: str,
+        corners: Sequence[HexCode],
+        shape: tuple[int, int] = (DEFAULT_SIZE, DEFAULT_SIZE),
+        interpolation: str = "cam02ucs",
+        bad: HexCode | None = None,
+    ) -> BivariateGradient:
+        """Creates a bivariate gradient that interpolates bilinearly between four colors.
+
+        Args:
+            name: The name of the bivariate gradient.
+            corners: The colors of the pairs (low x, low y), (high x, low y), (low x, high y),
+                and (high x, high y), in that order.
+            shape: The number of colors along each axis.
+            interpolation: The color space in which to interpolate colors:
+                'srgb', 'cam02ucs', or 'oklab'.
+            bad: An optional HexCode for pairs with a NaN or masked value.
+
+        Raises:
+            ValueError: If there are not four HexCode corners or `interpolation` is invalid.
+        """
+        if len(corners) != 4 or not all(isinstance(color, HexCode) for color in corners):
+            raise ValueError("corners must be a sequence of four HexCode objects.")
+        if interpolation not in INTERPOLATION_MODES:
+            raise ValueError(
+                f"Invalid interpolation '{interpolation}'. "
+                f"Choose from {', '.join(INTERPOLATION_MODES)}."
+            )
+
+        to_space, from_space = {
+            "srgb": (np.asarray, np.asarray),
+            "cam02ucs": (colorspace.rgb1_to_cam02ucs, colorspace.cam02ucs_to_rgb1),
+            "oklab": (colorspace.rgb1_to_oklab, colorspace.oklab_to_rgb1),
+        }[interpolation]
+        low_low, high_low, low_high, high_high = to_space(
+            mcolors.to_rgba_array([color.hex_code for color in corners])[:, :3]
+        )
+
+        num_x, num_y = shape
+        x = np.linspace(0, 1, num_x)[:, np.newaxis, np.newaxis]
+        y = np.linspace(0, 1, num_y)[np.newaxis, :, np.newaxis]
+        coordinates = (
+            (1 - x) * (1 - y) * low_low
+            + x * (1 - y) * high_low
+            + (1 - x) * y * low_high
+            + x * y * high_high
+        )
+        return cls(name, from_space(coordinates), bad=bad)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Returns the number of colors along each axis."""
+        return self.colors.shape[0], self.colors.shape[1]
+
+    def lookup_table(self) -> NDArray[np.uint8]:
+        """Returns the (N, M, 4) grid of 8-bit RGBA colors."""
+        return self._lookup_table[:-1].reshape(*self.shape, 4)
+
+    def _map_chunk(
+        self,
+        x_values: ArrayLike,
+        y_values: ArrayLike,
+        x_norm: Norm,
+        y_norm: Norm,
+        out: NDArray | None = None,
+    ) -> NDArray[np.uint8]:
+        """Maps pairs of values to RGBA colors with one gather from the flattened table."""
+        num_x, num_y = self.shape
+
+        def to_indices(values: ArrayLike, norm: Norm, num_colors: int) -> NDArray[np.intp]:
+            mask = np.ma.getmask(values)
+            positions = np.atleast_1d(norm(np.ma.getdata(values)))
+            if mask is not np.ma.nomask:
+                np.copyto(positions, np.nan, where=np.reshape(mask, positions.shape))
+            positions *= num_colors
+            np.clip(positions, 0, num_colors - 1, out=positions)
+            with np.errstate(invalid="ignore"):
+                # NaN positions are cast to arbitrary indices, which are replaced by the caller.
+                indices = positions.astype(np.intp)
+            indices[np.isnan(positions)] = -1
+            return indices
+
+        x_indices = to_indices(x_values, x_norm, num_x)
+        y_indices = to_indices(y_values, y_norm, num_y)
+        is_bad = (x_indices < 0) | (y_indices < 0)
+
+        indices = x_indices
+        indices *= num_y
+        indices += y_indices
+        # The bad color follows the grid colors in the flattened table.
+        np.copyto(indices, num_x * num_y, where=is_bad)
+        colors = np.take(self._lookup_table, indices, axis=0)
+        colors = colors.reshape(*np.shape(x_values), 4)
+        if out is not None:
+            out[...] = colors
+            return out
+        return colors
+
+    def map_arrays(
+        self,
+        x_values: Any,
+        y_values: Any,
+        x_norm: Norm | None = None,
+        y_norm: Norm | None = None,
+        out: NDArray[np.uint8] | None = None,
+        chunk_size: int | None = None,
+        workers: int = 1,
+    ) -> NDArray[np.uint8]:
+        """Maps two equally shaped arrays of values to 8-bit RGBA colors.
+
+        Like `Gradient.map_array`, the values are processed in chunks along the first axis,
+        so the arrays and `out` can be memmaps larger than memory. If a norm has no range,
+        the range of the finite values is computed in a first pass over the chunks.
+
+        Args:
+            x_values: The first values, which may be a masked array.
+            y_values: The second values, which may be a masked array.
+            x_norm (Norm, optional): A norm from `arcadia_pycolor.norms` that maps the first
+                values to positions from 0 to 1. If None, a `LinearNorm` over their range.
+            y_norm (Norm, optional): A norm that maps the second values to positions.
+                If None, a `LinearNorm` over their range.
+            out (NDArray, optional): A uint8 array of shape `x_values.shape + (4,)` to write into.
+            chunk_size (int, optional): The number of items along the first axis mapped at once.
+                If None, chunks of about one million values are used.
+            workers (int): The number of threads that map chunks in parallel.
+
+        Returns:
+            NDArray: The RGBA colors, with shape `x_values.shape + (4,)`. Pairs in which
+                either value is NaN or masked are assigned the bad color.
+
+        Raises:
+            ValueError: If the arrays have different shapes, if a range is invalid,
+                or if `out` has the wrong shape.
+        """
+        if not hasattr(x_values, "shape") or not hasattr(x_values, "__getitem__"):
+            x_values = np.asarray(x_values)
+        if not hasattr(y_values, "shape") or not hasattr(y_values, "__getitem__"):
+            y_values = np.asarray(y_values)
+        shape = tuple(x_values.shape)
+        if tuple(y_values.shape) != shape:
+            raise ValueError(
+                f"x_values and y_values must have the same shape, "
+                f"got {shape} and {tuple(y_values.shape)}."
+            )
+
+        if out is None:
+            out = np.empty((*shape, 4), dtype=np.uint8)
+        elif tuple(out.shape) != (*shape, 4) or out.dtype != np.uint8:
+            raise ValueError(
+                f"out must be a uint8 array of shape {(*shape, 4)}, got {out.dtype} {out.shape}."
+            )
+
+        x_norm = LinearNorm() if x_norm is None else x_norm
+        y_norm = LinearNorm() if y_norm is None else y_norm
+        if not shape:
+            x_norm.autoscale(x_values, x_values)
+            y_norm.autoscale(y_values, y_values)
+            x_norm.validate()
+            y_norm.validate()
+            out[...] = self._map_chunk(x_values, y_values, x_norm, y_norm)
+            return out
+
+        if chunk_size is None:
+            row_size = int(np.prod(shape[1:]))
+            chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // max(row_size, 1))
+        chunk_slices = list(iter_chunk_slices(shape[0], chunk_size))
+
+        for values, norm in ((x_values, x_norm), (y_values, y_norm)):
+            if not norm.scaled:
+                norm.autoscale_chunks(values[rows] for rows in chunk_slices)
+            norm.validate()
+
+        def map_rows(rows: slice) -> None:
+            self._map_chunk(x_values[rows], y_values[rows], x_norm, y_norm, out=out[rows])
+
+        if workers == 1:
+            for rows in chunk_slices:
+                map_rows(rows)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(map_rows, chunk_slices):
+                    pass
+        return out
+
+    def plot_mpl_legend(
+        self,
+        ax: Axes | None = None,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_range: tuple[float, float] = (0, 1),
+        y_range: tuple[float, float] = (0, 1),
+    ) -> Axes:
+        """Draws the bivariate gradient as a square legend on matplotlib axes.
+
+        Example:
+        >>> fig, ax = plt.subplots()
+        >>> ax.imshow(bivariate.map_arrays(expression, confidence))
+        >>> legend_ax = ax.inset_axes((1.05, 0, 0.3, 0.3))
+        >>> bivariate.plot_mpl_legend(legend_ax, "Expression", "Confidence")
+
+        Args:
+            ax (Axes, optional): The axes to draw on, such as an inset. If None, the current axes.
+            x_label (str, optional): The label of the x axis, for the first values.
+            y_label (str, optional): The label of the y axis, for the second values.
+            x_range (tuple[float, float]): The range of the first values shown on the x axis.
+            y_range (tuple[float, float]): The range of the second values shown on the y axis.
+
+        Returns:
+            Axes: The axes.
+        """
+        ax = plt.gca() if ax is None else ax
+        # Images are indexed by row (y) and then column (x).
+        ax.imshow(
+            self.lookup_table().transpose(1, 0, 2),
+            origin="lower",
+            extent=(*x_range, *y_range),
+            aspect="auto",
+            interpolation="nearest",
+        )
+        if x_label is not None:
+            ax.set_xlabel(x_label)
+        if y_label is not None:
+            ax.set_ylabel(y_label)
+        return ax
+
+    def to_plotly_legend(
+        self,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_range: tuple[float, float] = (0, 1),
+        y_range: tuple[float, float] = (0, 1),
+        size: int = 200,
+    ) -> go.Figure:
+        """Converts the bivariate gradient to a square plotly legend figure.
+
+        The figure holds a single `go.Image` trace, which can also be added to a subplot
+        with `fig.add_trace(legend.data[0], row=..., col=...)`. Its y axis must not be
+        reversed, which plotly does by default for images.
+
+        Args:
+            x_label (str, optional): The title of the x axis, for the first values.
+            y_label (str, optional): The title of the y axis, for the second values.
+            x_range (tuple[float, float]): The range of the first values shown on the x axis.
+            y_range (tuple[float, float]): The range of the second values shown on the y axis.
+            size (int): The width and height of the figure in pixels.
+        """
+        num_x, num_y = self.shape
+        dx = (x_range[1] - x_range[0]) / num_x
+        dy = (y_range[1] - y_range[0]) / num_y
+        image = go.Image(
+            # Images are indexed by row (y) and then column (x).
+            z=self.lookup_table().transpose(1, 0, 2),
+            colormodel="rgba",
+            x0=x_range[0] + dx / 2,
+            dx=dx,
+            y0=y_range[0] + dy / 2,
+            dy=dy,
+            hoverinfo="skip",
+        )
+        fig = go.Figure(image)
+        fig.update_layout(width=size, height=size, margin=dict(l=0, r=0, t=0, b=0))
+        fig.update_xaxes(title_text=x_label)
+        fig.update_yaxes(title_text=y_label, autorange=True)
+        return fig
+
+    def __repr__(self) -> str:
+        return f"BivariateGradient(name={self.name!r}, shape={self.shape})"
@@ -0,0 +1,393 @@
+"""The `arcadia-pycolor` command-line interface.
+
+Restyles stored figures and exports them using Arcadia's figure sizes and export settings.
+Plotly figures are read from JSON files (as written by `fig.write_json`) and matplotlib figures
+are read from pickles (as written by `pickle.dump(fig, file)`).
+"""
+
+import argparse
+import glob
+import pickle
+import statistics
+import sys
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, cast
+
+import matplotlib
+from matplotlib.backend_bases import FigureCanvasBase
+
+from arcadia_pycolor.plotly_utils import VALID_FILETYPES as PLOTLY_FILETYPES
+from arcadia_pycolor.style_defaults import FIGURE_SIZES_IN_INCHES, FigureSize
+
+PLOTLY_SUFFIXES = (".json",)
+MPL_SUFFIXES = (".pkl", ".pickle")
+SUPPORTED_SUFFIXES = PLOTLY_SUFFIXES + MPL_SUFFIXES
+
+# The formats that figures can be exported to. HTML export is only supported for Plotly.
+PLOTLY_FORMATS = (*PLOTLY_FILETYPES, "html")
+MPL_FORMATS = tuple(FigureCanvasBase.get_supported_filetypes())
+SUPPORTED_FORMATS = tuple(sorted(set(PLOTLY_FORMATS) | set(MPL_FORMATS)))
+
+MplAxisSelector = Literal["x", "y", "both", "all"]
+
+
+@dataclass
+class ExportJob:
+    """A single figure file to restyle and export.
+
+    Attributes:
+        source (Path): The path to the stored figure.
+        outputs (list[Path]): The paths of the files to export, one per format.
+        size (FigureSize): The Arcadia figure size to export at.
+        context (str): The export context for matplotlib figures, either 'web' or 'print'.
+        monospaced_axes (str, optional): Passed through to `style_plot`.
+        categorical_axes (str, optional): Passed through to `style_plot`.
+    """
+
+    source: Path
+    outputs: list[Path]
+    size: FigureSize
+    context: Literal["web", "print"] = "web"
+    monospaced_axes: str | None = None
+    categorical_axes: str | None = None
+
+
+@dataclass
+class ExportResult:
+    """The outcome of an `ExportJob`.
+
+    Attributes:
+        source (Path): The path to the stored figure.
+        status (str): One of 'exported', 'skipped', or 'failed'.
+        seconds (float): The wall time spent loading, styling, and exporting the figure.
+        error (str, optional): The error message if the export failed.
+    """
+
+    source: Path
+    status: Literal["exported", "skipped", "failed"]
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class ExportSummary:
+    """Throughput and latency statistics for a batch of exports."""
+
+    results: list[ExportResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(result.status == status for result in self.results)
+
+    def format(self) -> str:
+        """Returns a human-readable summary of the batch."""
+        num_exported = self.count("exported")
+        throughput = num_exported / self.wall_seconds if self.wall_seconds > 0 else 0.0
+        lines = [
+            f"Exported {num_exported} figure(s), skipped {self.count('skipped')} up-to-date, "
+            f"{self.count('failed')} failed in {self.wall_seconds:.2f} s "
+            f"({throughput:.2f} figures/s)."
+        ]
+
+        latencies = sorted(result.seconds for result in self.results if result.status != "skipped")
+        if latencies:
+            p95_index = min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))
+            lines.append(
+                f"Latency per figure: mean {statistics.mean(latencies):.2f} s, "
+                f"p50 {statistics.median(latencies):.2f} s, "
+                f"p95 {latencies[p95_index]:.2f} s, max {latencies[-1]:.2f} s."
+            )
+        return "\n".join(lines)
+
+
+def _find_figure_files(patterns: Sequence[str]) -> list[Path]:
+    """Expands directories and glob patterns into a sorted list of supported figure files."""
+    filepaths: set[Path] = set()
+    for pattern in patterns:
+        if Path(pattern).is_dir():
+            candidates = [path for path in Path(pattern).iterdir() if path.is_file()]
+        else:
+            candidates = [Path(path) for path in glob.glob(pattern, recursive=True)]
+        filepaths.update(path for path in candidates if path.suffix in SUPPORTED_SUFFIXES)
+    return sorted(filepaths)
+
+
+def _supported_formats(source: Path, formats: Sequence[str]) -> list[str]:
+    """Returns the formats that a figure file can be exported to."""
+    valid_formats = PLOTLY_FORMATS if source.suffix in PLOTLY_SUFFIXES else MPL_FORMATS
+    return [fmt for fmt in formats if fmt in valid_formats]
+
+
+def _validate_jobs(jobs: Sequence[ExportJob]) -> None:
+    """Raises a ValueError if a job has no outputs or if two jobs would write the same file."""
+    sources_by_output: dict[Path, Path] = {}
+    for job in jobs:
+        if not job.outputs:
+            raise ValueError(f"{job.source} has no supported formats to export to.")
+        for output in job.outputs:
+            other_source = sources_by_output.setdefault(output.resolve(), job.source)
+            if other_source != job.source:
+                raise ValueError(
+                    f"{other_source} and {job.source} would both be exported to {output}. "
+                    "Rename one of them or export them to separate output directories."
+                )
+
+
+def _is_up_to_date(job: ExportJob) -> bool:
+    """Returns True if every output exists and is newer than the source figure."""
+    source_mtime = job.source.stat().st_mtime
+    return all(
+        output.is_file() and output.stat().st_mtime >= source_mtime for output in job.outputs
+    )
+
+
+def _initialize_worker() -> None:
+    """Loads the Arcadia styles into matplotlib and Plotly in each worker process."""
+    import arcadia_pycolor as apc
+
+    # Exports never need an interactive backend. This is set in each worker, since workers
+    # that are spawned rather than forked (as on macOS and Windows) don't inherit it.
+    matplotlib.use("Agg")
+
+    apc.mpl.setup()
+    apc.plotly.setup()
+
+
+def _export_plotly_figure(job: ExportJob) -> None:
+    import plotly.io as pio
+
+    import arcadia_pycolor as apc
+
+    fig = pio.read_json(job.source)
+    apc.plotly.style_plot(
+        fig,
+        monospaced_axes=cast(apc.plotly.AxisSelector | None, job.monospaced_axes),
+        categorical_axes=cast(apc.plotly.AxisSelector | None, job.categorical_axes),
+    )
+    apc.plotly.set_figure_dimensions(fig, job.size)
+
+    image_outputs = [output for output in job.outputs if output.suffix != ".html"]
+    for output in job.outputs:
+        if output.suffix == ".html":
+            apc.plotly.export_to_html(fig, str(output))
+    if image_outputs:
+        apc.plotly.save_figure(
+            fig,
+            str(image_outputs[0]),
+            job.size,
+            filetypes=[output.suffix[1:] for output in image_outputs],
+        )
+
+
+def _export_mpl_figure(job: ExportJob) -> None:
+    import matplotlib.pyplot as plt
+
+    import arcadia_pycolor as apc
+
+    with open(job.source, "rb") as file:
+        fig = pickle.load(file)
+
+    try:
+        for ax in fig.axes:
+            apc.mpl.style_plot(
+                ax,
+                monospaced_axes=cast(MplAxisSelector | None, job.monospaced_axes),
+                categorical_axes=cast(MplAxisSelector | None, job.categorical_axes),
+            )
+        fig.set_size_inches(apc.mpl.get_figure_dimensions(job.size))
+        apc.mpl.save_figure(
+            str(job.outputs[0]),
+            job.size,
+            filetypes=[output.suffix[1:] for output in job.outputs],
+            context=job.context,
+            figure=fig,
+        )
+    finally:
+        plt.close(fig)
+
+
+def _run_job(job: ExportJob) -> ExportResult:
+    """Loads, restyles, and exports a single figure, capturing any error."""
+    start = time.perf_counter()
+    try:
+        if job.source.suffix in PLOTLY_SUFFIXES:
+            _export_plotly_figure(job)
+        else:
+            _export_mpl_figure(job)
+    except Exception as error:
+        return ExportResult(
+            job.source, "failed", time.perf_counter() - start, f"{type(error).__name__}: {error}"
+        )
+    return ExportResult(job.source, "exported", time.perf_counter() - start)
+
+
+def export_figures(jobs: list[ExportJob], workers: int = 1, force: bool = False) -> ExportSummary:
+    """Exports a batch of figures, skipping those whose outputs are already up to date.
+
+    Args:
+        jobs (list[ExportJob]): The figures to export.
+        workers (int): The number of worker processes. If 1, figures are exported in-process.
+        force (bool): Whether to re-export figures whose outputs are already up to date.
+
+    Returns:
+        ExportSummary: The result of every job along with the total wall time.
+
+    Raises:
+        ValueError: If a job has no outputs or if two jobs would export to the same file.
+    """
+    _validate_jobs(jobs)
+    start = time.perf_counter()
+
+    summary = ExportSummary()
+    pending: list[ExportJob] = []
+    for job in jobs:
+        if not force and _is_up_to_date(job):
+            summary.results.append(ExportResult(job.source, "skipped"))
+        else:
+            pending.append(job)
+
+    for job in pending:
+        for output in job.outputs:
+            output.parent.mkdir(parents=True, exist_ok=True)
+
+    if workers == 1:
+        _initialize_worker()
+        summary.results.extend(_run_job(job) for job in pending)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker) as executor:
+            summary.results.extend(executor.map(_run_job, pending))
+
+    summary.wall_seconds = time.perf_counter() - start
+    return summary
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="arcadia-pycolor",
+        description=(
+            "Restyle and export stored Plotly (.json) and matplotlib (.pkl, .pickle) figures "
+            "using Arcadia's style guide. Only unpickle matplotlib figures from trusted sources."
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Figure files, directories containing figure files, or glob patterns.",
+    )
+    parser.add_argument(
+        "--size",
+        required=True,
+        choices=list(FIGURE_SIZES_IN_INCHES),
+        help="The Arcadia figure size to export at.",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=["png"],
+        type=lambda value: value.lstrip("."),
+        choices=SUPPORTED_FORMATS,
+        metavar="FORMAT",
+        help=(
+            "The file formats to export (default: png). Matplotlib figures accept "
+            f"{', '.join(MPL_FORMATS)}; Plotly figures accept {', '.join(PLOTLY_FORMATS)}."
+        ),
+    )
+    parser.add_argument(
+        "--context",
+        choices=["web", "print"],
+        default="web",
+        help="The export context for matplotlib figures (default: web).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="The directory to write exports to (default: next to each input file).",
+    )
+    parser.add_argument(
+        "--monospaced-axes",
+        default=None,
+        help="Which axes to set to the monospaced font (passed to `style_plot`).",
+    )
+    parser.add_argument(
+        "--categorical-axes",
+        default=None,
+        help="Which axes to set to categorical (passed to `style_plot`).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="The number of worker processes to export with (default: 1).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-export figures even if their outputs are newer than the input file.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Runs the `arcadia-pycolor` command-line interface and returns the exit code."""
+    args = _build_parser().parse_args(argv)
+
+    # Exports never need an interactive backend.
+    matplotlib.use("Agg")
+
+    if args.workers < 1:
+        print("error: --workers must be at least 1.", file=sys.stderr)
+        return 2
+
+    figure_files = _find_figure_files(args.inputs)
+    if not figure_files:
+        print("error: no figure files found.", file=sys.stderr)
+        return 2
+
+    formats = args.formats
+    jobs: list[ExportJob] = []
+    for source in figure_files:
+        supported_formats = _supported_formats(source, formats)
+        unsupported_formats = [fmt for fmt in formats if fmt not in supported_formats]
+        if unsupported_formats:
+            is_plotly = source.suffix in PLOTLY_SUFFIXES
+            print(
+                f"warning: cannot export {source} to {', '.join(unsupported_formats)}; "
+                f"{'Plotly' if is_plotly else 'matplotlib'} figures can be exported to "
+                f"{', '.join(PLOTLY_FORMATS if is_plotly else MPL_FORMATS)}.",
+                file=sys.stderr,
+            )
+        jobs.append(
+            ExportJob(
+                source=source,
+                outputs=[
+                    (args.output_dir or source.parent) / f"{source.stem}.{fmt}"
+                    for fmt in supported_formats
+                ],
+                size=cast(FigureSize, args.size),
+                context=args.context,
+                monospaced_axes=args.monospaced_axes,
+                categorical_axes=args.categorical_axes,
+            )
+        )
+
+    try:
+        summary = export_figures(jobs, workers=args.workers, force=args.force)
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+
+    for result in summary.results:
+        if result.status == "failed":
+            print(f"Failed to export {result.source}: {result.error}", file=sys.stderr)
+    print(summary.format())
+
+    return 1 if summary.count("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+import arcadia_pycolor.palettes
+from arcadia_pycolor.hexcode import HexCode
+from arcadia_pycolor.palette import Palette
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # File locking is not available on Windows.
+    fcntl = None  # type: ignore
+
+# The version of the format of the JSON store.
+STORE_VERSION = 1
+
+
+def _hash_label(label: str) -> int:
+    """Returns a stable 64-bit hash of a label, which unlike `hash` is the same in every process."""
+    return int.from_bytes(hashlib.blake2b(label.encode(), digest_size=8).digest(), "big")
+
+
+@contextmanager
+def _locked(filepath: Path) -> Iterator[None]:
+    """Holds an exclusive lock on a sidecar lock file of `filepath`, if locking is available."""
+    if fcntl is None:
+        yield
+        return
+
+    with open(filepath.with_name(f"{filepath.name}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_store(store_path: Path) -> dict[str, HexCode]:
+    """Returns the assignments in a store. The caller must hold the store lock."""
+    if not store_path.is_file() or store_path.stat().st_size == 0:
+        return {}
+
+    contents = json.loads(store_path.read_text())
+    return {
+        label: HexCode(color["name"], color["hex_code"])
+        for label, color in contents["assignments"].items()
+    }
+
+
+def _write_store(store_path: Path, assignments: dict[str, HexCode]) -> None:
+    """Atomically writes assignments to a store. The caller must hold the store lock."""
+    contents = {
+        "version": STORE_VERSION,
+        "assignments": {
+            label: {"name": color.name, "hex_code": color.hex_code}
+            for label, color in assignments.items()
+        },
+    }
+    # Write to a temporary file first so that readers never see a partially written store.
+    tmp_path = store_path.with_name(f"{store_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(contents, indent=2, sort_keys=True))
+    os.replace(tmp_path, store_path)
+
+
+class ColorAssigner:
+    """Assigns palette colors to labels deterministically and consistently across figures.
+
+    Each new label is assigned the palette color at a position derived from a hash of the
+    label. If that color is already assigned to another label, the next unassigned color is
+    used instead, until every color of the palette is in use. Once a label has a color,
+    it keeps it.
+
+    Assignments are kept in memory and, if `store_path` is given, in a JSON file that can be
+    shared by several processes (such as parallel export workers). New labels are assigned
+    while holding a lock on the store, so every process sees the same assignments.
+
+    Example:
+    >>> import arcadia_pycolor as apc
+    >>> assigner = apc.color_assigner.ColorAssigner(store_path="report_colors.json")
+    >>> assigner["condition A"]
+    >>> colors = assigner.assign_many(df["condition"])
+
+    Attributes:
+        palette (Palette): The palette colors are assigned from.
+        store_path (Path or None): The path of the JSON store, if any.
+    """
+
+    def __init__(self, palette: Palette | None = None, store_path: str | Path | None = None):
+        """Initializes a ColorAssigner, loading any existing assignments from the store.
+
+        Args:
+            palette (Palette, optional): The palette to assign colors from.
+                If None, `palettes.primary` is used.
+            store_path (str or Path, optional): The path of a JSON file in which to persist
+                the assignments. It is created if it doesn't exist.
+
+        Raises:
+            ValueError: If the palette is empty.
+        """
+        self.palette = arcadia_pycolor.palettes.primary if palette is None else palette
+        if len(self.palette) == 0:
+            raise ValueError("Cannot assign colors from an empty palette.")
+
+        self.store_path = None if store_path is None else Path(store_path)
+        self._assignments: dict[str, HexCode] = {}
+        self._lock = threading.Lock()
+        if self.store_path is not None and self.store_path.is_file():
+            with self._lock, _locked(self.store_path):
+                self._assignments.update(_read_store(self.store_path))
+
+    @property
+    def assignments(self) -> dict[str, HexCode]:
+        """Returns a copy of the current label-to-color assignments."""
+        return dict(self._assignments)
+
+    def __len__(self) -> int:
+        """Returns the number of labels with an assigned color."""
+        return len(self._assignments)
+
+    def __contains__(self, label: object) -> bool:
+        """Returns whether the label has an assigned color."""
+        return str(label) in self._assignments
+
+    def __getitem__(self, label: Any) -> HexCode:
+        """Returns the color of a label, assigning one if necessary."""
+        return self.assign(label)
+
+    def _assign_new(self, labels: Iterable[str]) -> None:
+        """Assigns colors to labels without one. The caller must hold `self._lock`."""
+        used = {color.hex_code.lower() for color in self._assignments.values()}
+        num_colors = len(self.palette)
+        for label in labels:
+            if label in self._assignments:
+                continue
+
+            start = _hash_label(label) % num_colors
+            index = start
+            for offset in range(num_colors):
+                candidate = (start + offset) % num_colors
+                if self.palette[candidate].hex_code.lower() not in used:
+                    index = candidate
+                    break
+
+            color = self.palette[index]
+            self._assignments[label] = color
+            used.add(color.hex_code.lower())
+
+    def _ensure_assigned(self, labels: list[str]) -> None:
+        """Assigns colors to any labels without one, synchronizing with the store if any."""
+        with self._lock:
+            missing = [label for label in labels if label not in self._assignments]
+            if not missing:
+                return
+
+            if self.store_path is None:
+                self._assign_new(missing)
+                return
+
+            with _locked(self.store_path):
+                # Other processes may have assigned colors since the store was last read.
+                self._assignments.update(_read_store(self.store_path))
+                self._assign_new(missing)
+                _write_store(self.store_path, self._assignments)
+
+    def assign(self, label: Any) -> HexCode:
+        """Returns the color of a label, assigning one if necessary.
+
+        Args:
+            label: The label. Non-string labels are converted with `str`.
+        """
+        label = str(label)
+        self._ensure_assigned([label])
+        return self._assignments[label]
+
+    def assign_many(self, labels: ArrayLike) -> NDArray[np.object_]:
+        """Returns the colors of many labels, assigning colors to new labels in one batch.
+
+        The labels are deduplicated with `np.unique`, so assigning colors to millions of
+        labels with few distinct values is fast. New labels are assigned in sorted order.
+
+        Args:
+            labels (ArrayLike): The labels, such as a list or a pandas Series.
+                Non-string labels are converted with `str`.
+
+        Returns:
+            NDArray: An object array of HexCodes with the same shape as `labels`.
+        """
+        labels = np.asarray(labels)
+        unique_labels, inverse = np.unique(labels, return_inverse=True)
+        unique_keys = [str(label) for label in unique_labels.tolist()]
+        self._ensure_assigned(unique_keys)
+
+        unique_colors = np.empty(len(unique_keys), dtype=object)
+        unique_colors[:] = [self._assignments[key] for key in unique_keys]
+        return unique_colors[inverse.reshape(labels.shape)]
@@ -0,0 +1,475 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+import arcadia_pycolor.palettes
+from arcadia_pycolor.colorspace import (
+    is_color_string_sequence,
+    pack_rgb255,
+    rgb255_to_cam02ucs,
+    to_rgb255,
+    to_uint8,
+    unpack_rgb255,
+)
+from arcadia_pycolor.palette import Palette
+
+# The number of unique colors compared against the palette at once, to bound memory use.
+QUERY_CHUNK_SIZE = 16384
+
+# The number of color indexes kept in memory by `get_color_index`.
+COLOR_INDEX_CACHE_SIZE = 32
+
+# The number of bits per channel of the coarse RGB lookup table used to quantize images.
+# With 6 bits, the table has 64**3 cells and each cell covers 4 levels per channel.
+LOOKUP_TABLE_BITS = 6
+
+# The number of mixed cells of the lookup table whose colors are compared at once.
+RESOLVE_CHUNK_CELLS = 1024
+
+# The number of image rows quantized at once by each worker.
+DEFAULT_TILE_ROWS = 256
+
+
+def _bayer_matrix(size: int) -> NDArray[np.float64]:
+    """Returns a (size, size) Bayer matrix of ordered-dithering thresholds in [-0.5, 0.5)."""
+    indices = np.zeros((1, 1), dtype=np.intp)
+    while len(indices) < size:
+        indices = np.block([[4 * indices, 4 * indices + 2], [4 * indices + 3, 4 * indices + 1]])
+    return (indices + 0.5) / indices.size - 0.5
+
+
+# The thresholds for ordered dithering, which repeat every 8 pixels in each direction.
+BAYER_MATRIX = _bayer_matrix(8)
+
+# The amplitude of the ordered dithering, in 8-bit RGB levels.
+DITHER_AMPLITUDE = 32
+
+
+class ColorIndex:
+    """An index for finding the colors of a palette nearest to arbitrary colors.
+
+    Distances are Euclidean distances in CAM02-UCS, so they approximate perceptual
+    differences (delta E). Queries are vectorized: the query colors are quantized to 8 bits
+    per channel and deduplicated, and each unique color is compared against every palette
+    color in chunks. Palettes are small, so this is faster than a spatial tree.
+
+    Use `get_color_index` to reuse the index of a palette across calls.
+
+    Attributes:
+        palette (Palette): The palette whose colors are indexed.
+        cam02ucs (NDArray): The CAM02-UCS coordinates of the palette colors, with shape (N, 3).
+    """
+
+    def __init__(self, palette: Palette):
+        """Initializes a ColorIndex.
+
+        Args:
+            palette (Palette): The palette whose colors to index.
+
+        Raises:
+            ValueError: If the palette is empty.
+        """
+        if len(palette) == 0:
+            raise ValueError("Cannot index an empty palette.")
+
+        self.palette = palette
+        self.cam02ucs = rgb255_to_cam02ucs(to_rgb255([color.hex_code for color in palette]))
+        self._squared_norms = (self.cam02ucs**2).sum(axis=1)
+        self._pairwise_distances = np.linalg.norm(
+            self.cam02ucs[:, np.newaxis] - self.cam02ucs, axis=-1
+        )
+        self._colors = np.empty(len(palette), dtype=object)
+        self._colors[:] = palette.colors
+        self._rgb255 = to_rgb255([color.hex_code for color in palette])
+        self._lookup_table: tuple[NDArray, NDArray] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of indexed colors."""
+        return len(self.palette)
+
+    def query(
+        self, colors: str | Sequence[str] | ArrayLike, k: int = 1
+    ) -> tuple[NDArray[np.float64], NDArray[np.intp]]:
+        """Finds the `k` palette colors nearest to each color.
+
+        Args:
+            colors: The colors to query, in any form accepted by `colorspace.to_rgb255`:
+                a color string, a sequence of color strings, or an array of RGB values
+                with shape (..., 3).
+            k (int): The number of nearest palette colors to return for each color.
+
+        Returns:
+            A tuple of the distances and the indices of the nearest palette colors, sorted
+            from nearest to farthest. Both arrays have the shape of `colors` without the last
+            dimension, followed by a dimension of size `k` if `k` is greater than 1.
+
+        Raises:
+            ValueError: If `k` is not between 1 and the number of palette colors.
+        """
+        if not 1 <= k <= len(self):
+            raise ValueError(f"k must be between 1 and {len(self)}, got {k}.")
+
+        rgb = to_rgb255(colors)
+        packed = pack_rgb255(rgb).ravel()
+        unique_packed, inverse = np.unique(packed, return_inverse=True)
+
+        distances = np.empty((len(unique_packed), k), dtype=np.float64)
+        indices = np.empty((len(unique_packed), k), dtype=np.intp)
+        for start in range(0, len(unique_packed), QUERY_CHUNK_SIZE):
+            chunk = slice(start, start + QUERY_CHUNK_SIZE)
+            distances[chunk], indices[chunk] = self._query_unique(
+                rgb255_to_cam02ucs(unpack_rgb255(unique_packed[chunk])), k
+            )
+
+        shape = rgb.shape[:-1] if k == 1 else (*rgb.shape[:-1], k)
+        inverse = inverse.ravel()
+        return distances[inverse].reshape(shape), indices[inverse].reshape(shape)
+
+    def _query_unique(
+        self, cam02ucs: NDArray[np.float64], k: int
+    ) -> tuple[NDArray[np.float64], NDArray[np.intp]]:
+        """Returns the sorted distances and indices of the `k` nearest palette colors."""
+        # The squared distances, up to the squared norm of each query color.
+        partial_distances = self._squared_norms - 2 * cam02ucs @ self.cam02ucs.T
+        if k == 1:
+            indices = np.argmin(partial_distances, axis=1)[:, np.newaxis]
+        elif k < len(self):
+            indices = np.argpartition(partial_distances, k - 1, axis=1)[:, :k]
+        else:
+            indices = np.broadcast_to(np.arange(len(self)), partial_distances.shape)
+
+        # Recompute the selected distances exactly to avoid cancellation errors.
+        distances = np.linalg.norm(cam02ucs[:, np.newaxis] - self.cam02ucs[indices], axis=2)
+        order = np.argsort(distances, axis=1, kind="stable")
+        return (
+            np.take_along_axis(distances, order, axis=1),
+            np.take_along_axis(indices, order, axis=1),
+        )
+
+    def lookup_table(self) -> tuple[NDArray[np.intp], NDArray[np.uint8] | NDArray[np.uint16]]:
+        """Returns a two-level lookup table of the nearest palette color of every RGB color.
+
+        The first level has shape (64, 64, 64) and is indexed by the most significant
+        `LOOKUP_TABLE_BITS` bits of each RGB channel. Each of its cells holds the number of a
+        block in the second level, which has shape (num_blocks, 4, 4, 4) and is indexed by
+        the remaining bits. The table is exact: the entry of every 8-bit RGB color is the
+        index of its nearest palette color.
+
+        Most cells are entirely nearer to one palette color than to any other, which is
+        the case if no plane that bisects the nearest palette color at the center of the cell
+        and another palette color passes within the radius of the cell in CAM02-UCS.
+        Such cells share a constant block, so only the cells that straddle a boundary between
+        palette colors are computed color by color. `quantize_image` computes those blocks
+        as pixels need them; this method computes all of them, once per index.
+        """
+        cell_blocks, blocks = self._lookup_tables()
+        self._resolve_blocks(np.flatnonzero(~self._is_resolved))
+        return cell_blocks, blocks
+
+    def _lookup_tables(self) -> tuple[NDArray[np.intp], NDArray[np.uint8] | NDArray[np.uint16]]:
+        """Returns the two levels of the lookup table, whose mixed blocks may not be computed.
+
+        Blocks whose `_is_resolved` flag is False must be computed with `_resolve_blocks`
+        before they are read.
+        """
+        with self._lock:
+            if self._lookup_table is None:
+                self._lookup_table = self._build_lookup_table()
+        return self._lookup_table
+
+    def _bisector_distances(
+        self, cam02ucs: NDArray[np.float64]
+    ) -> tuple[NDArray[np.intp], NDArray[np.float64]]:
+        """Returns the nearest palette color of each color and the distances from each color
+        to the planes that bisect its nearest palette color and each other palette color.
+
+        The nearest palette color of every point within a ball around a color is the same
+        as that of the color if the radius of the ball is smaller than all of these distances.
+        The distance to the plane of the nearest palette color itself is infinite.
+        """
+        # The squared distances, up to the squared norm of each color, which cancels out.
+        partial_distances = self._squared_norms - 2 * cam02ucs @ self.cam02ucs.T
+        nearest = np.argmin(partial_distances, axis=1)
+        rows = np.arange(len(cam02ucs))
+        gaps = partial_distances - partial_distances[rows, nearest][:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plane_distances = gaps / (2 * self._pairwise_distances[nearest])
+        # Duplicates of the nearest palette color have a later index, so they are never nearest.
+        plane_distances[np.isnan(plane_distances)] = np.inf
+        plane_distances[rows, nearest] = np.inf
+        return nearest, plane_distances
+
+    def _build_lookup_table(
+        self,
+    ) -> tuple[NDArray[np.intp], NDArray[np.uint8] | NDArray[np.uint16]]:
+        """Computes the first level of the lookup table and allocates the second level."""
+        num_cells = 1 << LOOKUP_TABLE_BITS
+        cell_size = 1 << (8 - LOOKUP_TABLE_BITS)
+
+        # The CAM02-UCS coordinates of the centers of the cells, and the radius of each cell:
+        # the largest distance from its center to its corners, including the corners at the
+        # first levels of the next cells, which bounds the distance to any color in it.
+        center_levels = (np.arange(num_cells) * cell_size + cell_size // 2).astype(np.uint8)
+        centers = rgb255_to_cam02ucs(_rgb_grid(center_levels))
+        corner_levels = np.minimum(np.arange(num_cells + 1) * cell_size, 255).astype(np.uint8)
+        corners = rgb255_to_cam02ucs(_rgb_grid(corner_levels))
+        radii = np.zeros((num_cells,) * 3, dtype=np.float64)
+        for offsets in np.ndindex(2, 2, 2):
+            corner = corners[tuple(slice(offset, offset + num_cells) for offset in offsets)]
+            np.maximum(radii, np.linalg.norm(corner - centers, axis=-1), out=radii)
+        centers, radii = centers.reshape(-1, 3), radii.ravel()
+
+        nearest = np.empty(len(centers), dtype=np.intp)
+        is_mixed = np.empty(len(centers), dtype=bool)
+        for start in range(0, len(centers), QUERY_CHUNK_SIZE):
+            chunk = slice(start, start + QUERY_CHUNK_SIZE)
+            nearest[chunk], plane_distances = self._bisector_distances(centers[chunk])
+            is_mixed[chunk] = plane_distances.min(axis=1) <= radii[chunk]
+
+        # Blocks 0 to N - 1 are filled with palette colors 0 to N - 1,
+        # and each mixed cell gets its own block.
+        num_mixed = int(is_mixed.sum())
+        cell_blocks = nearest
+        cell_blocks[is_mixed] = np.arange(len(self), len(self) + num_mixed)
+        dtype = np.uint8 if len(self) <= 256 else np.uint16
+        blocks = np.empty((len(self) + num_mixed,) + (cell_size,) * 3, dtype=dtype)
+        blocks[: len(self)] = np.arange(len(self)).reshape(-1, 1, 1, 1)
+
+        self._is_resolved = np.arange(len(blocks)) < len(self)
+        self._mixed_cells = np.argwhere(is_mixed.reshape((num_cells,) * 3))
+        self._mixed_centers = centers[is_mixed]
+        self._mixed_radii = radii[is_mixed]
+        return cell_blocks.reshape((num_cells,) * 3), blocks
+
+    def _resolve_blocks(self, block_numbers: NDArray[np.intp]) -> None:
+        """Computes the blocks of mixed cells that have not been computed yet.
+
+        Only the palette colors whose bisector planes with the nearest palette color at the
+        center of a cell pass through the cell can be the nearest to any of its colors,
+        so the colors of each cell are only compared with those.
+        """
+        _, blocks = self._lookup_tables()
+        cell_size = blocks.shape[1]
+        offsets = np.stack(np.meshgrid(*(np.arange(cell_size),) * 3, indexing="ij"), axis=-1)
+
+        with self._lock:
+            block_numbers = block_numbers[~self._is_resolved[block_numbers]]
+            for start in range(0, len(block_numbers), RESOLVE_CHUNK_CELLS):
+                chunk = block_numbers[start : start + RESOLVE_CHUNK_CELLS]
+                mixed = chunk - len(self)
+                rgb = self._mixed_cells[mixed, np.newaxis] * cell_size + offsets.reshape(-1, 3)
+                cam02ucs = rgb255_to_cam02ucs(rgb.astype(np.uint8))
+
+                nearest, plane_distances = self._bisector_distances(self._mixed_centers[mixed])
+                is_candidate = plane_distances <= self._mixed_radii[mixed, np.newaxis]
+                is_candidate[np.arange(len(chunk)), nearest] = True
+                # Sort the candidates by index so that ties go to the first palette color.
+                num_candidates = int(is_candidate.sum(axis=1).max())
+                candidates = np.sort(
+                    np.argsort(~is_candidate, axis=1, kind="stable")[:, :num_candidates], axis=1
+                )
+                differences = cam02ucs[:, :, np.newaxis] - self.cam02ucs[candidates][:, np.newaxis]
+                distances = np.einsum("...i,...i->...", differences, differences)
+                is_valid = np.take_along_axis(is_candidate, candidates, axis=1)
+                distances[~np.broadcast_to(is_valid[:, np.newaxis], distances.shape)] = np.inf
+                nearest = np.take_along_axis(candidates, distances.argmin(axis=2), axis=1)
+
+                blocks[chunk] = nearest.reshape(blocks[chunk].shape)
+                self._is_resolved[chunk] = True
+
+    def snap(self, colors: str | Sequence[str] | ArrayLike, k: int = 1) -> Any:
+        """Returns the palette colors nearest to each color.
+
+        Args:
+            colors: The colors to snap; see `query`.
+            k (int): The number of nearest palette colors to return for each color.
+
+        Returns:
+            For a single color string, the nearest HexCode (or a list of the `k` nearest).
+            For a sequence of color strings, a list with one such result per color.
+            For an array of RGB values, an object array of HexCodes with the shape
+            returned by `query`.
+        """
+        _, indices = self.query(colors, k=k)
+        snapped = self._colors[indices]
+        if isinstance(colors, str) or is_color_string_sequence(colors):
+            # Indexing with a scalar index returns the HexCode itself.
+            return snapped.tolist() if isinstance(snapped, np.ndarray) else snapped
+        return snapped
+
+
+# The most recently used color indexes, keyed by the names and HEX codes of the palette colors.
+_color_index_cache: OrderedDict[tuple[tuple[str, str], ...], ColorIndex] = OrderedDict()
+
+
+def get_color_index(palette: Palette | None = None) -> ColorIndex:
+    """Returns the color index of a palette, reusing a cached index if possible.
+
+    Indexes are cached by the names and HEX codes of the palette colors,
+    so a palette that is modified after indexing gets a new index.
+
+    Args:
+        palette (Palette, optional): The palette to index. If None, all of the Arcadia colors.
+    """
+    palette = arcadia_pycolor.palettes.all_colors if palette is None else palette
+    key = tuple((color.name, color.hex_code) for color in palette)
+    if key in _color_index_cache:
+        _color_index_cache.move_to_end(key)
+    else:
+        _color_index_cache[key] = ColorIndex(palette)
+        if len(_color_index_cache) > COLOR_INDEX_CACHE_SIZE:
+            _color_index_cache.popitem(last=False)
+    return _color_index_cache[key]
+
+
+def nearest(
+    colors: str | Sequence[str] | ArrayLike, k: int = 1, palette: Palette | None = None
+) -> Any:
+    """Returns the palette colors perceptually nearest to each color.
+
+    Example:
+    >>> import arcadia_pycolor as apc
+    >>> apc.color_index.nearest("#5088c4")
+    aegean #5088C5
+    >>> apc.color_index.nearest(image_rgb).shape  # An (H, W, 3) uint8 array.
+    (H, W)
+
+    Args:
+        colors: A color string (e.g., a HEX code), a sequence of color strings,
+            or an array of RGB values with shape (..., 3). Integer arrays are interpreted
+            as values in [0, 255] and floating-point arrays as values in [0, 1].
+        k (int): The number of nearest palette colors to return for each color.
+        palette (Palette, optional): The palette to snap to. If None, all of the Arcadia colors.
+
+    Returns:
+        See `ColorIndex.snap`.
+    """
+    return get_color_index(palette).snap(colors, k=k)
+
+
+def _rgb_grid(levels: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Returns the (L, L, L, 3) grid of RGB colors whose channels take the given levels."""
+    return np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+
+
+def _quantize_tile(
+    image: NDArray,
+    out: NDArray[np.uint8],
+    rows: slice,
+    index: ColorIndex,
+    dither: bool,
+) -> None:
+    """Quantizes the rows `rows` of `image` and writes them to the same rows of `out`."""
+    tile = np.asarray(image[rows])
+    rgb = to_rgb255(tile)
+
+    if dither:
+        offsets = np.round(BAYER_MATRIX * DITHER_AMPLITUDE).astype(np.int16)
+        row_indices = np.arange(rows.start, rows.start + len(tile)) % len(offsets)
+        col_indices = np.arange(tile.shape[1]) % len(offsets)
+        offsets = offsets[np.ix_(row_indices, col_indices)][..., np.newaxis]
+        rgb = np.clip(rgb + offsets, 0, 255).astype(np.uint8)
+
+    # Indexing the flattened tables with packed keys is much faster than 3D fancy indexing.
+    shift = 8 - LOOKUP_TABLE_BITS
+    low_bits = (1 << shift) - 1
+    cell_blocks, blocks = index._lookup_tables()
+    keys = (rgb[..., 0].astype(np.intp) >> shift) << (2 * LOOKUP_TABLE_BITS)
+    keys |= (rgb[..., 1].astype(np.intp) >> shift) << LOOKUP_TABLE_BITS
+    keys |= rgb[..., 2] >> shift
+    block_numbers = np.take(cell_blocks.ravel(), keys)
+    unresolved = block_numbers[~index._is_resolved[block_numbers]]
+    if unresolved.size:
+        index._resolve_blocks(np.unique(unresolved))
+
+    keys = block_numbers << (3 * shift)
+    keys |= (rgb[..., 0].astype(np.intp) & low_bits) << (2 * shift)
+    keys |= (rgb[..., 1].astype(np.intp) & low_bits) << shift
+    keys |= rgb[..., 2] & low_bits
+    indices = np.take(blocks.ravel(), keys)
+    out[rows, :, :3] = np.take(index._rgb255, indices, axis=0)
+    if tile.shape[-1] == 4:
+        out[rows, :, 3] = to_uint8(tile[..., 3])
+
+
+def quantize_image(
+    image: ArrayLike,
+    palette: Palette | None = None,
+    dither: bool = False,
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    workers: int | None = None,
+    out: NDArray[np.uint8] | None = None,
+) -> NDArray[np.uint8]:
+    """Recolors an image so that every pixel is the perceptually nearest palette color.
+
+    Pixels are mapped through a precomputed, exact lookup table over RGB space (see
+    `ColorIndex.lookup_table`), so the cost per pixel does not depend on the palette size.
+    The image is processed in tiles of rows on a thread pool, and only one tile per worker
+    is held in memory at a time. Passing a `numpy.memmap` as `image` and `out` therefore
+    allows quantizing images that do not fit in memory.
+
+    Example:
+    >>> import numpy as np
+    >>> import arcadia_pycolor as apc
+    >>> image = np.load("overlay.npy", mmap_mode="r")
+    >>> out = np.lib.format.open_memmap("overlay_arcadia.npy", "w+", np.uint8, image.shape)
+    >>> apc.palettes.primary.quantize_image(image, out=out)
+
+    Args:
+        image (ArrayLike): An (H, W, 3) RGB or (H, W, 4) RGBA image. Integer images are
+            interpreted as values in [0, 255] and floating-point images as values in [0, 1].
+        palette (Palette, optional): The palette to quantize to.
+            If None, all of the Arcadia colors are used.
+        dither (bool): Whether to apply ordered (Bayer) dithering, which approximates
+            intermediate colors with patterns of palette colors.
+        tile_rows (int): The number of rows processed at once by each worker.
+        workers (int, optional): The number of threads. If None, the number of CPUs is used.
+        out (NDArray, optional): A uint8 array with the same shape as `image` to write into.
+
+    Returns:
+        NDArray: The quantized image as a uint8 array with the same shape as `image`.
+            The alpha channel, if any, is preserved.
+
+    Raises:
+        ValueError: If the image or `out` have an invalid shape, or `tile_rows` or `workers`
+            are not positive.
+    """
+    if not isinstance(image, np.ndarray):
+        image = np.asarray(image)
+    if image.ndim != 3 or image.shape[-1] not in (3, 4):
+        raise ValueError(f"Expected an (H, W, 3) or (H, W, 4) image, got {image.shape}.")
+    if tile_rows < 1:
+        raise ValueError("tile_rows must be positive.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be positive.")
+
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    elif out.shape != image.shape or out.dtype != np.uint8:
+        raise ValueError(
+            f"out must be a uint8 array of shape {image.shape}, got {out.dtype} {out.shape}."
+        )
+
+    index = get_color_index(palette)
+    # Build the lookup table before starting the workers so that it is only computed once.
+    index._lookup_tables()
+
+    tiles = [slice(start, start + tile_rows) for start in range(0, len(image), tile_rows)]
+    if workers == 1 or len(tiles) == 1:
+        for rows in tiles:
+            _quantize_tile(image, out, rows, index, dither)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_quantize_tile, image, out, rows, index, dither) for rows in tiles
+            ]
+            for future in futures:
+                future.result()
+    return out
@@ -0,0 +1,294 @@
+import warnings
+from collections.abc import Sequence
+from typing import Any, cast
+
+import matplotlib.colors as mcolors
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+with warnings.catch_warnings():
+    warnings.filterwarnings("ignore", category=SyntaxWarning, module="colorspacious")
+    from colorspacious import cspace_convert  # type: ignore
+
+# The number of colors converted at once, to bound the memory used by colorspacious.
+CONVERSION_CHUNK_SIZE = 1 << 18
+
+CVD_TYPES = {"d": "deuteranomaly", "p": "protanomaly", "t": "tritanomaly"}
+
+# The metrics supported by `pairwise_distances`.
+DISTANCE_METRICS = ("cam02ucs", "ciede2000")
+
+
+def is_color_string_sequence(colors: object) -> bool:
+    """Checks if `colors` is a non-empty list or tuple of color strings (e.g., HEX codes)."""
+    return (
+        isinstance(colors, Sequence)
+        and not isinstance(colors, str)
+        and len(colors) > 0
+        and all(isinstance(color, str) for color in colors)
+    )
+
+
+def to_rgb255(colors: str | Sequence[str] | ArrayLike) -> NDArray[np.uint8]:
+    """Returns colors as an array of 8-bit sRGB values.
+
+    Args:
+        colors: A color string (e.g., a HEX code or a HexCode), a sequence of color strings,
+            or an array of RGB or RGBA values with shape (..., 3) or (..., 4).
+            Integer arrays are interpreted as values in [0, 255] and floating-point arrays
+            as values in [0, 1]. Alpha channels are ignored.
+
+    Returns:
+        An array of shape (..., 3) and dtype uint8. A single color string or a sequence of
+        color strings yields an array of shape (3,) or (N, 3), respectively.
+
+    Raises:
+        ValueError: If the colors cannot be interpreted as RGB values.
+    """
+    if isinstance(colors, str) or is_color_string_sequence(colors):
+        rgb = np.round(mcolors.to_rgba_array(colors)[:, :3] * 255).astype(np.uint8)
+        return rgb[0] if isinstance(colors, str) else rgb
+
+    array = np.asarray(colors)
+    if array.ndim == 0 or array.shape[-1] not in (3, 4):
+        raise ValueError(f"Expected RGB or RGBA values with shape (..., 3), got {array.shape}.")
+
+    return to_uint8(array[..., :3])
+
+
+def to_uint8(array: NDArray) -> NDArray[np.uint8]:
+    """Returns color channel values as 8-bit values.
+
+    Integer arrays are interpreted as values in [0, 255] and floating-point arrays
+    as values in [0, 1]. Values outside of these ranges are clipped.
+
+    Raises:
+        ValueError: If the array does not have an integer or floating-point dtype.
+    """
+    if array.dtype == np.uint8:
+        return array
+    if np.issubdtype(array.dtype, np.integer):
+        return np.clip(array, 0, 255).astype(np.uint8)
+    if np.issubdtype(array.dtype, np.floating):
+        return np.round(np.clip(array, 0, 1) * 255).astype(np.uint8)
+    raise ValueError(f"Unsupported dtype for color values: {array.dtype}.")
+
+
+def pack_rgb255(rgb: NDArray[np.uint8]) -> NDArray[np.uint32]:
+    """Packs an array of 8-bit RGB values with shape (..., 3) into one uint32 per color."""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_rgb255(packed: NDArray[np.uint32]) -> NDArray[np.uint8]:
+    """Inverts `pack_rgb255`."""
+    return np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1).astype(
+        np.uint8
+    )
+
+
+def create_cvd_space(cvd_type: str, severity: float = 100) -> dict[str, Any]:
+    """Creates a dictionary for colorspacious to simulate color vision deficiency.
+
+    Args:
+        cvd_type (str): The type of color vision deficiency to simulate.
+            Either 'd' for deuteranomaly, 'p' for protanomaly, or 't' for tritanomaly.
+        severity (float): The severity of the color vision deficiency, from 0 to 100.
+
+    Raises:
+        ValueError: If `cvd_type` is invalid.
+    """
+    if cvd_type not in CVD_TYPES:
+        raise ValueError(
+            "Choose 'd' for deuteranomaly, 'p' for protanomaly, and 't' for tritanomaly."
+        )
+
+    clipped_severity = np.clip(severity, 0, 100)
+    return {"name": "sRGB1+CVD", "cvd_type": CVD_TYPES[cvd_type], "severity": clipped_severity}
+
+
+def _convert(colors: NDArray, start: Any, end: Any) -> NDArray[np.float64]:
+    """Converts colors with shape (..., 3) between color spaces in chunks to bound memory use."""
+    colors = np.asarray(colors, dtype=np.float64)
+    flat_colors = colors.reshape(-1, 3)
+    converted = np.empty(flat_colors.shape, dtype=np.float64)
+    for chunk_start in range(0, len(flat_colors), CONVERSION_CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + CONVERSION_CHUNK_SIZE)
+        converted[chunk] = cast(NDArray[np.float64], cspace_convert(flat_colors[chunk], start, end))
+    return converted.reshape(colors.shape)
+
+
+def simulate_cvd(rgb1: NDArray, cvd_type: str, severity: float = 100) -> NDArray[np.float64]:
+    """Simulates color vision deficiency on sRGB values in [0, 1] with shape (..., 3).
+
+    Args:
+        rgb1 (NDArray): The sRGB values.
+        cvd_type (str): The type of color vision deficiency to simulate.
+            Either 'd' for deuteranomaly, 'p' for protanomaly, or 't' for tritanomaly.
+        severity (float): The severity of the color vision deficiency, from 0 to 100.
+
+    Returns:
+        NDArray: The simulated sRGB values, clipped to [0, 1].
+    """
+    cvd_space = create_cvd_space(cvd_type, severity)
+    return np.clip(_convert(rgb1, cvd_space, "sRGB1"), 0, 1)
+
+
+def rgb1_to_cam02ucs(rgb1: NDArray) -> NDArray[np.float64]:
+    """Converts sRGB values in [0, 1] with shape (..., 3) to CAM02-UCS coordinates."""
+    return _convert(rgb1, "sRGB1", "CAM02-UCS")
+
+
+def rgb255_to_cam02ucs(rgb: NDArray[np.uint8]) -> NDArray[np.float64]:
+    """Converts 8-bit sRGB values with shape (..., 3) to CAM02-UCS coordinates."""
+    return rgb1_to_cam02ucs(np.asarray(rgb) / 255)
+
+
+def cam02ucs_to_rgb1(cam02ucs: NDArray) -> NDArray[np.float64]:
+    """Converts CAM02-UCS coordinates with shape (..., 3) to sRGB values, clipped to [0, 1]."""
+    return np.clip(_convert(cam02ucs, "CAM02-UCS", "sRGB1"), 0, 1)
+
+
+def _srgb1_to_linear(rgb1: NDArray) -> NDArray[np.float64]:
+    """Removes the sRGB transfer function (gamma) from sRGB values in [0, 1]."""
+    rgb1 = np.asarray(rgb1, dtype=np.float64)
+    return np.where(rgb1 <= 0.04045, rgb1 / 12.92, ((rgb1 + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb1(linear: NDArray) -> NDArray[np.float64]:
+    """Applies the sRGB transfer function to linear RGB values, clipping them to [0, 1]."""
+    linear = np.clip(linear, 0, 1)
+    return np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+# The matrices of the Oklab color space, from https://bottosson.github.io/posts/oklab/.
+_LINEAR_SRGB_TO_LMS = np.array(
+    [
+        [0.4122214708, 0.5363325363, 0.0514459929],
+        [0.2119034982, 0.6806995451, 0.1073969566],
+        [0.0883024619, 0.2817188376, 0.6299787005],
+    ]
+)
+_LMS_TO_OKLAB = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+_OKLAB_TO_LMS = np.array(
+    [
+        [1.0, 0.3963377774, 0.2158037573],
+        [1.0, -0.1055613458, -0.0638541728],
+        [1.0, -0.0894841775, -1.2914855480],
+    ]
+)
+_LMS_TO_LINEAR_SRGB = np.array(
+    [
+        [4.0767416621, -3.3077115913, 0.2309699292],
+        [-1.2684380046, 2.6097574011, -0.3413193965],
+        [-0.0041960863, -0.7034186147, 1.7076147010],
+    ]
+)
+
+
+def rgb1_to_oklab(rgb1: NDArray) -> NDArray[np.float64]:
+    """Converts sRGB values in [0, 1] with shape (..., 3) to Oklab coordinates."""
+    lms = _srgb1_to_linear(rgb1) @ _LINEAR_SRGB_TO_LMS.T
+    return np.cbrt(lms) @ _LMS_TO_OKLAB.T
+
+
+def oklab_to_rgb1(oklab: NDArray) -> NDArray[np.float64]:
+    """Converts Oklab coordinates with shape (..., 3) to sRGB values, clipped to [0, 1]."""
+    lms = (np.asarray(oklab, dtype=np.float64) @ _OKLAB_TO_LMS.T) ** 3
+    return _linear_to_srgb1(lms @ _LMS_TO_LINEAR_SRGB.T)
+
+
+def rgb1_to_cielab(rgb1: NDArray) -> NDArray[np.float64]:
+    """Converts sRGB values in [0, 1] with shape (..., 3) to CIELAB coordinates (D65)."""
+    return _convert(rgb1, "sRGB1", "CIELab")
+
+
+def ciede2000(lab1: NDArray, lab2: NDArray) -> NDArray[np.float64]:
+    """Returns the CIEDE2000 color difference between CIELAB colors.
+
+    This is a vectorized implementation of the formulas in Sharma et al., "The CIEDE2000
+    color-difference formula: Implementation notes, supplementary test data, and mathematical
+    observations" (2005), with the parametric weighting factors kL, kC, and kH set to 1.
+
+    Args:
+        lab1 (NDArray): CIELAB colors with shape (..., 3).
+        lab2 (NDArray): CIELAB colors with a shape that broadcasts against `lab1`.
+    """
+    l1, a1, b1 = np.moveaxis(np.asarray(lab1, dtype=np.float64), -1, 0)
+    l2, a2, b2 = np.moveaxis(np.asarray(lab2, dtype=np.float64), -1, 0)
+
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean**7 / (c_mean**7 + 25.0**7)))
+    a1_prime = (1 + g) * a1
+    a2_prime = (1 + g) * a2
+    c1_prime = np.hypot(a1_prime, b1)
+    c2_prime = np.hypot(a2_prime, b2)
+    h1_prime = np.degrees(np.arctan2(b1, a1_prime)) % 360
+    h2_prime = np.degrees(np.arctan2(b2, a2_prime)) % 360
+
+    # The hue difference and mean hue are undefined if either color is achromatic.
+    is_chromatic = c1_prime * c2_prime != 0
+    h_diff = h2_prime - h1_prime
+    h_diff = np.where(h_diff > 180, h_diff - 360, np.where(h_diff < -180, h_diff + 360, h_diff))
+    h_diff = np.where(is_chromatic, h_diff, 0)
+
+    h_sum = h1_prime + h2_prime
+    h_mean = np.where(
+        np.abs(h1_prime - h2_prime) > 180,
+        np.where(h_sum < 360, h_sum + 360, h_sum - 360) / 2,
+        h_sum / 2,
+    )
+    h_mean = np.where(is_chromatic, h_mean, h_sum)
+
+    delta_l = l2 - l1
+    delta_c = c2_prime - c1_prime
+    delta_h = 2 * np.sqrt(c1_prime * c2_prime) * np.sin(np.radians(h_diff / 2))
+
+    l_mean = (l1 + l2) / 2
+    c_prime_mean = (c1_prime + c2_prime) / 2
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(h_mean - 30))
+        + 0.24 * np.cos(np.radians(2 * h_mean))
+        + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+        - 0.20 * np.cos(np.radians(4 * h_mean - 63))
+    )
+    delta_theta = 30 * np.exp(-(((h_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(c_prime_mean**7 / (c_prime_mean**7 + 25.0**7))
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_prime_mean
+    s_h = 1 + 0.015 * c_prime_mean * t
+    r_t = -np.sin(np.radians(2 * delta_theta)) * r_c
+
+    return np.sqrt(
+        (delta_l / s_l) ** 2
+        + (delta_c / s_c) ** 2
+        + (delta_h / s_h) ** 2
+        + r_t * (delta_c / s_c) * (delta_h / s_h)
+    )
+
+
+def pairwise_distances(rgb1: NDArray, metric: str = "cam02ucs") -> NDArray[np.float64]:
+    """Returns the (N, N) matrix of perceptual distances between sRGB colors in [0, 1].
+
+    Args:
+        rgb1 (NDArray): The sRGB values, with shape (N, 3).
+        metric (str): Either 'cam02ucs' for the Euclidean distance in CAM02-UCS
+            or 'ciede2000' for the CIEDE2000 color difference.
+
+    Raises:
+        ValueError: If `metric` is invalid.
+    """
+    if metric == "cam02ucs":
+        coordinates = rgb1_to_cam02ucs(rgb1)
+        return np.linalg.norm(coordinates[:, np.newaxis] - coordinates[np.newaxis], axis=-1)
+    if metric == "ciede2000":
+        lab = rgb1_to_cielab(rgb1)
+        return ciede2000(lab[:, np.newaxis], lab[np.newaxis])
+    raise ValueError(f"Invalid metric '{metric}'. Choose from {', '.join(DISTANCE_METRICS)}.")
@@ -9,31 +9,12 @@ with warnings.catch_warnings():
     from colorspacious import cspace_convert  # type: ignore
 from numpy.typing import NDArray
 
+from arcadia_pycolor.colorspace import CVD_TYPES, create_cvd_space
 from arcadia_pycolor.gradient import Gradient
 from arcadia_pycolor.hexcode import HexCode
 from arcadia_pycolor.palette import Palette
 from arcadia_pycolor.plot import plot_gradient_lightness
 
-CVD_TYPES = {"d": "deuteranomaly", "p": "protanomaly", "t": "tritanomaly"}
-
-
-def _create_cvd_dict(cvd_type: str, severity: int = 100) -> dict[str, str]:
-    """Creates a dictionary for colorspacious to simulate color vision deficiency.
-
-    Args:
-        cvd_type (str): The type of color vision deficiency to simulate.
-            Either 'd' for deuteranomaly, 'p' for protanomaly, or 't' for tritanomaly.
-        severity (int): The severity of the color vision deficiency, from 0 to 100.
-    """
-    if cvd_type not in CVD_TYPES:
-        raise ValueError(
-            "Choose 'd' for deuteranomaly, 'p' for protanomaly, and 't' for tritanomaly."
-        )
-
-    clipped_severity = np.clip(severity, 0, 100)
-    cvd_space = {"name": "sRGB1+CVD", "cvd_type": CVD_TYPES[cvd_type], "severity": clipped_severity}
-    return cvd_space
-
 
 @overload
 def simulate_color(colors: HexCode, cvd_type: str = "d", severity: int = 100) -> HexCode: ...
@@ -56,7 +37,7 @@ def simulate_color(
             Either 'd' for deuteranomaly, 'p' for protanomaly, or 't' for tritanomaly.
         severity (int): The severity of the color vision deficiency, from 0 to 100.
     """
-    cvd_space = _create_cvd_dict(cvd_type=cvd_type, severity=severity)
+    cvd_space = create_cvd_space(cvd_type=cvd_type, severity=severity)
 
     if not isinstance(colors, list):
         colors = [colors]
@@ -135,7 +116,12 @@ def simulate_gradient(gradient: Gradient, cvd_type: str = "d", severity: int = 1
         Gradient: A new gradient with the simulated color vision deficiency.
     """
     cvd_hex_colors = simulate_color(gradient.anchor_colors, cvd_type=cvd_type, severity=severity)
-    cvd_gradient = Gradient(f"{gradient.name}_{cvd_type}", cvd_hex_colors, gradient.anchor_values)
+    cvd_gradient = Gradient(
+        f"{gradient.name}_{cvd_type}",
+        cvd_hex_colors,
+        gradient.anchor_values,
+        interpolation=gradient.interpolation,
+    )
     return cvd_gradient
 
 
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+# The default size cap for the cached exports (1 GiB).
+DEFAULT_CACHE_MAX_BYTES = 1024**3
+
+MANIFEST_SUFFIX = ".json"
+BLOB_SUFFIX = ".blob"
+
+
+def _package_version() -> str:
+    """Returns the installed version of arcadia-pycolor."""
+    try:
+        return version("arcadia-pycolor")
+    except PackageNotFoundError:
+        import arcadia_pycolor
+
+        return arcadia_pycolor.__version__
+
+
+def _hash_file(filepath: Path) -> str:
+    """Returns the SHA-256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit and eviction statistics for an `ExportCache`.
+
+    Attributes:
+        hits (int): The number of exports restored from the cache instead of being rendered.
+        misses (int): The number of exports that had to be rendered.
+        evictions (int): The number of cached exports removed to respect the size cap.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the fraction of lookups that were cache hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ExportCache:
+    """A content-addressed cache of exported figure files.
+
+    Each export is keyed by a hash of a canonical serialization of the figure together with
+    the export parameters (size, context, filetype, and any extra keyword arguments) and the
+    arcadia-pycolor version. The cache stores a copy of each rendered file alongside a manifest,
+    so a later export with the same key can be restored by copying instead of re-rendering.
+
+    When the total size of the cached files exceeds `max_bytes`, the least recently used
+    entries are evicted.
+
+    Example:
+    >>> import arcadia_pycolor as apc
+    >>> cache = apc.export_cache.ExportCache(".figure-cache")
+    >>> apc.mpl.save_figure("figure.pdf", size="float", cache=cache)
+    >>> cache.stats
+    CacheStats(hits=0, misses=1, evictions=0)
+
+    Attributes:
+        dirpath (Path): The directory in which cached files and manifests are stored.
+        max_bytes (int): The maximum total size of the cached files.
+        stats (CacheStats): Hit, miss, and eviction counts for this cache object.
+    """
+
+    def __init__(self, dirpath: str | Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """Initializes an ExportCache, creating its directory if necessary.
+
+        Args:
+            dirpath (str or Path): The directory in which to store cached exports.
+            max_bytes (int): The maximum total size of the cached files, in bytes.
+
+        Raises:
+            ValueError: If `max_bytes` is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+
+        self.dirpath = Path(dirpath)
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+
+    def key(self, spec: bytes, **params: Any) -> str:
+        """Returns the cache key for a figure serialization and its export parameters.
+
+        Args:
+            spec (bytes): A canonical serialization of the figure.
+            **params: The export parameters. Values are serialized with `repr`
+                if they are not JSON-serializable.
+        """
+        digest = hashlib.sha256(spec)
+        params = {**params, "arcadia_pycolor": _package_version()}
+        digest.update(json.dumps(params, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.dirpath / f"{key}{MANIFEST_SUFFIX}"
+
+    def _blob_path(self, key: str) -> Path:
+        return self.dirpath / f"{key}{BLOB_SUFFIX}"
+
+    def restore(self, key: str, filepath: str | Path) -> bool:
+        """Restores a cached export to `filepath` if the key is in the cache.
+
+        If `filepath` already contains the cached file, it is left untouched.
+
+        Args:
+            key (str): The cache key of the export.
+            filepath (str or Path): The path the export should be written to.
+
+        Returns:
+            bool: True if the export was restored from the cache, False otherwise.
+        """
+        manifest_path = self._manifest_path(key)
+        blob_path = self._blob_path(key)
+        if not manifest_path.is_file() or not blob_path.is_file():
+            self.stats.misses += 1
+            return False
+
+        manifest = json.loads(manifest_path.read_text())
+        filepath = Path(filepath)
+        if not filepath.is_file() or _hash_file(filepath) != manifest["sha256"]:
+            shutil.copyfile(blob_path, filepath)
+
+        # Mark the entry as recently used for LRU eviction.
+        os.utime(manifest_path)
+        self.stats.hits += 1
+        return True
+
+    def store(self, key: str, filepath: str | Path) -> None:
+        """Adds a rendered export to the cache and evicts old entries if needed.
+
+        Args:
+            key (str): The cache key of the export.
+            filepath (str or Path): The path of the rendered export.
+        """
+        filepath = Path(filepath)
+        blob_path = self._blob_path(key)
+        manifest_path = self._manifest_path(key)
+
+        # Write to temporary files first so that concurrent readers never see partial entries.
+        tmp_blob_path = blob_path.with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(filepath, tmp_blob_path)
+        os.replace(tmp_blob_path, blob_path)
+
+        manifest = {
+            "key": key,
+            "filename": filepath.name,
+            "sha256": _hash_file(blob_path),
+            "size": blob_path.stat().st_size,
+            "created": time.time(),
+        }
+        tmp_manifest_path = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_manifest_path.write_text(json.dumps(manifest, sort_keys=True))
+        os.replace(tmp_manifest_path, manifest_path)
+
+        self.evict()
+
+    def size_bytes(self) -> int:
+        """Returns the total size of the cached files in bytes."""
+        return sum(path.stat().st_size for path in self.dirpath.glob(f"*{BLOB_SUFFIX}"))
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache fits within `max_bytes`."""
+        entries = []
+        for manifest_path in self.dirpath.glob(f"*{MANIFEST_SUFFIX}"):
+            blob_path = manifest_path.with_suffix(BLOB_SUFFIX)
+            size = blob_path.stat().st_size if blob_path.is_file() else 0
+            entries.append((manifest_path.stat().st_mtime, manifest_path, blob_path, size))
+
+        total_size = sum(entry[3] for entry in entries)
+        for _, manifest_path, blob_path, size in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_bytes:
+                break
+            manifest_path.unlink(missing_ok=True)
+            blob_path.unlink(missing_ok=True)
+            total_size -= size
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        for suffix in (MANIFEST_SUFFIX, BLOB_SUFFIX):
+            for path in self.dirpath.glob(f"*{suffix}"):
+                path.unlink(missing_ok=True)
@@ -1,19 +1,60 @@
 from __future__ import annotations
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Any
 
 import matplotlib.colors as mcolors
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
 
+from arcadia_pycolor import colorspace, uniformity
 from arcadia_pycolor.display import colorize
 from arcadia_pycolor.hexcode import HexCode
+from arcadia_pycolor.norms import LinearNorm, Norm
 from arcadia_pycolor.palette import Palette
+from arcadia_pycolor.uniformity import (
+    GradientQualityReport,
+    UniformityMetrics,
+    UniformityOptimization,
+)
 from arcadia_pycolor.utils import (
     NumericSequence,
     distribute_values,
     interpolate_x_values,
     is_monotonic,
+    iter_chunk_slices,
     rescale_and_concatenate_values,
 )
 
+# The number of colors in the lookup table used to map arrays of values to colors.
+# This matches the default resolution of matplotlib colormaps.
+LOOKUP_TABLE_SIZE = 256
+
+# The number of colors precomputed for gradients interpolated in a perceptual color space.
+PERCEPTUAL_LOOKUP_TABLE_SIZE = 4096
+
+# The color spaces in which the colors between anchors can be interpolated.
+INTERPOLATION_MODES = ("srgb", "cam02ucs", "oklab")
+
+# The number of points at which each segment between anchors is sampled to measure uniformity.
+SEGMENT_SAMPLES = 65
+
+# The approximate number of values mapped at once by `Gradient.map_array`, to bound memory use.
+DEFAULT_CHUNK_ELEMENTS = 1 << 20
+
+# The default RGBA color of NaN and masked values.
+BAD_COLOR = (0, 0, 0, 0)
+
+
+def _check_in_place(values: NDArray) -> None:
+    """Raises a ValueError if an array can't hold the positions it is normalized to."""
+    if values.dtype not in (np.float32, np.float64) or not values.flags.writeable:
+        raise ValueError(
+            "Mapping in place requires a writable float32 or float64 array, "
+            f"got {'a read-only ' if not values.flags.writeable else ''}{values.dtype} array."
+        )
+
 
 @dataclass
 class Anchor:
@@ -36,9 +77,22 @@ class Gradient:
     in the gradient. The first color is always at position 0 and the last color at position 1.
     Colors in between are interpolated based on their position values to create a smooth gradient.
 
+    By default, colors are interpolated linearly in sRGB, like matplotlib colormaps.
+    Interpolating in a perceptually uniform color space ('cam02ucs' or 'oklab') avoids muddy
+    colors between anchors. Such gradients are sampled once into a lookup table of
+    `PERCEPTUAL_LOOKUP_TABLE_SIZE` colors, which every method reads from.
+
+    Values below or above the range of a mapping, and NaN or masked values, are mapped to
+    the `under`, `over`, and `bad` colors, respectively. By default, these are the first color,
+    the last color, and transparent black.
+
     Attributes:
         name (str): The name of the gradient.
         anchors (list[Anchor]): A list of gradient anchors.
+        under (HexCode or None): The color of values below the range, if not the first color.
+        over (HexCode or None): The color of values above the range, if not the last color.
+        bad (HexCode or None): The color of NaN and masked values, if not transparent.
+        interpolation (str): The color space in which colors are interpolated.
 
     Properties:
         anchor_colors (list[HexCode]):
@@ -47,13 +101,27 @@ class Gradient:
             The list of values corresponding to each anchor.
     """
 
-    def __init__(self, name: str, colors: list[HexCode], values: list[float] | None = None):
+    def __init__(
+        self,
+        name: str,
+        colors: list[HexCode],
+        values: list[float] | None = None,
+        under: HexCode | None = None,
+        over: HexCode | None = None,
+        bad: HexCode | None = None,
+        interpolation: str = "srgb",
+    ):
         """Initializes a Gradient.
 
         Args:
             name: The name of the gradient.
             colors: A list of HexCodes.
             values: An optional list of float values. See class docstring for details.
+            under: An optional HexCode for values below the range.
+            over: An optional HexCode for values above the range.
+            bad: An optional HexCode for NaN and masked values.
+            interpolation: The color space in which to interpolate colors:
+                'srgb', 'cam02ucs', or 'oklab'.
 
         Raises:
             ValueError:
@@ -62,11 +130,25 @@ class Gradient:
                 - If the values are not between 0 and 1.
                 - If the first value is not 0 or the last value is not 1.
                 - If the number of values is not the same as the number of colors.
+                - If `under`, `over`, or `bad` is not a HexCode.
+                - If `interpolation` is invalid.
         """
         self.name = name
 
         if not all(isinstance(color, HexCode) for color in colors):
             raise ValueError("All colors must be HexCode objects.")
+        if not all(isinstance(color, HexCode | None) for color in (under, over, bad)):
+            raise ValueError("The under, over, and bad colors must be HexCode objects.")
+        self.under = under
+        self.over = over
+        self.bad = bad
+
+        if interpolation not in INTERPOLATION_MODES:
+            raise ValueError(
+                f"Invalid interpolation '{interpolation}'. "
+                f"Choose from {', '.join(INTERPOLATION_MODES)}."
+            )
+        self.interpolation = interpolation
 
         if values is not None:
             if len(values) < 2:
@@ -86,6 +168,10 @@ class Gradient:
         self.anchors = [
             Anchor(color, value) for color, value in zip(colors, anchor_values, strict=False)
         ]
+        self._lookup_table_key: tuple | None = None
+        self._lookup_table: NDArray[np.uint8] | None = None
+        self._perceptual_colors_key: tuple | None = None
+        self._perceptual_colors: NDArray[np.float64] | None = None
 
     @property
     def anchor_colors(self) -> list[HexCode]:
@@ -102,11 +188,25 @@ class Gradient:
 
     @classmethod
     def from_dict(
-        cls, name: str, colors: dict[str, str], values: list[float] | None = None
+        cls,
+        name: str,
+        colors: dict[str, str],
+        values: list[float] | None = None,
+        under: str | None = None,
+        over: str | None = None,
+        bad: str | None = None,
+        interpolation: str = "srgb",
     ) -> Gradient:
-        """Creates a gradient from a dictionary of colors and values."""
+        """Creates a gradient from a dictionary of colors and values.
+
+        The optional `under`, `over`, and `bad` hex codes become HexCodes of the same name.
+        """
         hex_codes = [HexCode(name, hex_code) for name, hex_code in colors.items()]
-        return cls(name, hex_codes, values)
+        extremes = {
+            key: None if hex_code is None else HexCode(key, hex_code)
+            for key, hex_code in (("under", under), ("over", over), ("bad", bad))
+        }
+        return cls(name, hex_codes, values, interpolation=interpolation, **extremes)
 
     def swatch(self, steps: int = 21) -> str:
         """
@@ -134,6 +234,10 @@ class Gradient:
             name=f"{self.name}_r",
             colors=self.anchor_colors[::-1],
             values=[1 - value for value in self.anchor_values[::-1]],
+            under=self.over,
+            over=self.under,
+            bad=self.bad,
+            interpolation=self.interpolation,
         )
 
     def resample_as_palette(self, steps: int = 5) -> Palette:
@@ -155,45 +259,289 @@ class Gradient:
         values: NumericSequence,
         min_value: float | None = None,
         max_value: float | None = None,
+        norm: Norm | None = None,
     ) -> list[HexCode]:
         """Maps a sequence of values to their corresponding colors from a gradient.
 
         Args:
             values (NumericSequence): A sequence of values to map to colors.
+                NaN values and masked values of a masked array are assigned the bad color.
             min_value (float, optional):
                 Determines which value corresponds to the first color in the spectrum.
-                Any values below this minimum are assigned to the first color.
-                If not provided, the minimum value of `values` is chosen.
+                Any values below this minimum are assigned the under color.
+                If not provided, the minimum finite value of `values` is chosen.
             max_value (float, optional):
                 Determines which value corresponds to the last color in the spectrum.
-                Any values greater than this maximum are assigned to the last color.
-                If not provided, the maximum value of `values` is chosen.
+                Any values greater than this maximum are assigned the over color.
+                If not provided, the maximum finite value of `values` is chosen.
+            norm (Norm, optional): A norm from `arcadia_pycolor.norms` that maps values
+                to positions along the gradient, such as a `LogNorm` or a `TwoSlopeNorm`.
+                It replaces `min_value` and `max_value`.
 
         Returns:
             list[HexCode]: A list of HexCode objects corresponding to the values.
+                Without a bad color, NaN and masked values are assigned black,
+                since HexCodes cannot be transparent.
         """
         if not len(values):
             return []
 
-        if min_value is None:
-            min_value = min(values)
+        norm = self._resolve_norm(norm, min_value, max_value)
+        if not norm.scaled:
+            norm.autoscale_chunks([values])
+        norm.validate()
+
+        positions = norm(np.ma.getdata(values).astype(np.float64))
+        positions[np.ma.getmaskarray(values)] = np.nan
+        cmap = self.to_mpl_cmap()
+
+        return [HexCode(f"{value}", mcolors.to_hex(cmap(value))) for value in positions.tolist()]
+
+    def _cache_key(self) -> tuple:
+        """Returns a key that changes whenever the colors of the gradient change."""
+        anchors = tuple((anchor.color.hex_code, anchor.value) for anchor in self.anchors)
+        return (anchors, self.interpolation)
+
+    def lookup_table(self) -> NDArray[np.uint8]:
+        """Returns the colors of the gradient at evenly spaced positions.
+
+        The table is an (N, 4) array of 8-bit RGBA values, where N is `LOOKUP_TABLE_SIZE`
+        for gradients interpolated in sRGB and `PERCEPTUAL_LOOKUP_TABLE_SIZE` otherwise.
+        It holds the same colors as the colormap from `to_mpl_cmap`, and is cached until
+        the colors of the gradient change.
+        """
+        key = self._cache_key()
+        if self._lookup_table is None or self._lookup_table_key != key:
+            cmap = self.to_mpl_cmap()
+            rgba = cmap(np.linspace(0, 1, cmap.N))
+            self._lookup_table = np.round(rgba * 255).astype(np.uint8)
+            self._lookup_table_key = key
+        return self._lookup_table
+
+    def _extended_lookup_table(self) -> NDArray[np.uint8]:
+        """Returns the lookup table followed by the under, over, and bad colors."""
+        lookup_table = self.lookup_table()
+
+        def to_rgba255(color: HexCode | None, default: ArrayLike) -> NDArray[np.uint8]:
+            if color is None:
+                return np.asarray(default, dtype=np.uint8)
+            return np.round(np.array(mcolors.to_rgba(color.hex_code)) * 255).astype(np.uint8)
+
+        return np.vstack(
+            [
+                lookup_table,
+                to_rgba255(self.under, lookup_table[0]),
+                to_rgba255(self.over, lookup_table[-1]),
+                to_rgba255(self.bad, BAD_COLOR),
+            ]
+        )
+
+    def _map_chunk(
+        self, values: ArrayLike, norm: Norm, out: NDArray | None = None, in_place: bool = False
+    ) -> NDArray[np.uint8]:
+        """Maps an array of values to RGBA colors using the extended lookup table.
+
+        Every value is mapped by indexing into the table, including out-of-range, NaN,
+        and masked values, so there is no separate pass to filter them.
+        If `in_place` is True, the values are normalized in place instead of into a new array.
+        """
+        mask = np.ma.getmask(values)
+        values = np.ma.getdata(values)
+        if values.ndim == 0:
+            masked_values = np.ma.masked_array(values.reshape(1), mask=np.reshape(mask, -1))
+            colors = self._map_chunk(masked_values, norm)[0]
+            if out is not None:
+                out[...] = colors
+            return colors
+
+        if in_place:
+            _check_in_place(values)
+        positions = norm(values, out=values if in_place else None)
+        if mask is not np.ma.nomask:
+            np.copyto(positions, np.nan, where=mask)
+
+        # Out-of-range and NaN positions are found with one mask and remapped together,
+        # since scattering into large arrays is the most expensive step.
+        is_special = ~((positions >= 0) & (positions <= 1))
+        special_positions = positions[is_special]
+
+        # The under, over, and bad colors follow the gradient colors in the extended table.
+        extended_lookup_table = self._extended_lookup_table()
+        num_colors = len(extended_lookup_table) - 3
+        under_index, over_index, bad_index = num_colors, num_colors + 1, num_colors + 2
+
+        positions *= num_colors
+        np.clip(positions, 0, num_colors - 1, out=positions)
+        with np.errstate(invalid="ignore"):
+            # NaN positions are cast to arbitrary indices, which are replaced below.
+            indices = positions.astype(np.intp)
+        if len(special_positions):
+            indices[is_special] = np.where(
+                special_positions < 0,
+                under_index,
+                np.where(special_positions > 1, over_index, bad_index),
+            )
 
-        if max_value is None:
-            max_value = max(values)
+        return np.take(extended_lookup_table, indices, axis=0, out=out)
 
-        if min_value >= max_value:
+    @staticmethod
+    def _resolve_norm(norm: Norm | None, min_value: float | None, max_value: float | None) -> Norm:
+        """Returns the norm to map values with, which is linear if none is given."""
+        if norm is None:
+            return LinearNorm(min_value, max_value)
+        if min_value is not None or max_value is not None:
+            raise ValueError("Pass either a norm or min_value and max_value, not both.")
+        return norm
+
+    def map_array(
+        self,
+        values: Any,
+        min_value: float | None = None,
+        max_value: float | None = None,
+        out: NDArray[np.uint8] | None = None,
+        chunk_size: int | None = None,
+        workers: int = 1,
+        norm: Norm | None = None,
+        in_place: bool = False,
+    ) -> NDArray[np.uint8]:
+        """Maps an array of values to 8-bit RGBA colors from the gradient.
+
+        Unlike `map_values`, this is vectorized and returns an array instead of HexCodes.
+        The values are processed in chunks along the first axis, so `values` can be a
+        `numpy.memmap` (or any array-like object that supports slicing along the first axis,
+        such as an HDF5 dataset) that is larger than memory, and `out` can be a memmap too.
+        If the range is not given, it is computed in a first pass over the chunks.
+
+        Example:
+        >>> import numpy as np
+        >>> import arcadia_pycolor as apc
+        >>> values = np.load("expression.npy", mmap_mode="r")
+        >>> out = np.lib.format.open_memmap("colors.npy", "w+", np.uint8, (*values.shape, 4))
+        >>> apc.gradients.viridis.map_array(values, out=out, workers=4)
+
+        Args:
+            values: The values to map, which may be a masked array.
+            min_value (float, optional): The value that corresponds to the first color.
+                Smaller values are assigned the under color. If None, the minimum finite value.
+            max_value (float, optional): The value that corresponds to the last color.
+                Larger values are assigned the over color. If None, the maximum finite value.
+            out (NDArray, optional): A uint8 array of shape `values.shape + (4,)` to write into.
+            chunk_size (int, optional): The number of items along the first axis mapped at once.
+                If None, chunks of about one million values are used.
+            workers (int): The number of threads that map chunks in parallel.
+            norm (Norm, optional): A norm from `arcadia_pycolor.norms` that maps values
+                to positions along the gradient, such as a `PercentileNorm`.
+                It replaces `min_value` and `max_value`. If it has no range,
+                the range of the values is used.
+            in_place (bool): Whether to normalize each chunk in place, which saves allocating
+                a buffer of positions per chunk but overwrites `values` with scratch data.
+                Requires a writable float32 or float64 array.
+
+        Returns:
+            NDArray: The RGBA colors, with shape `values.shape + (4,)`. NaN values and masked
+                values of a masked array are assigned the bad color.
+
+        Raises:
+            ValueError: If `min_value` is not less than `max_value`, if both a norm and a range
+                are given, if `out` has the wrong shape, or if `in_place` is True and the values
+                are not a writable float32 or float64 array.
+        """
+        norm = self._resolve_norm(norm, min_value, max_value)
+        if not hasattr(values, "shape") or not hasattr(values, "__getitem__"):
+            values = np.asarray(values)
+        shape = tuple(values.shape)
+
+        if out is None:
+            out = np.empty((*shape, 4), dtype=np.uint8)
+        elif tuple(out.shape) != (*shape, 4) or out.dtype != np.uint8:
             raise ValueError(
-                f"max_value ({max_value}) must be greater than min_value ({min_value})."
+                f"out must be a uint8 array of shape {(*shape, 4)}, got {out.dtype} {out.shape}."
             )
 
-        cmap = self.to_mpl_cmap()
+        if not shape:
+            norm.autoscale(values, values)
+            norm.validate()
+            out[...] = self._map_chunk(values, norm)
+            return out
 
-        normalized_values = [(value - min_value) / (max_value - min_value) for value in values]
+        if chunk_size is None:
+            row_size = int(np.prod(shape[1:]))
+            chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // max(row_size, 1))
+        chunk_slices = list(iter_chunk_slices(shape[0], chunk_size))
 
-        return [HexCode(f"{value}", mcolors.to_hex(cmap(value))) for value in normalized_values]
+        if not norm.scaled:
+            norm.autoscale_chunks(values[rows] for rows in chunk_slices)
+        norm.validate()
+
+        def map_rows(rows: slice) -> None:
+            self._map_chunk(values[rows], norm, out=out[rows], in_place=in_place)
+
+        if workers == 1:
+            for rows in chunk_slices:
+                map_rows(rows)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(map_rows, chunk_slices):
+                    pass
+        return out
+
+    def map_chunks(
+        self,
+        chunks: Iterable[ArrayLike],
+        min_value: float | None = None,
+        max_value: float | None = None,
+        norm: Norm | None = None,
+        in_place: bool = False,
+    ) -> Iterator[NDArray[np.uint8]]:
+        """Lazily maps a stream of array chunks to 8-bit RGBA colors from the gradient.
+
+        Only one chunk is held in memory at a time. If the range is not given, it is computed
+        in a first pass over the chunks, which requires `chunks` to be re-iterable (such as a
+        list of memmaps); a one-shot iterator requires both `min_value` and `max_value`,
+        or a norm with a range.
+
+        To normalize robustly in a single pass over the data, sketch the values with a
+        `arcadia_pycolor.sketch.QuantileSketch` while they are produced, then map them with
+        a `PercentileNorm` or `EqualizeNorm` built from the sketch.
+
+        Args:
+            chunks (Iterable[ArrayLike]): The chunks of values.
+            min_value (float, optional): The value that corresponds to the first color.
+                If None, the minimum finite value over all chunks.
+            max_value (float, optional): The value that corresponds to the last color.
+                If None, the maximum finite value over all chunks.
+            norm (Norm, optional): A norm from `arcadia_pycolor.norms` that maps values
+                to positions along the gradient. It replaces `min_value` and `max_value`.
+            in_place (bool): Whether to normalize each chunk in place, which overwrites the
+                chunks with scratch data. The chunks must be writable float32 or float64 arrays.
+
+        Returns:
+            Iterator[NDArray]: The RGBA colors of each chunk, with shape `chunk.shape + (4,)`.
+
+        Raises:
+            ValueError: If the range is missing and `chunks` is a one-shot iterator,
+                if both a norm and a range are given, if `min_value` is not less than
+                `max_value`, or if `in_place` is True and a chunk is not a writable float32
+                or float64 array.
+        """
+        norm = self._resolve_norm(norm, min_value, max_value)
+        if not norm.scaled:
+            if iter(chunks) is chunks:
+                raise ValueError(
+                    "Computing the range requires a second pass over the chunks. "
+                    "Pass min_value and max_value, or a re-iterable sequence of chunks."
+                )
+            norm.autoscale_chunks(chunks)
+        norm.validate()
+
+        return (self._map_chunk(chunk, norm, in_place=in_place) for chunk in chunks)
 
     def interpolate_lightness(self) -> Gradient:
-        """Interpolates the gradient to new values based on lightness."""
+        """Interpolates the gradient to new values based on lightness.
+
+        See `optimize_uniformity` for a numerical optimizer that also evens out the perceptual
+        step size and supports gradients with non-monotonic lightness.
+        """
 
         if self.num_anchors < 3:
             raise ValueError("Interpolation requires at least three colors.")
@@ -207,7 +555,175 @@ class Gradient:
             name=f"{self.name}_interpolated",
             colors=self.anchor_colors,
             values=new_values,
+            under=self.under,
+            over=self.over,
+            bad=self.bad,
+            interpolation=self.interpolation,
+        )
+
+    def _segment_cam02ucs(self, num_points: int = SEGMENT_SAMPLES) -> NDArray[np.float64]:
+        """Returns the CAM02-UCS coordinates of each segment between consecutive anchors,
+        sampled at evenly spaced points, with shape (num_anchors - 1, num_points, 3)."""
+        to_space, from_space = self._interpolation_space()
+        anchor_coordinates = to_space(mcolors.to_rgba_array(self.anchor_colors)[:, :3])
+        fractions = np.linspace(0, 1, num_points)[np.newaxis, :, np.newaxis]
+        coordinates = (
+            anchor_coordinates[:-1, np.newaxis] * (1 - fractions)
+            + anchor_coordinates[1:, np.newaxis] * fractions
+        )
+        return colorspace.rgb1_to_cam02ucs(from_space(coordinates))
+
+    def uniformity_metrics(self, num_samples: int = 256) -> UniformityMetrics:
+        """Returns how far the gradient is from linear lightness and uniform perceptual steps.
+
+        See `arcadia_pycolor.uniformity.UniformityMetrics` for the definitions.
+
+        Args:
+            num_samples (int): The number of evenly spaced samples to evaluate.
+        """
+        positions = np.linspace(0, 1, num_samples)
+        cam02ucs = colorspace.rgb1_to_cam02ucs(self.sample(positions))
+        anchor_lightness = colorspace.rgb1_to_cam02ucs(
+            mcolors.to_rgba_array(self.anchor_colors)[:, :3]
+        )[:, 0]
+        anchor_values = np.array(self._adjusted_anchor_values())
+        pinned = uniformity.pinned_anchor_indices(anchor_lightness, anchor_values)
+        lightness_error, step_variation = uniformity.evaluate(
+            cam02ucs,
+            positions,
+            anchor_values[pinned],
+            anchor_lightness[pinned],
+            uniformity.lightness_scale(anchor_lightness),
+            uniformity.smooth_steps(positions, anchor_values),
+        )
+        return UniformityMetrics(float(lightness_error), float(step_variation))
+
+    def quality_report(
+        self, steps: int = 1024, cvd: bool = True, severity: float = 100
+    ) -> GradientQualityReport:
+        """Returns metrics of the quality of the gradient, without plotting.
+
+        The report includes the lightness monotonicity, the uniformity of the perceptual step
+        size, and the lightness range, with normal color vision and, if `cvd` is True, with
+        each type of color vision deficiency. See `arcadia_pycolor.uniformity.quality_reports`
+        to evaluate many gradients at once.
+
+        Example:
+        >>> report = apc.gradients.viridis.quality_report()
+        >>> report.normal.lightness_monotonicity, report.cvd["d"].step_variation
+
+        Args:
+            steps (int): The number of evenly spaced samples to evaluate.
+            cvd (bool): Whether to also evaluate each type of color vision deficiency.
+            severity (float): The severity of the simulated color vision deficiency,
+                from 0 to 100.
+        """
+        return uniformity.quality_reports([self], steps=steps, cvd=cvd, severity=severity)[0]
+
+    def _insert_anchor(self) -> Gradient:
+        """Returns a copy of the gradient with an anchor inserted at the perceptual midpoint
+        of its longest segment, which does not change its colors."""
+        segments = self._segment_cam02ucs()
+        steps = np.linalg.norm(np.diff(segments, axis=1), axis=-1)
+        widths = np.diff(self._adjusted_anchor_values())
+        lengths = np.where(widths > uniformity.SHARP_TRANSITION_WIDTH, steps.sum(-1), 0)
+        segment = int(np.argmax(lengths))
+
+        cumulative_lengths = np.concatenate([[0], np.cumsum(steps[segment])])
+        fraction = np.interp(
+            cumulative_lengths[-1] / 2, cumulative_lengths, np.linspace(0, 1, len(segments[0]))
+        )
+        start, end = self.anchors[segment].value, self.anchors[segment + 1].value
+        value = start + fraction * (end - start)
+        color = HexCode(f"{self.name}_{self.num_anchors}", mcolors.to_hex(self.sample([value])[0]))
+
+        return Gradient(
+            name=self.name,
+            colors=[*self.anchor_colors[: segment + 1], color, *self.anchor_colors[segment + 1 :]],
+            values=[*self.anchor_values[: segment + 1], value, *self.anchor_values[segment + 1 :]],
+            under=self.under,
+            over=self.over,
+            bad=self.bad,
+            interpolation=self.interpolation,
+        )
+
+    def optimize_uniformity(
+        self,
+        lightness_weight: float = uniformity.DEFAULT_LIGHTNESS_WEIGHT,
+        insert_anchors: int = 0,
+        num_samples: int = 256,
+        max_iterations: int = 200,
+    ) -> UniformityOptimization:
+        """Moves the anchors of the gradient to make it more perceptually uniform.
+
+        This generalizes `interpolate_lightness`. The gradient is sampled densely and the
+        positions of its anchors are optimized numerically to minimize both the deviation from
+        linear lightness and the variation of the perceptual step size (see
+        `arcadia_pycolor.uniformity`). The colors of the anchors don't change. The endpoints,
+        anchors where the lightness changes direction (like the center of a diverging
+        gradient), and sharp transitions stay in place, so the gradient needn't be monotonic.
+
+        Example:
+        >>> result = apc.gradients.reds.optimize_uniformity(insert_anchors=2)
+        >>> result.before, result.after
+        >>> result.gradient.to_mpl_cmap()
+
+        Args:
+            lightness_weight (float): The weight of the lightness error, from 0 to 1.
+                The step variation has a weight of `1 - lightness_weight`.
+            insert_anchors (int): The number of anchors to insert before optimizing. Each is
+                inserted at the perceptual midpoint of the longest segment, which adds
+                freedom to correct non-uniform segments.
+            num_samples (int): The number of evenly spaced samples to evaluate.
+            max_iterations (int): The maximum number of iterations of the optimizer.
+
+        Returns:
+            UniformityOptimization: The optimized gradient and its metrics before and after.
+                If optimizing does not improve the metrics, the gradient is unchanged
+                (except for any inserted anchors).
+
+        Raises:
+            ValueError: If `lightness_weight` is not between 0 and 1
+                or `insert_anchors` is negative.
+        """
+        if not 0 <= lightness_weight <= 1:
+            raise ValueError("lightness_weight must be between 0 and 1.")
+        if insert_anchors < 0:
+            raise ValueError("insert_anchors must not be negative.")
+
+        before = self.uniformity_metrics(num_samples)
+        gradient = self
+        for _ in range(insert_anchors):
+            gradient = gradient._insert_anchor()
+
+        segments = gradient._segment_cam02ucs()
+        anchor_lightness = np.append(segments[:, 0, 0], segments[-1, -1, 0])
+        values = uniformity.optimize_anchor_values(
+            segments,
+            np.array(gradient._adjusted_anchor_values()),
+            anchor_lightness,
+            lightness_weight=lightness_weight,
+            num_samples=num_samples,
+            max_iterations=max_iterations,
         )
+        values = np.round(values, 4)
+        values[[0, -1]] = 0, 1
+        optimized = Gradient(
+            name=f"{self.name}_uniform",
+            colors=gradient.anchor_colors,
+            values=values.tolist(),
+            under=self.under,
+            over=self.over,
+            bad=self.bad,
+            interpolation=self.interpolation,
+        )
+
+        after = optimized.uniformity_metrics(num_samples)
+        unoptimized = gradient.uniformity_metrics(num_samples)
+        if after.objective(lightness_weight) > unoptimized.objective(lightness_weight):
+            optimized.anchors = [Anchor(a.color, a.value) for a in gradient.anchors]
+            after = unoptimized
+        return UniformityOptimization(optimized, before, after)
 
     def __add__(self, other: Gradient) -> Gradient:
         """Return the sum of two gradients by concatenating their colors and values."""
@@ -223,6 +739,10 @@ class Gradient:
             name=f"{self.name}_{other.name}",
             colors=new_colors,
             values=new_values,
+            under=self.under,
+            over=other.over,
+            bad=self.bad,
+            interpolation=self.interpolation,
         )
 
     def __repr__(self) -> str:
@@ -236,14 +756,13 @@ class Gradient:
             ]
         )
 
-    def to_mpl_cmap(self) -> mcolors.LinearSegmentedColormap:
-        """Converts the gradient to a matplotlib colormap.
+    def _adjusted_anchor_values(self) -> list[float]:
+        """Returns the anchor values, with duplicates nudged forward to be strictly increasing.
 
         Diverging gradients (built by concatenating two gradients with ``+``) store
         the shared midpoint color at position 0.5 in *both* halves, resulting in a
-        duplicate anchor value.  ``LinearSegmentedColormap.from_list`` requires
-        strictly increasing positions, so any duplicate is nudged forward by a
-        negligible epsilon before the colormap is constructed.
+        duplicate anchor value. Interpolation requires strictly increasing positions,
+        so any duplicate is nudged forward by a negligible epsilon.
         """
         epsilon = 1e-10
         adjusted_values: list[float] = []
@@ -252,16 +771,83 @@ class Gradient:
             if adjusted_values and v <= adjusted_values[-1]:
                 v = adjusted_values[-1] + epsilon
             adjusted_values.append(v)
+        return adjusted_values
 
-        colors = [
-            (v, anchor.color.hex_code)
-            for v, anchor in zip(adjusted_values, self.anchors, strict=True)
-        ]
+    def _interpolation_space(
+        self,
+    ) -> tuple[Callable[[NDArray], NDArray], Callable[[NDArray], NDArray]]:
+        """Returns functions that convert sRGB values in [0, 1] to the interpolation space
+        and back."""
+        return {
+            "srgb": (np.asarray, lambda rgb1: np.clip(rgb1, 0, 1)),
+            "cam02ucs": (colorspace.rgb1_to_cam02ucs, colorspace.cam02ucs_to_rgb1),
+            "oklab": (colorspace.rgb1_to_oklab, colorspace.oklab_to_rgb1),
+        }[self.interpolation]
 
-        return mcolors.LinearSegmentedColormap.from_list(
-            self.name,
-            colors=colors,
+    def sample(self, positions: ArrayLike) -> NDArray[np.float64]:
+        """Returns the colors of the gradient at positions from 0 to 1.
+
+        Unlike the lookup table and the colormap, the colors are interpolated exactly
+        rather than picked from a fixed number of colors.
+
+        Returns:
+            NDArray: The sRGB values in [0, 1], with shape `positions.shape + (3,)`.
+        """
+        to_space, from_space = self._interpolation_space()
+        anchor_coordinates = to_space(mcolors.to_rgba_array(self.anchor_colors)[:, :3])
+        anchor_values = self._adjusted_anchor_values()
+        positions = np.asarray(positions, dtype=np.float64)
+        coordinates = np.stack(
+            [np.interp(positions, anchor_values, channel) for channel in anchor_coordinates.T],
+            axis=-1,
         )
+        return from_space(coordinates)
+
+    def perceptual_colors(self) -> NDArray[np.float64]:
+        """Returns the colors of a gradient interpolated in a perceptual color space.
+
+        The colors are sampled at `PERCEPTUAL_LOOKUP_TABLE_SIZE` evenly spaced positions by
+        converting the anchors to the color space of `interpolation`, interpolating linearly
+        there, and converting back to sRGB in one vectorized batch. The (N, 3) array of sRGB
+        values in [0, 1] is cached until the colors of the gradient change.
+
+        Raises:
+            ValueError: If the gradient is interpolated in sRGB.
+        """
+        if self.interpolation == "srgb":
+            raise ValueError("Gradients interpolated in sRGB have no perceptual colors.")
+
+        key = self._cache_key()
+        if self._perceptual_colors is None or self._perceptual_colors_key != key:
+            self._perceptual_colors = self.sample(np.linspace(0, 1, PERCEPTUAL_LOOKUP_TABLE_SIZE))
+            self._perceptual_colors_key = key
+        return self._perceptual_colors
+
+    def to_mpl_cmap(self) -> mcolors.Colormap:
+        """Converts the gradient to a matplotlib colormap.
+
+        Gradients interpolated in sRGB are converted to a `LinearSegmentedColormap` with
+        256 colors, and other gradients to a `ListedColormap` of their perceptual colors.
+        The under, over, and bad colors of the gradient, if any, are set on the colormap.
+        """
+        if self.interpolation == "srgb":
+            colors = [
+                (v, anchor.color.hex_code)
+                for v, anchor in zip(self._adjusted_anchor_values(), self.anchors, strict=True)
+            ]
+            cmap: mcolors.Colormap = mcolors.LinearSegmentedColormap.from_list(
+                self.name,
+                colors=colors,
+            )
+        else:
+            cmap = mcolors.ListedColormap(self.perceptual_colors(), name=self.name)
+
+        extremes = {
+            name: color.hex_code
+            for name, color in (("under", self.under), ("over", self.over), ("bad", self.bad))
+            if color is not None
+        }
+        return cmap.with_extremes(**extremes) if extremes else cmap
 
     def to_plotly_colorscale(self) -> list[tuple[float, str]]:
         """Converts the gradient to a colorscale acceptable by plotly graph objects.
@@ -280,4 +866,5 @@ class Gradient:
                 A 256 (8-bit) color scale. Each element is a two-ple of normalized
                 position in the colorscale and the associated hex value.
         """
-        return [(i / 255.0, mcolors.rgb2hex(self.to_mpl_cmap()(i / 255.0))) for i in range(256)]
+        cmap = self.to_mpl_cmap()
+        return [(i / 255.0, mcolors.rgb2hex(cmap(i / 255.0))) for i in range(256)]
@@ -71,6 +71,11 @@ class HexCode(str):
     def __deepcopy__(self, _: dict) -> HexCode:
         return HexCode(self.name, self.hex_code)
 
+    def __getnewargs__(self) -> tuple[str, str]:
+        # Required to unpickle HexCodes (e.g., in pickled matplotlib figures),
+        # because `__new__` expects both the name and the HEX code.
+        return (self.name, self.hex_code)
+
     def to_rgb(self) -> list[int]:
         """Returns a tuple of RGB values for the color."""
         return [int(c * 255) for c in mcolors.to_rgb(self.hex_code)]
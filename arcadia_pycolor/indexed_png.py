@@ -0,0 +1,204 @@
+import logging
+import warnings
+from pathlib import Path
+from typing import cast
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+with warnings.catch_warnings():
+    warnings.filterwarnings("ignore", category=SyntaxWarning, module="colorspacious")
+    from colorspacious import cspace_convert  # type: ignore
+
+import arcadia_pycolor.palettes
+from arcadia_pycolor.palette import Palette
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of colors in an indexed PNG.
+MAX_PALETTE_SIZE = 256
+
+# The number of palette entries used to represent the antialiased edges of each key color.
+DEFAULT_RAMP_STEPS = 8
+
+# The largest acceptable perceptual error (CAM02-UCS delta E) for the 99th percentile of pixels.
+# A delta E of about 1 is barely perceptible.
+DEFAULT_MAX_DELTA_E = 3.0
+DELTA_E_PERCENTILE = 99
+
+# The number of unique colors to match against the palette at once, to bound memory use.
+NEAREST_CHUNK_SIZE = 16384
+
+
+def _premultiply(rgba: NDArray) -> NDArray[np.float32]:
+    """Returns RGBA colors in [0, 1] with the RGB channels multiplied by alpha."""
+    rgba = rgba.astype(np.float32) / 255
+    rgba[:, :3] *= rgba[:, 3:]
+    return rgba
+
+
+def _unpremultiply(rgba: NDArray[np.float32]) -> NDArray[np.uint8]:
+    """Inverts `_premultiply`, returning RGBA colors in [0, 255]."""
+    rgba = rgba.copy()
+    alpha = rgba[:, 3:]
+    rgba[:, :3] = np.divide(rgba[:, :3], alpha, out=np.zeros_like(rgba[:, :3]), where=alpha > 0)
+    return np.round(np.clip(rgba, 0, 1) * 255).astype(np.uint8)
+
+
+def _pack(rgba: NDArray[np.uint8]) -> NDArray[np.uint32]:
+    """Packs an (N, 4) array of RGBA colors into one uint32 per color."""
+    return np.ascontiguousarray(rgba, dtype=np.uint8).view(np.uint32).ravel()
+
+
+def _build_palette(
+    unique_rgba: NDArray[np.uint8],
+    counts: NDArray[np.intp],
+    palette: Palette,
+    ramp_steps: int,
+) -> NDArray[np.uint8]:
+    """Builds an indexed palette of at most 256 RGBA colors for an image.
+
+    The palette is seeded with the colors of `palette` that occur in the image and with the
+    image's most frequent colors. Each of these key colors is paired with a ramp towards the
+    background (the most frequent color) to represent antialiased edges. Any remaining
+    entries are filled with the most frequent colors that are not yet in the palette.
+    """
+    by_frequency = np.argsort(-counts, kind="stable")
+    background = unique_rgba[by_frequency[0]]
+
+    palette_rgba = np.array([[*color.to_rgb(), 255] for color in palette], dtype=np.uint8)
+    is_palette_color = np.isin(_pack(unique_rgba), _pack(palette_rgba))
+    is_key_candidate = (unique_rgba[:, 3] == 255) & (_pack(unique_rgba) != _pack(background))
+
+    # Colors from `palette` take priority, followed by the other frequent opaque colors.
+    key_order = np.concatenate(
+        [
+            by_frequency[is_palette_color[by_frequency] & is_key_candidate[by_frequency]],
+            by_frequency[~is_palette_color[by_frequency] & is_key_candidate[by_frequency]],
+        ]
+    )
+    num_keys = min(len(key_order), (MAX_PALETTE_SIZE - 1) // ramp_steps)
+    keys = _premultiply(unique_rgba[key_order[:num_keys]])
+
+    # Blend each key color towards the background in premultiplied space, which yields
+    # partially transparent versions of the key color if the background is transparent.
+    weights = np.linspace(0, 1, ramp_steps + 1, dtype=np.float32)[:-1, np.newaxis, np.newaxis]
+    ramps = (1 - weights) * keys + weights * _premultiply(background[np.newaxis])
+    seeded_colors = np.concatenate(
+        [background[np.newaxis], _unpremultiply(ramps.reshape(-1, 4))], axis=0
+    )
+    _, first_indices = np.unique(_pack(seeded_colors), return_index=True)
+    seeded_colors = seeded_colors[np.sort(first_indices)]
+
+    # Fill the rest of the palette with the most frequent colors not yet included.
+    is_seeded = np.isin(_pack(unique_rgba), _pack(seeded_colors))
+    remaining = by_frequency[~is_seeded[by_frequency]]
+    num_remaining = MAX_PALETTE_SIZE - len(seeded_colors)
+    return np.concatenate([seeded_colors, unique_rgba[remaining[:num_remaining]]], axis=0)
+
+
+def _map_to_palette(
+    unique_rgba: NDArray[np.uint8], palette_rgba: NDArray[np.uint8]
+) -> NDArray[np.uint8]:
+    """Returns the index of the nearest palette color (in premultiplied RGBA) for each color."""
+    candidates = _premultiply(palette_rgba)
+    candidate_norms = (candidates**2).sum(axis=1)
+
+    indices = np.empty(len(unique_rgba), dtype=np.uint8)
+    for start in range(0, len(unique_rgba), NEAREST_CHUNK_SIZE):
+        colors = _premultiply(unique_rgba[start : start + NEAREST_CHUNK_SIZE])
+        # The squared distance, omitting the norm of each color since it is constant per row.
+        distances = candidate_norms - 2 * colors @ candidates.T
+        indices[start : start + NEAREST_CHUNK_SIZE] = np.argmin(distances, axis=1)
+    return indices
+
+
+def _composite_on_white_cam02ucs(rgba: NDArray[np.uint8]) -> NDArray[np.float64]:
+    """Returns the CAM02-UCS coordinates of RGBA colors displayed on a white background."""
+    premultiplied = _premultiply(rgba)
+    rgb = premultiplied[:, :3] + (1 - premultiplied[:, 3:])
+    return cast(NDArray[np.float64], cspace_convert(rgb, "sRGB1", "CAM02-UCS"))
+
+
+def convert_to_indexed_png(
+    filepath: str | Path,
+    palette: Palette | None = None,
+    max_delta_e: float = DEFAULT_MAX_DELTA_E,
+    ramp_steps: int = DEFAULT_RAMP_STEPS,
+) -> bool:
+    """Converts a PNG file in place to an indexed (palette-based) PNG.
+
+    Figures use a small number of colors, so an indexed PNG is usually several times smaller
+    than a 32-bit RGBA PNG. The palette is seeded with the colors of `palette` that occur in the
+    image, together with ramps that represent the antialiased edges of each color.
+
+    If the conversion would change the 99th percentile of pixels by more than `max_delta_e`
+    (measured in CAM02-UCS on a white background), the file is left unchanged.
+
+    Args:
+        filepath (str or Path): The path to the PNG file.
+        palette (Palette, optional): The colors to seed the indexed palette with.
+            If None, all of the Arcadia colors are used.
+        max_delta_e (float): The largest acceptable perceptual error.
+        ramp_steps (int): The number of palette entries used per color for antialiasing.
+
+    Returns:
+        bool: True if the file was converted, False if it was left unchanged.
+
+    Raises:
+        ValueError: If `ramp_steps` is less than 1.
+    """
+    if ramp_steps < 1:
+        raise ValueError(f"ramp_steps must be at least 1, got {ramp_steps}.")
+    palette = arcadia_pycolor.palettes.all_colors if palette is None else palette
+
+    with Image.open(filepath) as image:
+        dpi = image.info.get("dpi")
+        rgba = np.asarray(image.convert("RGBA"))
+
+    height, width, _ = rgba.shape
+    uniques, inverse, counts = np.unique(
+        _pack(rgba.reshape(-1, 4)), return_inverse=True, return_counts=True
+    )
+    unique_rgba = uniques.view(np.uint8).reshape(-1, 4)
+
+    if len(unique_rgba) <= MAX_PALETTE_SIZE:
+        # The image can be represented exactly.
+        palette_rgba = unique_rgba
+        mapping = np.arange(len(unique_rgba), dtype=np.uint8)
+    else:
+        palette_rgba = _build_palette(unique_rgba, counts, palette, ramp_steps)
+        mapping = _map_to_palette(unique_rgba, palette_rgba)
+
+        delta_e = np.linalg.norm(
+            _composite_on_white_cam02ucs(unique_rgba)
+            - _composite_on_white_cam02ucs(palette_rgba[mapping]),
+            axis=1,
+        )
+        order = np.argsort(delta_e)
+        cumulative_fraction = np.cumsum(counts[order]) / counts.sum()
+        percentile_index = np.searchsorted(cumulative_fraction, DELTA_E_PERCENTILE / 100)
+        percentile_delta_e = delta_e[order[min(percentile_index, len(order) - 1)]]
+        if percentile_delta_e > max_delta_e:
+            logger.warning(
+                "Keeping %s as an RGBA PNG: the %sth percentile pixel error of the indexed "
+                "palette would be %.2f delta E, which exceeds %.2f.",
+                filepath,
+                DELTA_E_PERCENTILE,
+                percentile_delta_e,
+                max_delta_e,
+            )
+            return False
+
+    indices = mapping[inverse.ravel()].reshape(height, width)
+    indexed_image = Image.frombytes("P", (width, height), indices.tobytes())
+    indexed_image.putpalette(palette_rgba[:, :3].tobytes(), rawmode="RGB")
+
+    save_kwargs = {"optimize": True}
+    if dpi is not None:
+        save_kwargs["dpi"] = dpi
+    if (palette_rgba[:, 3] < 255).any():
+        save_kwargs["transparency"] = palette_rgba[:, 3].tobytes()
+    indexed_image.save(filepath, format="PNG", **save_kwargs)
+    return True
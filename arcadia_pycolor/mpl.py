@@ -1,26 +1,42 @@
+import gzip
+import io
 import logging
+import os
 import re
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Literal, cast
 
 import matplotlib as mpl
 import matplotlib.font_manager as font_manager
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib import colormaps as mpl_colormaps
+from matplotlib.artist import Artist
 from matplotlib.axis import XAxis, YAxis
 from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.collections import Collection, QuadMesh
+from matplotlib.figure import Figure
+from matplotlib.image import AxesImage, FigureImage
 from matplotlib.legend import Legend
 from matplotlib.lines import Line2D
 from matplotlib.offsetbox import DrawingArea
 from matplotlib.pyplot import Axes  # type: ignore
 from matplotlib.transforms import Bbox  # type: ignore
+from numpy.typing import NDArray
 
 import arcadia_pycolor.colors as colors
 import arcadia_pycolor.gradients
 import arcadia_pycolor.palettes
-from arcadia_pycolor.gradient import Gradient
+from arcadia_pycolor.export_cache import ExportCache
+from arcadia_pycolor.gradient import DEFAULT_CHUNK_ELEMENTS, Gradient
+from arcadia_pycolor.indexed_png import convert_to_indexed_png
+from arcadia_pycolor.norms import EqualizeNorm, LinearNorm, LogNorm, Norm
 from arcadia_pycolor.palette import Palette
+from arcadia_pycolor.sketch import QuantileSketch
 from arcadia_pycolor.style_defaults import (
     ARCADIA_MATPLOTLIB_RC_PARAMS,
     BASE_DPI,
@@ -36,6 +52,7 @@ from arcadia_pycolor.style_defaults import (
     PRINT_DPI,
     FigureSize,
 )
+from arcadia_pycolor.utils import chunked_min_max, iter_chunk_slices
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +80,24 @@ LEGEND_PARAMS = dict(
 SAVEFIG_KWARGS_WEB = dict(dpi=BASE_DPI, pad_inches=FIGURE_PADDING_INCHES)
 SAVEFIG_KWARGS_PRINT = dict(dpi=PRINT_DPI, pad_inches=FIGURE_PADDING_INCHES)
 
+# A fixed salt for the IDs of SVG elements, which are otherwise randomized on every export.
+DETERMINISTIC_SVG_HASHSALT = "arcadia-pycolor"
+
+# The names of the ways in which `density_scatter` can map counts to colors.
+DENSITY_NORMS = ("eq_hist", "log", "linear")
+
+# The metadata that embeds timestamps or tool versions in each filetype.
+# Keys set to None are removed from the export; the PostScript Creator cannot be removed,
+# so it is pinned instead.
+DETERMINISTIC_METADATA: dict[str, dict[str, str | None]] = {
+    "eps": {"Creator": "Matplotlib"},
+    "pdf": {"CreationDate": None, "Creator": None, "ModDate": None, "Producer": None},
+    "png": {"Software": None},
+    "ps": {"Creator": "Matplotlib"},
+    "svg": {"Creator": None, "Date": None},
+    "svgz": {"Creator": None, "Date": None},
+}
+
 
 def _try_get_current_axes(axes: Axes | None = None) -> Axes:
     """Returns the current axes using `plt.gca()` if no axes are provided.
@@ -168,14 +203,150 @@ def _fix_svg_fonts_for_illustrator(filename: str) -> None:
         f.write(new_content)
 
 
+@contextmanager
+def _deterministic_export() -> Iterator[None]:
+    """Pins the SVG element IDs and any export timestamps within the context.
+
+    Timestamps that matplotlib cannot omit (e.g., the PostScript CreationDate) are pinned
+    to the Unix epoch using the `SOURCE_DATE_EPOCH` environment variable. See
+    https://reproducible-builds.org/specs/source-date-epoch/.
+    """
+    previous_source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    os.environ["SOURCE_DATE_EPOCH"] = "0"
+    try:
+        with mpl.rc_context({"svg.hashsalt": DETERMINISTIC_SVG_HASHSALT}):
+            yield
+    finally:
+        if previous_source_date_epoch is None:
+            del os.environ["SOURCE_DATE_EPOCH"]
+        else:
+            os.environ["SOURCE_DATE_EPOCH"] = previous_source_date_epoch
+
+
+def _deterministic_metadata(filetype: str, metadata: dict[str, Any] | None) -> dict[str, Any]:
+    """Returns the metadata for a deterministic export, with user-provided keys taking priority.
+
+    The keys are sorted so that the metadata is always written in the same order.
+    """
+    merged_metadata = {**DETERMINISTIC_METADATA[filetype], **(metadata or {})}
+    return dict(sorted(merged_metadata.items()))
+
+
+def _normalize_gzip_header(filename: str) -> None:
+    """Recompresses a gzip file (e.g., an SVGZ export) without a timestamp or filename."""
+    with open(filename, "rb") as f:
+        content = gzip.decompress(f.read())
+
+    with (
+        open(filename, "wb") as f,
+        gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0) as gzip_file,
+    ):
+        gzip_file.write(content)
+
+
+@dataclass
+class DenseArtist:
+    """An artist with more drawn elements than a rasterization threshold.
+
+    Attributes:
+        artist (Artist): The matplotlib artist.
+        num_elements (int): The number of markers, paths, vertices, or pixels in the artist.
+    """
+
+    artist: Artist
+    num_elements: int
+
+    def __str__(self) -> str:
+        label = self.artist.get_label()
+        return f"{type(self.artist).__name__} {label!r} ({self.num_elements:,} elements)"
+
+
+def _count_artist_elements(artist: Artist) -> int:
+    """Returns the number of elements (markers, paths, vertices, or pixels) an artist draws."""
+    if isinstance(artist, QuadMesh):
+        # Avoid `get_paths`, which builds a path for every cell of the mesh.
+        coordinates = artist.get_coordinates()
+        return (coordinates.shape[0] - 1) * (coordinates.shape[1] - 1)
+    if isinstance(artist, Collection):
+        return max(len(artist.get_offsets()), len(artist.get_paths()))
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())  # type: ignore
+    if isinstance(artist, AxesImage | FigureImage):
+        array = artist.get_array()
+        return 0 if array is None else array.shape[0] * array.shape[1]
+    return 0
+
+
+def find_dense_artists(figure: Figure | None = None, threshold: int = 50_000) -> list[DenseArtist]:
+    """Returns the data artists in a figure that draw more than `threshold` elements.
+
+    Only collections (e.g., scatter plots and meshes), lines, and images are considered,
+    so text, axes, and legends are never reported.
+
+    Args:
+        figure (Figure, optional): The figure to inspect. If None, uses the current figure.
+        threshold (int): The number of elements above which an artist is considered dense.
+    """
+    figure = plt.gcf() if figure is None else figure
+
+    artists: list[Artist] = list(figure.images)
+    for ax in figure.axes:
+        artists.extend([*ax.collections, *ax.lines, *ax.images])
+
+    dense_artists = [DenseArtist(artist, _count_artist_elements(artist)) for artist in artists]
+    return [dense_artist for dense_artist in dense_artists if dense_artist.num_elements > threshold]
+
+
+@contextmanager
+def _rasterize_dense_artists(figure: Figure, threshold: int | None) -> Iterator[None]:
+    """Rasterizes the dense artists in a figure within the context.
+
+    Rasterized artists are drawn at the savefig dpi when exporting to vector formats.
+    """
+    if threshold is None:
+        yield
+        return
+
+    dense_artists = find_dense_artists(figure, threshold)
+    was_rasterized = [dense_artist.artist.get_rasterized() for dense_artist in dense_artists]
+    for dense_artist in dense_artists:
+        logger.info("Rasterizing %s.", dense_artist)
+        dense_artist.artist.set_rasterized(True)
+
+    try:
+        yield
+    finally:
+        for dense_artist, rasterized in zip(dense_artists, was_rasterized, strict=True):
+            dense_artist.artist.set_rasterized(rasterized)
+
+
+def _figure_spec(figure: Figure) -> bytes:
+    """Returns a canonical serialization of a figure for use as an export cache key.
+
+    The figure is rendered to an in-memory SVG with pinned element IDs and no timestamps,
+    so that identical figures produce identical bytes and any visible change, including
+    to tick labels and legends, changes the key.
+    """
+    buffer = io.BytesIO()
+    with _deterministic_export():
+        figure.savefig(buffer, format="svg", metadata=DETERMINISTIC_METADATA["svg"])
+    return buffer.getvalue()
+
+
 def save_figure(
     filepath: str,
     size: FigureSize,
     filetypes: list[str] | None = None,
     context: Literal["web", "print"] = "web",
+    figure: Figure | None = None,
+    cache: ExportCache | None = None,
+    deterministic: bool = False,
+    rasterize_above: int | None = None,
+    indexed_png: bool = False,
+    cache_key: str | None = None,
     **savefig_kwargs: Any,
 ) -> None:
-    """Saves the current figure to a file using Arcadia's margin, padding, and dpi settings.
+    """Saves a figure to a file using Arcadia's margin, padding, and dpi settings.
 
     Args:
         filepath (str): Path to save the figure to.
@@ -190,6 +361,25 @@ def save_figure(
             'raw', 'rgba', 'svg', 'svgz', 'tif', 'tiff', 'webp'. Invalid filetypes
             are skipped with a warning.
         context (str): The context to save the figure in, either 'web' or 'print'.
+        figure (Figure, optional): The figure to save. If None, the current figure is saved.
+        cache (ExportCache, optional): An export cache. If provided, any filetype whose
+            export is already in the cache is restored from it instead of being rendered.
+            Unless `cache_key` is given, the key is computed from an in-memory SVG rendering
+            of the figure, which costs about as much as an SVG export.
+        deterministic (bool): Whether to make the exports byte-for-byte reproducible.
+            If True, SVG element IDs use a fixed salt, timestamps and tool versions are
+            removed from (or pinned in) the file metadata, and the metadata is sorted.
+        rasterize_above (int, optional): If provided, collections, lines, and images that
+            draw more than this many elements are rasterized at the export dpi, while text,
+            axes, and legends remain vectors. Each rasterized artist is logged at the INFO
+            level; use `find_dense_artists` to inspect them beforehand.
+        indexed_png (bool): Whether to convert PNG exports to indexed PNGs whose palette is
+            seeded with the Arcadia colors in the figure. This typically makes web exports
+            several times smaller. See `indexed_png.convert_to_indexed_png` for details.
+        cache_key (str, optional): A key that identifies the content of the figure, such as
+            a hash of its data and of the code that plots it, to use for `cache` instead of
+            rendering the figure. This makes cache hits cheap for figures with many points,
+            but the caller must change the key whenever the figure changes.
         **savefig_kwargs: Additional keyword arguments to pass to `plt.savefig`.
 
     Note:
@@ -244,11 +434,48 @@ def save_figure(
             f"No valid filetypes to write. Valid filetypes are: {', '.join(valid_filetypes)}."
         )
 
-    for ftype in filetypes_to_write:
-        plt.savefig(fname=f"{filename}.{ftype}", **kwargs)
+    figure = plt.gcf() if figure is None else figure
+    figure_spec = b""
+    if cache is not None:
+        figure_spec = _figure_spec(figure) if cache_key is None else cache_key.encode()
+
+    with _rasterize_dense_artists(figure, rasterize_above):
+        for ftype in filetypes_to_write:
+            output_filepath = f"{filename}.{ftype}"
+
+            entry_key = None
+            if cache is not None:
+                entry_key = cache.key(
+                    figure_spec,
+                    size=size,
+                    context=context,
+                    filetype=ftype,
+                    savefig_kwargs=kwargs,
+                    deterministic=deterministic,
+                    rasterize_above=rasterize_above,
+                    indexed_png=indexed_png,
+                    matplotlib=mpl.__version__,
+                )
+                if cache.restore(entry_key, output_filepath):
+                    continue
+
+            ftype_kwargs = kwargs
+            if deterministic and ftype in DETERMINISTIC_METADATA:
+                metadata = _deterministic_metadata(ftype, kwargs.get("metadata"))
+                ftype_kwargs = {**kwargs, "metadata": metadata}
+
+            with _deterministic_export() if deterministic else nullcontext():
+                figure.savefig(fname=output_filepath, **ftype_kwargs)
 
-        if ftype == "svg":
-            _fix_svg_fonts_for_illustrator(f"{filename}.{ftype}")
+            if ftype == "svg":
+                _fix_svg_fonts_for_illustrator(output_filepath)
+            if ftype == "svgz" and deterministic:
+                _normalize_gzip_header(output_filepath)
+            if ftype == "png" and indexed_png:
+                convert_to_indexed_png(output_filepath)
+
+            if cache is not None and entry_key is not None:
+                cache.store(entry_key, output_filepath)
 
 
 def set_yticklabel_font(
@@ -604,6 +831,153 @@ def add_legend_line(legend: Legend, linewidth: float = LEGEND_SEPARATOR_LINEWIDT
         entries.insert(0, line_area)
 
 
+def _bin_points(
+    x: NDArray,
+    y: NDArray,
+    bins: tuple[int, int],
+    x_range: tuple[float, float],
+    y_range: tuple[float, float],
+) -> NDArray[np.int64]:
+    """Returns the number of points in each bin of a grid, with shape (y bins, x bins).
+
+    The points are binned in chunks with `np.bincount`, which is much faster than
+    `np.histogram2d` for evenly spaced bins. Points outside of the ranges are ignored,
+    and points on the upper edges are counted in the last bins, as in `np.histogram2d`.
+    """
+    num_x_bins, num_y_bins = bins
+    counts = np.zeros(num_x_bins * num_y_bins, dtype=np.int64)
+    x_scale = num_x_bins / (x_range[1] - x_range[0])
+    y_scale = num_y_bins / (y_range[1] - y_range[0])
+    for chunk in iter_chunk_slices(len(x), DEFAULT_CHUNK_ELEMENTS):
+        x_chunk, y_chunk = x[chunk], y[chunk]
+        # NaN coordinates fail both comparisons, so points with NaN coordinates are dropped.
+        is_inside = (
+            (x_chunk >= x_range[0])
+            & (x_chunk <= x_range[1])
+            & (y_chunk >= y_range[0])
+            & (y_chunk <= y_range[1])
+        )
+        # Rounding can place points at the upper edges slightly beyond the last bins.
+        x_positions = ((x_chunk[is_inside] - x_range[0]) * x_scale).astype(np.intp)
+        y_positions = ((y_chunk[is_inside] - y_range[0]) * y_scale).astype(np.intp)
+        indices = np.minimum(y_positions, num_y_bins - 1) * num_x_bins
+        indices += np.minimum(x_positions, num_x_bins - 1)
+        counts += np.bincount(indices, minlength=len(counts))
+    return counts.reshape(num_y_bins, num_x_bins)
+
+
+def _density_norm(norm: str | Norm, counts: NDArray[np.int64]) -> Norm:
+    """Returns the norm that maps the non-zero counts of a density scatter plot to colors."""
+    if isinstance(norm, Norm):
+        return norm
+    if norm not in DENSITY_NORMS:
+        raise ValueError(f"Invalid norm '{norm}'. Choose from {', '.join(DENSITY_NORMS)}.")
+
+    nonzero_counts = counts[counts > 0]
+    if not len(nonzero_counts) or nonzero_counts.min() == nonzero_counts.max():
+        # A single count can't be spread over the gradient, so it gets the last color.
+        return LinearNorm(0, max(int(counts.max()), 1))
+    if norm == "log":
+        return LogNorm(1, float(nonzero_counts.max()))
+    if norm == "eq_hist":
+        return EqualizeNorm(QuantileSketch().update(nonzero_counts))
+    return LinearNorm(0, float(nonzero_counts.max()))
+
+
+def density_scatter(
+    ax: Axes | None,
+    x: Any,
+    y: Any,
+    gradient: Gradient | None = None,
+    bins: int | tuple[int, int] | None = None,
+    norm: str | Norm = "eq_hist",
+    x_range: tuple[float, float] | None = None,
+    y_range: tuple[float, float] | None = None,
+    **imshow_kwargs: Any,
+) -> AxesImage:
+    """Draws a scatter plot of many points as an image of the density of the points.
+
+    The points are counted in a fixed grid of bins, the counts are mapped to colors through
+    the lookup table of a gradient, and the colors are drawn with a single `imshow`.
+    Unlike `ax.scatter`, the time to draw, style, and save the plot, and the size of
+    vector exports, don't depend on the number of points. Bins without points are
+    transparent, or the bad color of the gradient if it has one.
+
+    Example:
+    >>> fig, ax = plt.subplots()
+    >>> apc.mpl.density_scatter(ax, df["umap_1"], df["umap_2"], gradient=apc.gradients.viridis)
+    >>> apc.mpl.style_plot(ax)
+    >>> apc.mpl.save_figure("umap.pdf", size="half_square")
+
+    Args:
+        ax (Axes, optional): The axes to draw on. If None, uses the current axes.
+        x: The x coordinates of the points. Points with a NaN coordinate are ignored.
+            If there are no points with finite coordinates, the plot is empty.
+        y: The y coordinates of the points, with the same length as `x`.
+        gradient (Gradient, optional): The gradient that the counts are mapped through.
+            If None, `gradients.magma`, the default colormap of images.
+        bins (int or tuple[int, int], optional): The number of bins along the x and y axes,
+            or along both if an int. If None, one bin per pixel of the axes.
+        norm (str or Norm): How the counts are mapped to the gradient: 'eq_hist' equalizes
+            the histogram of the counts so that every color is used about equally often,
+            'log' maps them on a logarithmic scale, and 'linear' maps them linearly.
+            A norm from `arcadia_pycolor.norms` can also be given.
+        x_range (tuple[float, float], optional): The range of x coordinates to bin.
+            If None, the range of the finite x coordinates.
+        y_range (tuple[float, float], optional): The range of y coordinates to bin.
+            If None, the range of the finite y coordinates.
+        **imshow_kwargs: Additional keyword arguments to pass to `ax.imshow`,
+            such as `zorder` or `alpha`.
+
+    Returns:
+        AxesImage: The image of the densities.
+
+    Raises:
+        ValueError: If `x` and `y` have different lengths, if `bins` is not positive,
+            if a range is reversed or not finite, or if `norm` is invalid.
+    """
+    ax = _try_get_current_axes(ax)
+    x = np.ma.filled(np.ma.asarray(x, dtype=np.float64), np.nan).ravel()
+    y = np.ma.filled(np.ma.asarray(y, dtype=np.float64), np.nan).ravel()
+    if len(x) != len(y):
+        raise ValueError(f"x and y must have the same length, got {len(x)} and {len(y)}.")
+
+    if bins is None:
+        # One bin per pixel of the axes at the figure's resolution.
+        bbox = ax.get_window_extent()
+        bins = (max(1, round(bbox.width)), max(1, round(bbox.height)))
+    elif isinstance(bins, int):
+        bins = (bins, bins)
+    if min(bins) < 1:
+        raise ValueError("bins must be positive.")
+
+    if x_range is None or y_range is None:
+        # Only points with two finite coordinates are drawn, so only they set the ranges.
+        is_finite = np.isfinite(x) & np.isfinite(y)
+        if not is_finite.any():
+            # Without such points, the plot is empty and has matplotlib's default limits.
+            x_range = (0.0, 1.0) if x_range is None else x_range
+            y_range = (0.0, 1.0) if y_range is None else y_range
+        x_range = chunked_min_max([x[is_finite]]) if x_range is None else x_range
+        y_range = chunked_min_max([y[is_finite]]) if y_range is None else y_range
+    x_range = (float(x_range[0]), float(x_range[1]))
+    y_range = (float(y_range[0]), float(y_range[1]))
+    for name, (low, high) in (("x_range", x_range), ("y_range", y_range)):
+        if not (np.isfinite(low) and np.isfinite(high) and low <= high):
+            raise ValueError(f"{name} must be finite and increasing, got ({low}, {high}).")
+    # Expand empty ranges, such as the range of a single point, so that they can be binned.
+    x_range = (x_range[0] - 0.5, x_range[1] + 0.5) if x_range[0] == x_range[1] else x_range
+    y_range = (y_range[0] - 0.5, y_range[1] + 0.5) if y_range[0] == y_range[1] else y_range
+
+    counts = _bin_points(x, y, bins, x_range, y_range)
+    gradient = arcadia_pycolor.gradients.magma if gradient is None else gradient
+    positions = np.where(counts > 0, counts, np.nan)
+    rgba = gradient.map_array(positions, norm=_density_norm(norm, counts))
+
+    imshow_kwargs = {"interpolation": "nearest", "aspect": "auto", **imshow_kwargs}
+    return ax.imshow(rgba, origin="lower", extent=(*x_range, *y_range), **imshow_kwargs)
+
+
 def load_colors() -> None:
     """Loads Arcadia's colors into the matplotlib list of named colors with the prefix 'apc:'."""
     colors = {
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from arcadia_pycolor.gradient import Gradient
+from arcadia_pycolor.norms import LinearNorm, Norm
+from arcadia_pycolor.utils import iter_chunk_slices
+
+# The ways in which the colors of the channels can be combined.
+BLEND_MODES = ("additive", "max")
+
+# The default height and width of the tiles that are composited at once.
+DEFAULT_TILE_SIZE = 1024
+
+
+class _ConstantNorm(Norm):
+    """Maps every value to the start of the gradient, like `matplotlib.colors.Normalize` does
+    when `vmin` equals `vmax`. NaN values are still mapped to NaN.
+    """
+
+    def validate(self) -> None:
+        """Checks that the norm has a range, which may be empty.
+
+        Raises:
+            ValueError: If `vmin` or `vmax` is not set.
+        """
+        if not self.scaled:
+            raise ValueError("vmin and vmax must be set before mapping values.")
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        # The mask is computed first, since `out` may be `values` itself.
+        is_nan = np.isnan(values)
+        out.fill(0)
+        out[is_nan] = np.nan
+        return out
+
+
+def _composite_tile(
+    channels: Sequence[Any],
+    gradients: Sequence[Gradient],
+    norms: Sequence[Norm],
+    blend: str,
+    out: NDArray[np.uint8],
+    rows: slice,
+    cols: slice,
+) -> None:
+    """Composites one tile of the channels into `out[rows, cols]`."""
+    tile_shape = (rows.stop - rows.start, cols.stop - cols.start)
+    # The RGBA colors of each channel are mapped into the same buffer, one at a time.
+    colors = np.empty((*tile_shape, 4), dtype=np.uint8)
+    if blend == "additive":
+        # The sum of 8-bit colors is accumulated in the smallest type that can't overflow,
+        # which is 16 bits for up to 257 channels.
+        total = np.zeros((*tile_shape, 3), dtype=np.min_scalar_type(255 * len(channels)))
+        for channel, gradient, norm in zip(channels, gradients, norms, strict=True):
+            gradient.map_array(channel[rows, cols], norm=norm, out=colors)
+            total += colors[..., :3]
+        np.minimum(total, 255, out=total)
+    else:
+        total = np.zeros((*tile_shape, 3), dtype=np.uint8)
+        for channel, gradient, norm in zip(channels, gradients, norms, strict=True):
+            gradient.map_array(channel[rows, cols], norm=norm, out=colors)
+            np.maximum(total, colors[..., :3], out=total)
+    out[rows, cols] = total
+
+
+def composite(
+    channels: Any,
+    gradients: Sequence[Gradient],
+    norms: Sequence[Norm | None] | None = None,
+    blend: str = "additive",
+    out: NDArray[np.uint8] | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    workers: int = 1,
+) -> NDArray[np.uint8]:
+    """Renders a multichannel image by mapping each channel through a gradient and blending.
+
+    This is how fluorescence microscopy images are usually displayed, with each channel
+    mapped from black to a color. The image is composited tile by tile: each channel of a
+    tile is mapped through the lookup table of its gradient and blended into an 8-bit tile,
+    so the working memory only depends on `tile_size` and `workers`, not on the size of the
+    image. The channels can be memmaps (for example, of uint16 or float32 images) that are
+    larger than memory, and `out` can be a memmap too.
+
+    The alpha of the gradient colors is ignored, so NaN and masked values, which are
+    transparent black by default, don't contribute to the image.
+
+    Example:
+    >>> import numpy as np
+    >>> import arcadia_pycolor as apc
+    >>> stack = np.load("stack.npy", mmap_mode="r")  # Shape (channels, height, width).
+    >>> gradients = [apc.Gradient(f"black_{c.name}", [apc.black, c]) for c in colors]
+    >>> out = np.lib.format.open_memmap("rgb.npy", "w+", np.uint8, (*stack.shape[1:], 3))
+    >>> apc.multichannel.composite(stack, gradients, out=out, workers=4)
+
+    Args:
+        channels: The 2D channels, as a sequence of arrays or an array of shape
+            (channels, height, width). Each channel must support slicing in two dimensions.
+        gradients (Sequence[Gradient]): The gradient of each channel.
+        norms (Sequence[Norm or None], optional): The norm of each channel, such as a
+            `PercentileNorm` to saturate the brightest pixels. A channel without a norm, or
+            whose norm has no range, is mapped over the range of its values, computed in
+            a first pass over the channel. A channel whose range is empty, such as a blank
+            channel, is mapped to the first color of its gradient.
+        blend (str): How to combine the colors of the channels. 'additive' adds them and
+            clips the sum to 255, and 'max' takes the maximum of each color component.
+        out (NDArray, optional): A uint8 array of shape (height, width, 3) to write into.
+        tile_size (int): The height and width of the tiles that are composited at once.
+        workers (int): The number of threads that composite tiles in parallel.
+
+    Returns:
+        NDArray: The RGB image, with shape (height, width, 3).
+
+    Raises:
+        ValueError: If the channels are not 2D arrays of the same shape, if the numbers of
+            channels, gradients, and norms differ, if `blend` is invalid,
+            or if `out` has the wrong shape.
+    """
+    if blend not in BLEND_MODES:
+        raise ValueError(f"Invalid blend '{blend}'. Choose from {', '.join(BLEND_MODES)}.")
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive.")
+
+    num_channels = len(channels)
+    if len(gradients) != num_channels:
+        raise ValueError(
+            f"The number of gradients ({len(gradients)}) must match "
+            f"the number of channels ({num_channels})."
+        )
+    if norms is None:
+        norms = [None] * num_channels
+    elif len(norms) != num_channels:
+        raise ValueError(
+            f"The number of norms ({len(norms)}) must match "
+            f"the number of channels ({num_channels})."
+        )
+
+    channels = [channels[index] for index in range(num_channels)]
+    shapes = {tuple(channel.shape) for channel in channels}
+    if len(shapes) != 1 or len(next(iter(shapes))) != 2:
+        raise ValueError(f"The channels must be 2D arrays of the same shape, got {shapes}.")
+    height, width = next(iter(shapes))
+
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    elif tuple(out.shape) != (height, width, 3) or out.dtype != np.uint8:
+        raise ValueError(
+            f"out must be a uint8 array of shape {(height, width, 3)}, got {out.dtype} {out.shape}."
+        )
+
+    row_slices = list(iter_chunk_slices(height, tile_size))
+    resolved_norms: list[Norm] = []
+    for channel, norm in zip(channels, norms, strict=True):
+        norm = LinearNorm() if norm is None else norm
+        if not norm.scaled:
+            norm.autoscale_chunks(channel[rows] for rows in row_slices)
+        if norm.vmin == norm.vmax:
+            # Blank and constant channels are common, so they are drawn in the first color
+            # of their gradient instead of being rejected for their empty range.
+            norm = _ConstantNorm(norm.vmin, norm.vmax)
+        norm.validate()
+        resolved_norms.append(norm)
+
+    tiles = [(rows, cols) for rows in row_slices for cols in iter_chunk_slices(width, tile_size)]
+
+    def composite_tile(tile: tuple[slice, slice]) -> None:
+        _composite_tile(channels, gradients, resolved_norms, blend, out, *tile)
+
+    if workers == 1:
+        for tile in tiles:
+            composite_tile(tile)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(composite_tile, tiles):
+                pass
+    return out
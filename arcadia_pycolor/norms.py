@@ -0,0 +1,357 @@
+from __future__ import annotations
+import abc
+from collections.abc import Iterable
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from arcadia_pycolor.sketch import QuantileSketch
+from arcadia_pycolor.utils import chunked_min_max
+
+# The number of quantiles of a sketch used by `EqualizeNorm` to approximate the distribution.
+DEFAULT_NUM_KNOTS = 1025
+
+
+def _position_dtype(dtype: np.dtype) -> type[np.floating]:
+    """Returns the dtype of the positions computed from values of the given dtype.
+
+    Single- and half-precision values, and 8- and 16-bit integers such as microscopy images,
+    are normalized in single precision, which represents them exactly, halves the memory
+    traffic, and is more than precise enough to index a lookup table.
+    """
+    if dtype in (np.float16, np.float32, np.uint8, np.int8, np.uint16, np.int16):
+        return np.float32
+    return np.float64
+
+
+class Norm(abc.ABC):
+    """The base class of norms, which map data values to positions along a gradient.
+
+    Positions from 0 to 1 span the gradient. Values below `vmin` or above `vmax` are mapped
+    to positions below 0 or above 1, respectively, and NaN values are mapped to NaN.
+    Subclasses implement `_transform`.
+
+    Attributes:
+        vmin (float or None): The value mapped to the start of the gradient.
+        vmax (float or None): The value mapped to the end of the gradient.
+    """
+
+    def __init__(self, vmin: float | None = None, vmax: float | None = None):
+        self.vmin = vmin
+        self.vmax = vmax
+
+    @property
+    def scaled(self) -> bool:
+        """Returns whether both `vmin` and `vmax` are set."""
+        return self.vmin is not None and self.vmax is not None
+
+    def autoscale(self, min_value: float, max_value: float) -> None:
+        """Sets `vmin` and `vmax` to the range of the data, if they are not already set."""
+        if self.vmin is None:
+            self.vmin = float(min_value)
+        if self.vmax is None:
+            self.vmax = float(max_value)
+
+    def autoscale_chunks(self, chunks: Iterable[ArrayLike]) -> None:
+        """Sets `vmin` and `vmax` to the range of the finite values in a sequence of chunks,
+        if they are not already set. Only one chunk is held in memory at a time.
+        """
+        self.autoscale(*chunked_min_max(chunks))
+
+    def validate(self) -> None:
+        """Checks that the norm can map values.
+
+        Raises:
+            ValueError: If `vmin` or `vmax` is not set or `vmin` is not less than `vmax`.
+        """
+        if not self.scaled:
+            raise ValueError("vmin and vmax must be set before mapping values.")
+        if self.vmin >= self.vmax:  # type: ignore
+            raise ValueError(
+                f"max_value ({self.vmax}) must be greater than min_value ({self.vmin})."
+            )
+
+    def __call__(self, values: ArrayLike, out: NDArray[np.floating] | None = None) -> NDArray:
+        """Returns the positions of values along the gradient.
+
+        Args:
+            values (ArrayLike): The values.
+            out (NDArray, optional): A floating-point array with the shape of `values` to write
+                the positions into. It may be `values` itself, to normalize in place.
+                If None, a new array is allocated, which is single-precision if the values are.
+        """
+        values = np.asarray(values)
+        if out is None:
+            out = np.empty(values.shape, dtype=_position_dtype(values.dtype))
+        return self._transform(values, out)
+
+    @abc.abstractmethod
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        """Writes the positions of `values` into `out`, which may be `values` itself."""
+
+
+class LinearNorm(Norm):
+    """Maps values linearly from [vmin, vmax] to [0, 1]."""
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        np.subtract(values, self.vmin, out=out, dtype=out.dtype)
+        np.divide(out, self.vmax - self.vmin, out=out)  # type: ignore
+        return out
+
+
+class LogNorm(Norm):
+    """Maps values linearly on a logarithmic scale from [vmin, vmax] to [0, 1].
+
+    This is equivalent to `matplotlib.colors.LogNorm`. Non-positive values are mapped to NaN,
+    and so to the bad color of the gradient.
+    """
+
+    def autoscale_chunks(self, chunks: Iterable[ArrayLike]) -> None:
+        """Sets `vmin` and `vmax` to the range of the positive finite values in the chunks,
+        if they are not already set.
+        """
+        self.autoscale(
+            *chunked_min_max(chunk[chunk > 0] for chunk in map(np.ma.compressed, chunks))
+        )
+
+    def validate(self) -> None:
+        """Checks that the norm can map values.
+
+        Raises:
+            ValueError: If the range is invalid or `vmin` is not positive.
+        """
+        super().validate()
+        if self.vmin <= 0:  # type: ignore
+            raise ValueError(f"vmin ({self.vmin}) must be positive for a logarithmic norm.")
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        log_vmin = np.log(self.vmin)
+        # The mask is computed first, since `out` may be `values` itself.
+        is_invalid = values <= 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.log(values, out=out, dtype=out.dtype)
+        out[is_invalid] = np.nan
+        np.subtract(out, log_vmin, out=out)
+        np.multiply(out, 1 / (np.log(self.vmax) - log_vmin), out=out)
+        return out
+
+
+class SymLogNorm(Norm):
+    """Maps values on a symmetric logarithmic scale, which is linear around zero.
+
+    This is equivalent to `matplotlib.colors.SymLogNorm`, and suits values such as
+    fold changes that span several orders of magnitude in both directions.
+    """
+
+    def __init__(
+        self,
+        linthresh: float,
+        linscale: float = 1.0,
+        vmin: float | None = None,
+        vmax: float | None = None,
+        base: float = 10,
+    ):
+        """Initializes a SymLogNorm.
+
+        Args:
+            linthresh (float): The range (-linthresh, linthresh) within which the scale is linear.
+            linscale (float): The length of the linear range, in numbers of decades.
+            vmin (float, optional): The value mapped to the start of the gradient.
+            vmax (float, optional): The value mapped to the end of the gradient.
+            base (float): The base of the logarithm.
+
+        Raises:
+            ValueError: If `linthresh` is not positive.
+        """
+        if linthresh <= 0:
+            raise ValueError("linthresh must be positive.")
+
+        super().__init__(vmin, vmax)
+        self.linthresh = linthresh
+        self.linscale = linscale
+        self.base = base
+        self._linscale_adjusted = linscale / (1 - 1 / base)
+
+    def _symlog(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        """Applies the symmetric logarithm to values, before rescaling."""
+        # The signs are saved first, since `out` may be `values` itself.
+        is_negative = np.signbit(values)
+        np.abs(values, out=out, dtype=out.dtype)
+        is_linear = out <= self.linthresh
+        linear_part = out[is_linear] * self._linscale_adjusted
+        with np.errstate(divide="ignore"):
+            np.divide(out, self.linthresh, out=out)
+            np.log(out, out=out)
+        np.multiply(out, self.linthresh / np.log(self.base), out=out)
+        np.add(out, self.linthresh * self._linscale_adjusted, out=out)
+        out[is_linear] = linear_part
+        np.negative(out, out=out, where=is_negative)
+        return out
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        symlog_vmin, symlog_vmax = self._symlog(np.array([self.vmin, self.vmax]), np.empty(2))
+        self._symlog(values, out)
+        np.subtract(out, symlog_vmin, out=out)
+        np.multiply(out, 1 / (symlog_vmax - symlog_vmin), out=out)
+        return out
+
+
+class PowerNorm(Norm):
+    """Maps values linearly from [vmin, vmax] to [0, 1], then raises them to a power.
+
+    This is equivalent to `matplotlib.colors.PowerNorm`, except that values below `vmin`
+    are mapped to the under color of the gradient rather than to the first color.
+    """
+
+    def __init__(self, gamma: float, vmin: float | None = None, vmax: float | None = None):
+        """Initializes a PowerNorm.
+
+        Args:
+            gamma (float): The power to raise the linearly normalized values to.
+            vmin (float, optional): The value mapped to the start of the gradient.
+            vmax (float, optional): The value mapped to the end of the gradient.
+        """
+        super().__init__(vmin, vmax)
+        self.gamma = gamma
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        np.subtract(values, self.vmin, out=out, dtype=out.dtype)
+        np.multiply(out, 1 / (self.vmax - self.vmin), out=out)  # type: ignore
+        # Negative positions stay negative, so they are still mapped to the under color.
+        np.power(out, self.gamma, out=out, where=out > 0)
+        return out
+
+
+class TwoSlopeNorm(Norm):
+    """Maps values linearly from [vmin, vcenter] to [0, 0.5] and from [vcenter, vmax] to [0.5, 1].
+
+    This is equivalent to `matplotlib.colors.TwoSlopeNorm`, and centers diverging gradients
+    such as `gradients.red_blue` on a value of interest even if the range is asymmetric.
+    """
+
+    def __init__(self, vcenter: float, vmin: float | None = None, vmax: float | None = None):
+        """Initializes a TwoSlopeNorm.
+
+        Args:
+            vcenter (float): The value mapped to the center of the gradient.
+            vmin (float, optional): The value mapped to the start of the gradient.
+            vmax (float, optional): The value mapped to the end of the gradient.
+        """
+        super().__init__(vmin, vmax)
+        self.vcenter = vcenter
+
+    def autoscale(self, min_value: float, max_value: float) -> None:
+        """Sets `vmin` and `vmax` to the range of the data, if they are not already set.
+
+        If the range of the data is on one side of `vcenter`, it is mirrored to the other side.
+        """
+        vmin_is_missing = self.vmin is None
+        vmax_is_missing = self.vmax is None
+        super().autoscale(min_value, max_value)
+        if vmin_is_missing and self.vmin >= self.vcenter:  # type: ignore
+            self.vmin = 2 * self.vcenter - self.vmax  # type: ignore
+        if vmax_is_missing and self.vmax <= self.vcenter:  # type: ignore
+            self.vmax = 2 * self.vcenter - self.vmin  # type: ignore
+
+    def validate(self) -> None:
+        """Checks that the norm can map values.
+
+        Raises:
+            ValueError: If the range is not set or the values are not in ascending order.
+        """
+        super().validate()
+        if not self.vmin < self.vcenter < self.vmax:  # type: ignore
+            raise ValueError(
+                f"vmin ({self.vmin}), vcenter ({self.vcenter}), and vmax ({self.vmax}) "
+                "must be in ascending order."
+            )
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        np.subtract(values, self.vcenter, out=out, dtype=out.dtype)
+        is_below = out < 0
+        np.multiply(out, 0.5 / (self.vcenter - self.vmin), out=out, where=is_below)  # type: ignore
+        np.multiply(out, 0.5 / (self.vmax - self.vcenter), out=out, where=~is_below)  # type: ignore
+        np.add(out, 0.5, out=out)
+        return out
+
+
+class PercentileNorm(LinearNorm):
+    """Maps values linearly between two percentiles of their distribution.
+
+    This is robust to outliers, which would otherwise squeeze most values into a narrow
+    part of the gradient. The percentiles are estimated from a `QuantileSketch`, so they
+    can be computed in one pass over data that is larger than memory.
+
+    Example:
+    >>> sketch = apc.sketch.QuantileSketch.from_chunks(chunks)
+    >>> norm = apc.norms.PercentileNorm(sketch, lower=1, upper=99)
+    >>> colors = apc.gradients.viridis.map_chunks(chunks, norm=norm)
+    """
+
+    def __init__(self, sketch: QuantileSketch, lower: float = 1.0, upper: float = 99.0):
+        """Initializes a PercentileNorm.
+
+        Args:
+            sketch (QuantileSketch): A sketch of the values to map.
+            lower (float): The percentile mapped to the start of the gradient, from 0 to 100.
+            upper (float): The percentile mapped to the end of the gradient, from 0 to 100.
+
+        Raises:
+            ValueError: If the percentiles are not between 0 and 100 or `lower` is not less
+                than `upper`, or if the sketch is empty.
+        """
+        if not 0 <= lower < upper <= 100:
+            raise ValueError("The percentiles must satisfy 0 <= lower < upper <= 100.")
+
+        vmin, vmax = sketch.quantile([lower / 100, upper / 100])
+        super().__init__(float(vmin), float(vmax))
+        self.lower = lower
+        self.upper = upper
+
+
+class EqualizeNorm(Norm):
+    """Maps values to their approximate quantile, which equalizes the histogram of the colors.
+
+    Every part of the gradient is used by about the same number of values, which reveals
+    structure in data with skewed or multimodal distributions. The quantiles are estimated
+    from a `QuantileSketch` and values are mapped by linear interpolation between them.
+
+    Example:
+    >>> sketch = apc.sketch.QuantileSketch.from_chunks(chunks)
+    >>> colors = apc.gradients.viridis.map_array(values, norm=apc.norms.EqualizeNorm(sketch))
+    """
+
+    def __init__(self, sketch: QuantileSketch, num_knots: int = DEFAULT_NUM_KNOTS):
+        """Initializes an EqualizeNorm.
+
+        Args:
+            sketch (QuantileSketch): A sketch of the values to map.
+            num_knots (int): The number of evenly spaced quantiles to interpolate between.
+
+        Raises:
+            ValueError: If `num_knots` is less than 2 or the sketch is empty.
+        """
+        if num_knots < 2:
+            raise ValueError("num_knots must be at least 2.")
+
+        quantiles = np.linspace(0, 1, num_knots)
+        knots = sketch.quantile(quantiles)
+        super().__init__(float(knots[0]), float(knots[-1]))
+
+        # Interpolation requires increasing knots, so ties are merged into one knot
+        # at the mean of their quantiles.
+        self._knots, inverse = np.unique(knots, return_inverse=True)
+        self._quantiles = np.bincount(inverse, weights=quantiles) / np.bincount(inverse)
+
+    def validate(self) -> None:
+        """Checks that the norm can map values.
+
+        Raises:
+            ValueError: If all of the values in the sketch are equal.
+        """
+        if len(self._knots) < 2:
+            raise ValueError("Cannot equalize values that are all equal.")
+
+    def _transform(self, values: NDArray, out: NDArray[np.floating]) -> NDArray[np.floating]:
+        out[...] = np.interp(values, self._knots, self._quantiles, left=-np.inf, right=np.inf)
+        return out
@@ -1,11 +1,214 @@
 from __future__ import annotations
-from typing import overload
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, overload
 
 import matplotlib.colors as mcolors
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
 
+import arcadia_pycolor.colors
+from arcadia_pycolor.colorspace import (
+    pairwise_distances,
+    rgb1_to_cam02ucs,
+    simulate_cvd,
+    to_rgb255,
+)
 from arcadia_pycolor.display import colorize
 from arcadia_pycolor.hexcode import HexCode
 
+# The number of distance matrices kept in memory by `Palette.distance_matrix`.
+DISTANCE_MATRIX_CACHE_SIZE = 256
+
+# The number of levels per sRGB channel of the candidate colors used by
+# `Palette.extend_distinct` when generating colors from the sRGB gamut.
+GAMUT_LEVELS = 32
+
+
+def _perceptual_coordinates(
+    rgb1: NDArray, cvd_types: Sequence[str], severity: float
+) -> NDArray[np.float64]:
+    """Returns the CAM02-UCS coordinates of sRGB colors as seen with each vision type.
+
+    Returns:
+        NDArray: An array of shape (1 + len(cvd_types), N, 3) whose first entry is normal vision.
+    """
+    spaces = [rgb1] + [simulate_cvd(rgb1, cvd_type, severity) for cvd_type in cvd_types]
+    return np.stack([rgb1_to_cam02ucs(space) for space in spaces])
+
+
+@lru_cache(maxsize=DISTANCE_MATRIX_CACHE_SIZE)
+def _distance_matrix(
+    hex_codes: tuple[str, ...], metric: str, cvd: str | None, severity: float
+) -> NDArray[np.float64]:
+    """Returns the read-only distance matrix between colors, cached by the colors' HEX codes."""
+    rgb1 = to_rgb255(list(hex_codes)) / 255
+    if cvd is not None:
+        rgb1 = simulate_cvd(rgb1, cvd, severity)
+
+    distances = pairwise_distances(rgb1, metric=metric)
+    distances.flags.writeable = False
+    return distances
+
+
+def _adjacent_distances(distances: NDArray[np.float64], order: NDArray[np.intp]) -> NDArray:
+    """Returns the distances between consecutive colors of an ordering."""
+    return distances[order[:-1], order[1:]]
+
+
+def _order_score(distances: NDArray[np.float64], order: NDArray[np.intp], objective: str) -> tuple:
+    """Returns a score of an ordering that is larger for better orderings.
+
+    The 'min' objective is the smallest adjacent distance, with ties broken by the sum.
+    """
+    adjacent_distances = _adjacent_distances(distances, order)
+    if objective == "min":
+        return (adjacent_distances.min(), adjacent_distances.sum())
+    return (adjacent_distances.sum(),)
+
+
+def _is_better(score: tuple, other: tuple, tolerance: float = 1e-9) -> bool:
+    """Compares scores lexicographically, ignoring differences due to floating-point noise."""
+    for value, other_value in zip(score, other, strict=True):
+        if value > other_value + tolerance:
+            return True
+        if value < other_value - tolerance:
+            return False
+    return False
+
+
+def _two_opt(
+    distances: NDArray[np.float64], order: NDArray[np.intp], objective: str, deadline: float
+) -> NDArray[np.intp]:
+    """Improves an ordering by reversing segments until no reversal improves it.
+
+    Each step evaluates every segment reversal at once and applies the best one. Reversing the
+    segment from position i to j only replaces the edges (i - 1, i) and (j, j + 1), so the score
+    of every reversal can be computed from the current adjacent distances.
+    """
+    n = len(order)
+    starts, ends = np.triu_indices(n, k=1)
+    # Skip reversing the whole ordering, which doesn't change the score.
+    is_valid = ~((starts == 0) & (ends == n - 1))
+    starts, ends = starts[is_valid], ends[is_valid]
+    has_left_edge = starts > 0
+    has_right_edge = ends < n - 1
+
+    while time.time() < deadline:
+        edges = _adjacent_distances(distances, order)
+        left = np.where(has_left_edge, edges[starts - 1], 0)
+        right = np.where(has_right_edge, edges[np.minimum(ends, n - 2)], 0)
+        new_left = np.where(has_left_edge, distances[order[starts - 1], order[ends]], 0)
+        new_right = np.where(
+            has_right_edge, distances[order[starts], order[np.minimum(ends + 1, n - 1)]], 0
+        )
+        new_sums = edges.sum() - left - right + new_left + new_right
+
+        if objective == "min":
+            # The smallest unchanged edge is among the three smallest edges, since each
+            # reversal removes at most two edges.
+            smallest = np.argsort(edges, kind="stable")[:3]
+            unchanged_min = np.full(len(starts), np.inf)
+            for edge_index in smallest[::-1]:
+                is_unchanged = (edge_index != starts - 1) & (edge_index != ends)
+                unchanged_min = np.where(is_unchanged, edges[edge_index], unchanged_min)
+            new_mins = np.minimum.reduce(
+                [
+                    unchanged_min,
+                    np.where(has_left_edge, new_left, np.inf),
+                    np.where(has_right_edge, new_right, np.inf),
+                ]
+            )
+            best = np.lexsort((new_sums, new_mins))[-1]
+            new_score: tuple = (new_mins[best], new_sums[best])
+        else:
+            best = np.argmax(new_sums)
+            new_score = (new_sums[best],)
+
+        if not _is_better(new_score, _order_score(distances, order, objective)):
+            break
+        order = order.copy()
+        order[starts[best] : ends[best] + 1] = order[starts[best] : ends[best] + 1][::-1]
+    return order
+
+
+def _optimize_order_restart(
+    distances: NDArray[np.float64], objective: str, seed: int | None, deadline: float
+) -> tuple[tuple, list[int]]:
+    """Runs 2-opt from the initial ordering (if `seed` is None) or a random ordering."""
+    order = np.arange(len(distances))
+    if seed is not None:
+        order = np.random.default_rng(seed).permutation(order)
+    order = _two_opt(distances, order, objective, deadline)
+    return _order_score(distances, order, objective), order.tolist()
+
+
+def _factorize(labels: ArrayLike) -> tuple[NDArray[np.intp], list[Any]]:
+    """Returns integer codes for labels and the categories the codes refer to.
+
+    Missing labels (None or NaN) have the code -1. The categories of a pandas Categorical
+    (or a Series with a categorical dtype) are kept in order; otherwise they are sorted,
+    or, like in pandas, kept in order of first appearance if they can't be compared
+    (e.g., a mix of strings and numbers).
+    """
+    categorical = getattr(labels, "cat", labels)
+    if hasattr(categorical, "codes") and hasattr(categorical, "categories"):
+        return np.asarray(categorical.codes, dtype=np.intp), list(categorical.categories)
+
+    label_array = np.asarray(labels)
+    if not isinstance(labels, np.ndarray) and label_array.dtype.kind in "US":
+        # NumPy converts the numbers in a sequence that mixes strings and numbers to strings.
+        label_array = np.array(labels, dtype=object)
+    labels = label_array
+    if labels.dtype.kind == "f":
+        is_missing = np.isnan(labels)
+    elif labels.dtype.kind == "O":
+        # NaN is the only value that is not equal to itself.
+        is_missing = np.equal(labels, None) | (labels != labels)
+    else:
+        is_missing = np.zeros(labels.shape, dtype=bool)
+
+    codes = np.full(labels.shape, -1, dtype=np.intp)
+    if labels.dtype.kind != "O":
+        categories, codes[~is_missing] = np.unique(labels[~is_missing], return_inverse=True)
+        return codes, categories.tolist()
+
+    # Object labels are factorized with a dict, which doesn't require them to be comparable.
+    present_labels = labels[~is_missing].tolist()
+    category_codes: dict[Any, int] = {}
+    present_codes = np.fromiter(
+        (category_codes.setdefault(label, len(category_codes)) for label in present_labels),
+        dtype=np.intp,
+        count=len(present_labels),
+    )
+    object_categories = list(category_codes)
+    try:
+        sorted_codes = sorted(range(len(object_categories)), key=object_categories.__getitem__)
+    except TypeError:
+        sorted_codes = list(range(len(object_categories)))
+    ranks = np.empty(len(sorted_codes), dtype=np.intp)
+    ranks[sorted_codes] = np.arange(len(sorted_codes))
+    codes[~is_missing] = ranks[present_codes]
+    return codes, [object_categories[code] for code in sorted_codes]
+
+
+@dataclass(frozen=True)
+class DistanceSummary:
+    """Summary statistics of the pairwise perceptual distances between the colors of a palette.
+
+    Attributes:
+        min_distance (float): The smallest distance between two colors of the palette.
+        mean_distance (float): The mean distance over all pairs of colors.
+        worst_pair (tuple[HexCode, HexCode]): The least distinct pair of colors.
+    """
+
+    min_distance: float
+    mean_distance: float
+    worst_pair: tuple[HexCode, HexCode]
+
 
 class Palette:
     """A discrete ordered sequence of HexCode objects.
@@ -101,3 +304,359 @@ class Palette:
     def to_mpl_cmap(self) -> mcolors.ListedColormap:
         """Returns a matplotlib colormap for the palette."""
         return mcolors.ListedColormap([color.hex_code for color in self.colors], self.name)
+
+    def map_categories(
+        self,
+        labels: ArrayLike,
+        order: Sequence[Any] | None = None,
+        cycle: bool = True,
+        output: str = "rgba",
+        fallback: str = arcadia_pycolor.colors.chateau,
+    ) -> NDArray:
+        """Maps categorical labels to the colors of the palette.
+
+        The labels are factorized once (using the codes of a pandas Categorical, or
+        `np.unique` or a dict otherwise), and the colors are gathered from a precomputed
+        color array, so mapping millions of labels is fast.
+
+        Example:
+        >>> import arcadia_pycolor as apc
+        >>> colors = apc.palettes.primary.map_categories(df["species"])
+        >>> plt.scatter(df["x"], df["y"], c=colors)
+        >>> go.Scatter(x=df["x"], y=df["y"], marker_color=palette.map_categories(
+        ...     df["species"], output="hex"))
+
+        Args:
+            labels (ArrayLike): The labels, such as a list, a NumPy array,
+                or a pandas Series or Categorical.
+            order (Sequence, optional): The categories in the order in which they are assigned
+                colors. Labels that are not in `order` are given the fallback color.
+                If None, the categories of a pandas Categorical or the sorted unique labels
+                (in order of first appearance if they are of types that can't be compared).
+            cycle (bool): Whether to reuse the palette colors if there are more categories
+                than colors. If False, a ValueError is raised instead.
+            output (str): 'rgba' for an (..., 4) float array of RGBA values (for the `c`
+                argument of matplotlib), or 'hex' for an array of HEX codes (for the
+                `marker.color` property of plotly).
+            fallback (str): The color of missing (None or NaN) labels and of labels that are
+                not in `order`.
+
+        Returns:
+            NDArray: The colors, with the shape of `labels` followed by a dimension of size 4
+                for 'rgba' output.
+
+        Raises:
+            ValueError: If `output` is invalid, or if there are more categories than colors
+                and `cycle` is False.
+        """
+        if output not in ("rgba", "hex"):
+            raise ValueError(f"Invalid output '{output}'. Choose 'rgba' or 'hex'.")
+        if len(self) == 0:
+            raise ValueError("Cannot map categories to an empty palette.")
+
+        codes, categories = _factorize(labels)
+        if order is not None:
+            # Re-map the codes from the categories of the labels to their positions in `order`.
+            positions = {category: position for position, category in enumerate(order)}
+            category_positions = np.array(
+                [positions.get(category, -1) for category in categories], dtype=np.intp
+            )
+            # If every label is missing, there are no categories and all codes are already -1.
+            if len(category_positions):
+                codes = np.where(codes >= 0, category_positions[codes], -1)
+            num_categories = len(order)
+        else:
+            num_categories = len(categories)
+
+        if num_categories > len(self) and not cycle:
+            raise ValueError(
+                f"There are {num_categories} categories but only {len(self)} colors. "
+                "Pass cycle=True to reuse colors."
+            )
+
+        # The fallback color is stored after the palette colors.
+        color_strings = [color.hex_code for color in self.colors] + [fallback]
+        if output == "rgba":
+            color_array = mcolors.to_rgba_array(color_strings)
+        else:
+            color_array = np.array([mcolors.to_hex(color) for color in color_strings])
+        color_indices = np.where(codes >= 0, codes % len(self), len(self))
+        return color_array[color_indices]
+
+    def distance_matrix(
+        self, metric: str = "cam02ucs", cvd: str | None = None, severity: float = 100
+    ) -> NDArray[np.float64]:
+        """Returns the matrix of perceptual distances between every pair of colors.
+
+        The matrix is computed in one vectorized pass and cached by the HEX codes of the
+        palette, so repeated calls are cheap. The returned array is read-only.
+
+        Args:
+            metric (str): Either 'cam02ucs' for the Euclidean distance in CAM02-UCS
+                or 'ciede2000' for the CIEDE2000 color difference.
+            cvd (str, optional): If 'd', 'p', or 't', the distances between the colors as seen
+                with deuteranomaly, protanomaly, or tritanomaly, respectively.
+            severity (float): The severity of the color vision deficiency, from 0 to 100.
+
+        Returns:
+            NDArray: An (N, N) symmetric matrix of distances.
+
+        Raises:
+            ValueError: If the palette is empty or `metric` or `cvd` is invalid.
+        """
+        if len(self) == 0:
+            raise ValueError("Cannot compute distances for an empty palette.")
+
+        hex_codes = tuple(color.hex_code for color in self.colors)
+        # The severity is irrelevant without a CVD type, so don't cache a matrix per severity.
+        severity = float(severity) if cvd is not None else 100.0
+        return _distance_matrix(hex_codes, metric, cvd, severity)
+
+    def distance_summary(
+        self, metric: str = "cam02ucs", cvd: str | None = None, severity: float = 100
+    ) -> DistanceSummary:
+        """Returns summary statistics of the distances from `distance_matrix`.
+
+        Args:
+            metric (str): Either 'cam02ucs' or 'ciede2000'.
+            cvd (str, optional): If 'd', 'p', or 't', the color vision deficiency to simulate.
+            severity (float): The severity of the color vision deficiency, from 0 to 100.
+
+        Raises:
+            ValueError: If the palette has fewer than two colors.
+        """
+        if len(self) < 2:
+            raise ValueError("Summarizing distances requires at least two colors.")
+
+        distances = self.distance_matrix(metric=metric, cvd=cvd, severity=severity)
+        rows, cols = np.triu_indices(len(self), k=1)
+        pair_distances = distances[rows, cols]
+        worst = np.argmin(pair_distances)
+        return DistanceSummary(
+            min_distance=float(pair_distances[worst]),
+            mean_distance=float(pair_distances.mean()),
+            worst_pair=(self.colors[rows[worst]], self.colors[cols[worst]]),
+        )
+
+    def extend_distinct(
+        self,
+        n: int,
+        pool: Palette | str | None = None,
+        lightness_range: tuple[float, float] | None = None,
+        cvd_types: Sequence[str] = (),
+        severity: float = 100,
+        background: str | None = "#FFFFFF",
+    ) -> Palette:
+        """Returns a palette of `n` colors that starts with this palette's colors
+        and continues with maximally distinct colors.
+
+        Colors are picked greedily by farthest-point sampling in CAM02-UCS: each new color is
+        the candidate whose distance to the nearest color picked so far (including this
+        palette's colors and the background) is largest. With `cvd_types`, the distance
+        between two colors is the smallest of their distances with normal vision and as seen
+        with each color vision deficiency.
+
+        Example:
+        >>> import arcadia_pycolor as apc
+        >>> apc.palettes.primary.extend_distinct(40, pool="gamut", cvd_types=["d"])
+
+        Args:
+            n (int): The number of colors of the returned palette. If `n` is not greater than
+                the length of this palette, the first `n` colors of this palette are returned.
+            pool (Palette or str, optional): The candidate colors. If None, all of the Arcadia
+                colors. If 'gamut', a grid of colors spanning the sRGB gamut.
+            lightness_range (tuple[float, float], optional): The minimum and maximum CAM02-UCS
+                lightness (J', from 0 to 100) of the new colors.
+            cvd_types (Sequence[str]): The color vision deficiencies to consider:
+                any of 'd', 'p', and 't'.
+            severity (float): The severity of the color vision deficiencies, from 0 to 100.
+            background (str, optional): A color the new colors should be distinct from,
+                such as the background color of the plot. If None, no background is used.
+
+        Raises:
+            ValueError: If the pool does not contain enough candidate colors.
+        """
+        if n <= len(self):
+            return self[:n]
+
+        if pool is None:
+            # Imported here because `palettes` depends on this module.
+            import arcadia_pycolor.palettes
+
+            pool = arcadia_pycolor.palettes.all_colors
+
+        # Candidates from the gamut are only converted to HexCodes once they are picked.
+        candidates: list[HexCode] | None = None
+        if isinstance(pool, str):
+            if pool != "gamut":
+                raise ValueError(f"Invalid pool '{pool}'. Use a Palette, 'gamut', or None.")
+            # Use 8-bit levels so that the picked colors are exactly representable as HEX codes.
+            levels = np.round(np.linspace(0, 255, GAMUT_LEVELS)) / 255
+            candidate_rgb1 = np.stack(np.meshgrid(levels, levels, levels), axis=-1).reshape(-1, 3)
+        else:
+            existing = {color.hex_code.lower() for color in self.colors}
+            candidates = [color for color in pool if color.hex_code.lower() not in existing]
+            candidate_rgb1 = to_rgb255([color.hex_code for color in candidates]) / 255
+
+        if lightness_range is not None:
+            min_lightness, max_lightness = lightness_range
+            lightness = rgb1_to_cam02ucs(candidate_rgb1)[:, 0]
+            is_valid = (lightness >= min_lightness) & (lightness <= max_lightness)
+            candidate_rgb1 = candidate_rgb1[is_valid]
+            if candidates is not None:
+                candidates = [candidates[index] for index in np.flatnonzero(is_valid)]
+        candidate_coordinates = _perceptual_coordinates(candidate_rgb1, cvd_types, severity)
+
+        num_new_colors = n - len(self)
+        if len(candidate_rgb1) < num_new_colors:
+            raise ValueError(
+                f"The pool only has {len(candidate_rgb1)} candidate colors, "
+                f"but {num_new_colors} new colors were requested. Try pool='gamut'."
+            )
+
+        seeds = [color.hex_code for color in self.colors]
+        if background is not None:
+            seeds.append(background)
+        # Store the coordinates channel-first so that each distance update is contiguous.
+        candidate_coordinates = np.ascontiguousarray(candidate_coordinates.transpose(0, 2, 1))
+        min_squared_distances = np.full(len(candidate_rgb1), np.inf)
+
+        def update_min_distances(coordinates: NDArray[np.float64]) -> None:
+            """Updates the distances to the nearest picked color with a color of shape (S, 3)."""
+            squared_distances = ((candidate_coordinates - coordinates[:, :, np.newaxis]) ** 2).sum(
+                axis=1
+            )
+            np.minimum(
+                min_squared_distances, squared_distances.min(axis=0), out=min_squared_distances
+            )
+
+        if seeds:
+            seed_coordinates = _perceptual_coordinates(to_rgb255(seeds) / 255, cvd_types, severity)
+            for seed_index in range(len(seeds)):
+                update_min_distances(seed_coordinates[:, seed_index])
+
+        new_colors: list[HexCode] = []
+        for _ in range(num_new_colors):
+            index = int(np.argmax(min_squared_distances))
+            if candidates is None:
+                hex_code = mcolors.to_hex(candidate_rgb1[index])
+                new_colors.append(HexCode(hex_code, hex_code))
+            else:
+                new_colors.append(candidates[index])
+            update_min_distances(candidate_coordinates[:, :, index])
+
+        return Palette(f"{self.name}_extended", self.colors + new_colors)
+
+    def optimize_order(
+        self,
+        objective: str = "min",
+        cvd_types: Sequence[str] = ("d", "p", "t"),
+        metric: str = "cam02ucs",
+        restarts: int = 16,
+        time_budget: float = 2.0,
+        workers: int = 1,
+        seed: int = 0,
+    ) -> Palette:
+        """Returns the palette reordered so that adjacent colors are as distinct as possible.
+
+        This is useful for stacked bar charts and other plots in which consecutive colors
+        touch. The distance between two colors is the smallest of their distances with normal
+        vision and as seen with each of `cvd_types` (see `distance_matrix`). Orderings are
+        improved by 2-opt local search (reversing segments of the ordering) from the current
+        ordering and from random orderings, and the best ordering found is returned.
+
+        Example:
+        >>> import arcadia_pycolor as apc
+        >>> subset = apc.Palette("subset", apc.palettes.primary[:6].colors)
+        >>> subset.optimize_order(time_budget=0.5)
+
+        Args:
+            objective (str): 'min' to maximize the smallest distance between adjacent colors
+                (ties are broken by the sum), or 'sum' to maximize the sum of the distances.
+            cvd_types (Sequence[str]): The color vision deficiencies to consider:
+                any of 'd', 'p', and 't'.
+            metric (str): Either 'cam02ucs' or 'ciede2000'.
+            restarts (int): The number of local searches, including the one from the current
+                ordering.
+            time_budget (float): The maximum time to spend searching, in seconds.
+                The best ordering found so far is returned when it is exceeded.
+            workers (int): The number of processes to run local searches on.
+                If 1, they run in this process.
+            seed (int): The seed for the random initial orderings.
+
+        Raises:
+            ValueError: If `objective` is invalid or `restarts` or `workers` is not positive.
+        """
+        if objective not in ("min", "sum"):
+            raise ValueError(f"Invalid objective '{objective}'. Choose 'min' or 'sum'.")
+        if restarts < 1 or workers < 1:
+            raise ValueError("restarts and workers must be positive.")
+        if len(self) < 3:
+            return Palette(f"{self.name}_optimized", self.colors.copy())
+
+        distances = np.minimum.reduce(
+            [self.distance_matrix(metric=metric)]
+            + [self.distance_matrix(metric=metric, cvd=cvd_type) for cvd_type in cvd_types]
+        )
+        deadline = time.time() + time_budget
+        # The first search starts from the current ordering, so the result is never worse.
+        seeds = [None] + [seed + restart for restart in range(restarts - 1)]
+
+        if workers == 1:
+            results = []
+            for restart_seed in seeds:
+                results.append(
+                    _optimize_order_restart(distances, objective, restart_seed, deadline)
+                )
+                if time.time() >= deadline:
+                    break
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _optimize_order_restart, distances, objective, restart_seed, deadline
+                    )
+                    for restart_seed in seeds
+                ]
+                results = [future.result() for future in futures]
+
+        best_score, best_order = results[0]
+        for score, order in results[1:]:
+            if _is_better(score, best_score):
+                best_score, best_order = score, order
+        return Palette(f"{self.name}_optimized", [self.colors[index] for index in best_order])
+
+    def quantize_image(
+        self,
+        image: ArrayLike,
+        dither: bool = False,
+        tile_rows: int | None = None,
+        workers: int | None = None,
+        out: NDArray[np.uint8] | None = None,
+    ) -> NDArray[np.uint8]:
+        """Recolors an image so that every pixel is the perceptually nearest palette color.
+
+        See `arcadia_pycolor.color_index.quantize_image` for details.
+
+        Args:
+            image (ArrayLike): An (H, W, 3) RGB or (H, W, 4) RGBA image, which may be a
+                `numpy.memmap`.
+            dither (bool): Whether to apply ordered (Bayer) dithering.
+            tile_rows (int, optional): The number of rows processed at once by each worker.
+            workers (int, optional): The number of threads. If None, the number of CPUs is used.
+            out (NDArray, optional): A uint8 array with the same shape as `image` to write into.
+
+        Returns:
+            NDArray: The quantized image, with the alpha channel (if any) preserved.
+        """
+        # Imported here because `color_index` depends on this module.
+        from arcadia_pycolor.color_index import DEFAULT_TILE_ROWS, quantize_image
+
+        return quantize_image(
+            image,
+            palette=self,
+            dither=dither,
+            tile_rows=DEFAULT_TILE_ROWS if tile_rows is None else tile_rows,
+            workers=workers,
+            out=out,
+        )
@@ -1,23 +1,93 @@
-import warnings
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import cast
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
-
-with warnings.catch_warnings():
-    warnings.filterwarnings("ignore", category=SyntaxWarning, module="colorspacious")
-    from colorspacious import cspace_converter  # type: ignore
+from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 from numpy.typing import NDArray
 
+from arcadia_pycolor import colorspace
 from arcadia_pycolor.gradient import Gradient
 from arcadia_pycolor.gradients import all_gradients
 from arcadia_pycolor.palettes import all_palettes
 
 
+@dataclass(frozen=True)
+class GradientLightness:
+    """The lightness of gradients sampled at evenly spaced positions.
+
+    Attributes:
+        names (list[str]): The names of the gradients.
+        positions (NDArray): The positions of the samples from 0 to 1, with shape (steps,).
+        lightness (NDArray): The CAM02-UCS lightness (J') of the samples from 0 to 100,
+            with shape (gradients, steps).
+        colors (NDArray): The sRGB values of the samples in [0, 1],
+            with shape (gradients, steps, 3).
+    """
+
+    names: list[str]
+    positions: NDArray[np.float64]
+    lightness: NDArray[np.float64]
+    colors: NDArray[np.float64]
+
+
+def compute_gradient_lightness(
+    gradients: Gradient | str | Sequence[Gradient | str],
+    steps: int = 100,
+) -> GradientLightness:
+    """Computes the lightness of one or more color gradients without plotting.
+
+    The samples of all gradients are converted to CAM02-UCS in one batch. The result can be
+    cached and passed to `plot_gradient_lightness` to plot it again.
+
+    Args:
+        gradients (Gradient, str, or list[Gradient or str]):
+            The gradients, where each element is either a `Gradient` object or the name
+            of a registered Matplotlib colormap. Unknown colormaps are skipped.
+        steps (int):
+            The number of steps along each gradient.
+
+    Returns:
+        GradientLightness: The positions, lightness, and colors of the samples.
+
+    Raises:
+        TypeError:
+            If `gradients` is not a list of `Gradient` objects or strings.
+    """
+    # Check separately for single strings and single Gradient objects in order to avoid type errors.
+    if isinstance(gradients, (str, Gradient)):
+        gradients = [gradients]
+
+    positions = np.linspace(0.0, 1.0, steps)
+    names: list[str] = []
+    colors: list[NDArray[np.float64]] = []
+    for gradient in gradients:
+        if isinstance(gradient, str):
+            if gradient not in mpl.colormaps:  # type: ignore
+                print(f"Colormap {gradient} not found in Matplotlib colormaps.")
+                continue
+            names.append(gradient)
+            colors.append(mpl.colormaps[gradient](positions)[:, :3])  # type: ignore
+        elif isinstance(gradient, Gradient):
+            names.append(gradient.name)
+            colors.append(gradient.sample(positions))
+        else:
+            raise TypeError("gradients must be a list of Gradient objects or strings.")
+
+    rgb1 = np.stack(colors) if colors else np.zeros((0, steps, 3))
+    return GradientLightness(
+        names=names,
+        positions=positions,
+        lightness=colorspace.rgb1_to_cam02ucs(rgb1)[..., 0],
+        colors=rgb1,
+    )
+
+
 def plot_gradient_lightness(
-    gradients: Gradient | str | list[Gradient] | list[str],
+    gradients: Gradient | str | Sequence[Gradient | str] | GradientLightness,
     title: str | None = None,
     horizontal_spacing: float = 1.1,
     steps: int = 100,
@@ -26,22 +96,30 @@ def plot_gradient_lightness(
     tickrotation: float = 50,
     markersize: float = 300,
     return_fig: bool = False,
-) -> None | Figure:
+    ax: Axes | None = None,
+    show: bool = True,
+    return_lightness: bool = False,
+) -> None | Figure | GradientLightness | tuple[Figure, GradientLightness]:
     """Plots the lightness of one or more color gradients to assess their uniformity.
 
+    The lightness is computed by `compute_gradient_lightness` and the samples of all
+    gradients are drawn as a single scatter plot.
+
     Args:
-        gradients (list[Gradient] or list[str]):
+        gradients (list[Gradient] or list[str] or GradientLightness):
             The list of gradients to plot, where each element is either a `Gradient` object
             or a string. If a string is provided, it is assumed to be a registered Matplotlib
-            colormap.
+            colormap. A `GradientLightness` from `compute_gradient_lightness` or from a
+            previous call is plotted without being computed again.
         title (str):
             A title for the plot if desired.
         horizontal_spacing (float):
             The spacing between lines.
         steps (int):
             The number of steps along the gradient to generate.
+            Ignored if `gradients` is a `GradientLightness`.
         figsize (tuple):
-            The width, height tuple of the figure size.
+            The width, height tuple of the figure size. Ignored if `ax` is given.
         cmap_type (str):
             'linear' if you want the label for the `cmap` to be at the end;
             anything else puts the label in the middle.
@@ -51,63 +129,48 @@ def plot_gradient_lightness(
             The size of the points that make up the gradient color line.
         return_fig (bool):
             Whether or not to return the figure as an object.
+        ax (matplotlib.axes.Axes, optional):
+            The axes to plot on. If None, a new figure is created.
+        show (bool):
+            Whether to call `plt.show()`. Set to False in scripts and non-interactive builds.
+        return_lightness (bool):
+            Whether or not to return the computed `GradientLightness`.
 
     Returns:
-        Union[None, matplotlib.figure.Figure]:
-            None if `return_fig` is False, otherwise a `matplotlib.figure.Figure` object.
+        None, Figure, GradientLightness, or tuple[Figure, GradientLightness]:
+            The figure if `return_fig` is True and the lightness if `return_lightness` is True,
+            as a tuple if both are True, otherwise None.
 
     Raises:
         TypeError:
             If `gradients` is not a list of `Gradient` objects or strings.
     """
-
-    fig, ax = plt.subplots(figsize=figsize, layout="constrained")  # type: ignore
-
-    # Indices to step through colormap.
-    x = np.linspace(0.0, 1.0, steps)
-
-    xaxis_tick_labels: list[str] = []
-    xaxis_tick_locations: list[float] = []
-
-    # Check separately for single strings and single Gradient objects in order to avoid type errors.
-    if isinstance(gradients, str):
-        gradients = [gradients]
-    elif isinstance(gradients, Gradient):
-        gradients = [gradients]
-
-    for ind, gradient in enumerate(gradients):
-        if isinstance(gradient, str):
-            gradient_name = gradient
-            if gradient_name not in mpl.colormaps:  # type: ignore
-                print(f"Colormap {gradient_name} not found in Matplotlib colormaps.")
-                continue
-            cmap = mpl.colormaps[gradient_name]
-        elif isinstance(gradient, Gradient):
-            gradient_name = gradient.name
-            cmap = gradient.to_mpl_cmap()
-        else:
-            raise TypeError("gradients must be a list of Gradient objects or strings.")
-
-        xaxis_tick_labels.append(gradient_name)
-        cmap_as_rgb = cast(NDArray[np.float64], cmap(x)[np.newaxis, :, :3])
-        cmap_as_lab = cast(NDArray[np.float64], cspace_converter("sRGB1", "CAM02-UCS")(cmap_as_rgb))
-
-        # Plot colormap lightness values. Do this separately for each category
-        # so each plot can be pretty.
-        # Note: `lab[0, :, 0]` is the lightness.
-        y_ = cmap_as_lab[0, :, 0]
-        c_ = x
-
-        x_offset = ind * horizontal_spacing
-
-        # To make scatter markers change color along plot: https://stackoverflow.com/q/8202605/.
-        ax.scatter(x + x_offset, y_, c=c_, cmap=cmap, s=markersize, linewidths=0.0)
-
-        # Store locations for colormap labels.
-        if cmap_type == "linear":
-            xaxis_tick_locations.append(x[-1] + x_offset)
-        else:
-            xaxis_tick_locations.append(x[int(np.round(steps / 2))] + x_offset)
+    if isinstance(gradients, GradientLightness):
+        data = gradients
+    else:
+        data = compute_gradient_lightness(gradients, steps=steps)
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=figsize, layout="constrained")  # type: ignore
+    else:
+        fig = cast(Figure, ax.get_figure())
+
+    num_gradients, num_steps = data.lightness.shape
+    x_offsets = np.arange(num_gradients)[:, np.newaxis] * horizontal_spacing
+    x = data.positions + x_offsets
+
+    # Draw the samples of every gradient as one collection, each marker in its own color.
+    ax.scatter(
+        x.ravel(),
+        data.lightness.ravel(),
+        c=data.colors.reshape(-1, 3),
+        s=markersize,
+        linewidths=0.0,
+    )
+
+    # Store locations for colormap labels.
+    label_index = -1 if cmap_type == "linear" else int(np.round(num_steps / 2))
+    xaxis_tick_locations = x[:, label_index].tolist() if num_steps else []
 
     # Lightness goes from 0 to 100.
     ax.set_ylim(0.0, 100.0)
@@ -117,16 +180,22 @@ def plot_gradient_lightness(
     xaxis_tick_locator = mpl.ticker.FixedLocator(xaxis_tick_locations)  # type: ignore
     ax.xaxis.set_major_locator(xaxis_tick_locator)
     ax.xaxis.set_tick_params(rotation=tickrotation)
-    ax.set_xticklabels(labels=xaxis_tick_labels)
+    ax.set_xticklabels(labels=data.names)
     ax.set_ylabel("Lightness $L^*$", fontsize=12)
 
     if title is not None:
         ax.set_xlabel(title, fontsize=14)
 
-    plt.show()  # type: ignore
+    if show:
+        plt.show()  # type: ignore
 
+    if return_fig and return_lightness:
+        return fig, data
     if return_fig:
         return fig
+    if return_lightness:
+        return data
+    return None
 
 
 def display_all_gradients() -> None:
@@ -1,11 +1,16 @@
+import json
 import logging
 from pathlib import Path
 from typing import Any, Literal, get_args
 
+import plotly
 import plotly.graph_objects as go
 import plotly.io as pio
 from bs4 import BeautifulSoup
+from plotly.utils import PlotlyJSONEncoder
 
+from arcadia_pycolor.export_cache import ExportCache
+from arcadia_pycolor.indexed_png import convert_to_indexed_png
 from arcadia_pycolor.style_defaults import (
     ARCADIA_PLOTLY_TEMPLATE_LAYOUT,
     DEFAULT_FONT_PLOTLY,
@@ -32,6 +37,12 @@ PLOTLY_3D_TRACE_TYPES = (
 
 logger = logging.getLogger(__name__)
 
+# The file types that `save_figure` can export to.
+VALID_FILETYPES = ("png", "jpg", "jpeg", "webp", "svg", "pdf")
+
+# The number of points above which `promote_to_webgl` converts `Scatter` traces by default.
+WEBGL_POINT_THRESHOLD = 100_000
+
 AxisSelector = Literal["x", "y", "z", "xy", "yz", "xz", "xyz", "all"]
 
 
@@ -141,11 +152,69 @@ def _add_fonts_to_plotly_html_export(filepath: str) -> None:
         f.write(str(soup))
 
 
+def _count_trace_points(trace: go.Scatter) -> int:
+    """Returns the number of points of a scatter trace."""
+    lengths = [len(values) for values in (trace.x, trace.y) if values is not None]  # type: ignore
+    return max(lengths, default=0)
+
+
+def promote_to_webgl(fig: go.Figure, threshold: int = WEBGL_POINT_THRESHOLD) -> list[int]:
+    """Converts the large `Scatter` traces of a figure to `Scattergl` traces in place.
+
+    Browsers render `Scattergl` traces with WebGL, which is much faster than SVG for traces
+    of many points, both in notebooks and in HTML exports. Traces keep their properties,
+    position, and subplot, so the Arcadia styling and the colors of the traces don't change.
+    Traces that use properties that `Scattergl` doesn't support, such as `stackgroup` or
+    spline lines, are left unchanged. Each converted trace is logged at the INFO level.
+
+    Args:
+        fig (go.Figure): The figure to modify.
+        threshold (int): The number of points above which a trace is converted.
+
+    Returns:
+        list[int]: The indices of the converted traces in `fig.data`.
+    """
+    traces = list(fig.data)
+    promoted_indices: list[int] = []
+    for index, trace in enumerate(traces):
+        if not isinstance(trace, go.Scatter):
+            continue
+        num_points = _count_trace_points(trace)
+        if num_points <= threshold:
+            continue
+
+        properties = trace.to_plotly_json()
+        properties.pop("type", None)
+        try:
+            traces[index] = go.Scattergl(**properties)
+        except ValueError:
+            logger.info(
+                "Not converting trace %d (%r) to Scattergl, since it uses properties that "
+                "Scattergl doesn't support.",
+                index,
+                trace.name,
+            )
+            continue
+        logger.info(
+            "Converted trace %d (%r, %s points) to Scattergl.", index, trace.name, f"{num_points:,}"
+        )
+        promoted_indices.append(index)
+
+    if promoted_indices:
+        # Plotly only allows existing traces to be reassigned to `fig.data`,
+        # so all traces are replaced to keep their order.
+        fig.data = ()
+        fig.add_traces(traces)
+    return promoted_indices
+
+
 def save_figure(
     fig: go.Figure,
     filepath: str,
     size: FigureSize,
     filetypes: list[str] | None = None,
+    cache: ExportCache | None = None,
+    indexed_png: bool = False,
     **write_image_kwargs: Any,
 ) -> None:
     """Saves the current figure to a file without any margins or padding.
@@ -168,6 +237,11 @@ def save_figure(
             If the original filetype is not in `filetypes`, it is added to the list.
             Valid filetypes are: 'png', 'jpg', 'jpeg', 'webp', 'svg', 'pdf'. Invalid
             filetypes are skipped with a warning.
+        cache (ExportCache, optional): An export cache. If provided, any filetype whose
+            export is already in the cache is restored from it instead of being rendered.
+        indexed_png (bool): Whether to convert PNG exports to indexed PNGs whose palette is
+            seeded with the Arcadia colors in the figure. This typically makes web exports
+            several times smaller. See `indexed_png.convert_to_indexed_png` for details.
         **write_image_kwargs: Additional keyword arguments to pass to `fig.write_image`.
 
     Raises:
@@ -205,7 +279,7 @@ def save_figure(
     fig_export.update_yaxes(linewidth=updated_axis_linewidth)
 
     # If no file types are provided, use the filetype from the file path.
-    valid_filetypes = ["png", "jpg", "jpeg", "webp", "svg", "pdf"]
+    valid_filetypes = list(VALID_FILETYPES)
 
     filename = Path(filepath).with_suffix("")
     filetype = Path(filepath).suffix[1:]
@@ -231,9 +305,30 @@ def save_figure(
             f"No valid filetypes to write. Valid filetypes are: {', '.join(valid_filetypes)}."
         )
 
+    figure_spec = b""
+    if cache is not None:
+        figure_spec = json.dumps(
+            fig_export.to_plotly_json(), sort_keys=True, cls=PlotlyJSONEncoder
+        ).encode()
+
     for ftype in filetypes_to_write:
+        output_filepath = f"{filename}.{ftype}"
+
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key(
+                figure_spec,
+                size=size,
+                filetype=ftype,
+                write_image_kwargs=write_image_kwargs,
+                indexed_png=indexed_png,
+                plotly=plotly.__version__,
+            )
+            if cache.restore(cache_key, output_filepath):
+                continue
+
         try:
-            fig_export.write_image(f"{filename}.{ftype}", **write_image_kwargs)
+            fig_export.write_image(output_filepath, **write_image_kwargs)
         except Exception as error:
             # Kaleido v1 no longer bundles Chrome, so a missing browser is a common
             # cause of export failures. Surface an actionable hint when that's the case.
@@ -245,8 +340,18 @@ def save_figure(
                 ) from error
             raise
 
+        if ftype == "png" and indexed_png:
+            convert_to_indexed_png(output_filepath)
 
-def export_to_html(fig: go.Figure, filepath: str) -> None:
+        if cache is not None and cache_key is not None:
+            cache.store(cache_key, output_filepath)
+
+
+def export_to_html(
+    fig: go.Figure,
+    filepath: str,
+    webgl_threshold: int | None = None,
+) -> None:
     """
     Exports the current figure to an HTML file and adds fonts loaded from Google Fonts,
     allowing the figure to be embedded on webpages without requiring fonts to be installed.
@@ -258,7 +363,12 @@ def export_to_html(fig: go.Figure, filepath: str) -> None:
     Args:
         fig (go.Figure): The figure to export.
         filepath (str): The path to save the figure to.
+        webgl_threshold (int, optional): If given, `Scatter` traces with more points than
+            this are converted to `Scattergl` first with `promote_to_webgl`, so that the
+            exported page renders them quickly.
     """
+    if webgl_threshold is not None:
+        promote_to_webgl(fig, webgl_threshold)
 
     if _is_plot_with_3d_traces(fig):
         _revert_to_default_fonts(fig)
@@ -872,6 +982,7 @@ def style_plot(
     categorical_axes: AxisSelector | None = None,
     row: int | None = None,
     col: int | None = None,
+    webgl_threshold: int | None = None,
 ) -> None:
     """Styles the plot according to Arcadia's style guide.
 
@@ -881,6 +992,9 @@ def style_plot(
         categorical_axes (AxisSelector, optional): Which axes to set to categorical.
         row (int, optional): The row index of the subplot to modify.
         col (int, optional): The column index of the subplot to modify.
+        webgl_threshold (int, optional): If given, `Scatter` traces of the whole figure with
+            more points than this are converted to `Scattergl` with `promote_to_webgl`.
+            The figure can then be exported with `save_figure` or `export_to_html` as usual.
     """
     valid_axes = get_args(AxisSelector)
 
@@ -889,6 +1003,9 @@ def style_plot(
     if categorical_axes is not None and categorical_axes not in valid_axes:
         raise ValueError(f"categorical_axes must be one of {valid_axes}, got {categorical_axes}")
 
+    if webgl_threshold is not None:
+        promote_to_webgl(fig, webgl_threshold)
+
     capitalize_axislabels(fig, row, col)
 
     if categorical_axes == "all":
@@ -0,0 +1,208 @@
+from __future__ import annotations
+from collections.abc import Iterable
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# The default relative accuracy of the quantiles estimated by a `QuantileSketch`.
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Values with a smaller magnitude than this are counted as zeros.
+MIN_INDEXABLE_VALUE = float(np.finfo(np.float64).tiny)
+
+
+class _BucketStore:
+    """A dense array of counts for a contiguous range of bucket indices."""
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _extend(self, min_index: int, max_index: int) -> None:
+        """Grows the array of counts so that it covers the indices from min to max."""
+        if not len(self.counts):
+            self.offset = min_index
+            self.counts = np.zeros(max_index - min_index + 1, dtype=np.int64)
+            return
+
+        new_offset = min(self.offset, min_index)
+        new_length = max(self.offset + len(self.counts), max_index + 1) - new_offset
+        if new_offset == self.offset and new_length == len(self.counts):
+            return
+        counts = np.zeros(new_length, dtype=np.int64)
+        counts[self.offset - new_offset : self.offset - new_offset + len(self.counts)] = self.counts
+        self.offset = new_offset
+        self.counts = counts
+
+    def add(self, indices: NDArray[np.int64]) -> None:
+        """Increments the count of the bucket of each index."""
+        if not len(indices):
+            return
+        self._extend(int(indices.min()), int(indices.max()))
+        self.counts += np.bincount(indices - self.offset, minlength=len(self.counts))
+
+    def merge(self, other: _BucketStore) -> None:
+        """Adds the counts of another store."""
+        if not len(other.counts):
+            return
+        self._extend(other.offset, other.offset + len(other.counts) - 1)
+        start = other.offset - self.offset
+        self.counts[start : start + len(other.counts)] += other.counts
+
+    def nonzero(self) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """Returns the indices and counts of the non-empty buckets, in increasing order."""
+        positions = np.flatnonzero(self.counts)
+        return positions + self.offset, self.counts[positions]
+
+
+class QuantileSketch:
+    """A mergeable sketch of a distribution of values for estimating quantiles in one pass.
+
+    This implements DDSketch (Masson et al., "DDSketch: A fast and fully-mergeable quantile
+    sketch with relative-error guarantees", 2019). Values are counted in buckets whose bounds
+    grow geometrically, so every estimated quantile is within `relative_accuracy` of the true
+    quantile (relative to its value), while the memory use only grows with the logarithm of
+    the range of the values.
+
+    Updates are vectorized, so sketching billions of values chunk by chunk is fast, and
+    sketches of different chunks (for example, computed in parallel) can be merged.
+
+    Example:
+    >>> import numpy as np
+    >>> import arcadia_pycolor as apc
+    >>> values = np.load("expression.npy", mmap_mode="r")
+    >>> sketch = apc.sketch.QuantileSketch.from_chunks(values[i : i + 1000] for i in ...)
+    >>> sketch.quantile([0.01, 0.5, 0.99])
+
+    Attributes:
+        relative_accuracy (float): The relative accuracy of the estimated quantiles.
+        count (int): The number of values in the sketch. Non-finite values are ignored.
+        min (float): The smallest value in the sketch.
+        max (float): The largest value in the sketch.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """Initializes an empty QuantileSketch.
+
+        Args:
+            relative_accuracy (float): The relative accuracy of the estimated quantiles.
+
+        Raises:
+            ValueError: If `relative_accuracy` is not between 0 and 1.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+        self._positive = _BucketStore()
+        self._negative = _BucketStore()
+        self._zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Iterable[ArrayLike],
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    ) -> QuantileSketch:
+        """Returns a sketch of the values in a sequence of chunks, such as slices of a memmap.
+
+        Only one chunk is held in memory at a time.
+        """
+        sketch = cls(relative_accuracy)
+        for chunk in chunks:
+            sketch.update(chunk)
+        return sketch
+
+    def _indices(self, magnitudes: NDArray[np.float64]) -> NDArray[np.int64]:
+        """Returns the bucket index of each positive magnitude."""
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _bucket_values(self, indices: NDArray[np.int64]) -> NDArray[np.float64]:
+        """Returns the value that represents each bucket with the smallest relative error."""
+        return 2 * np.exp(indices * self._log_gamma) / (self._gamma + 1)
+
+    def update(self, values: ArrayLike) -> QuantileSketch:
+        """Adds values to the sketch. NaN, infinite, and masked values are ignored.
+
+        Returns:
+            QuantileSketch: The sketch itself, to allow chaining.
+        """
+        if np.ma.isMaskedArray(values):
+            values = values.compressed()  # type: ignore
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+
+        is_positive = values >= MIN_INDEXABLE_VALUE
+        is_negative = values <= -MIN_INDEXABLE_VALUE
+        self._positive.add(self._indices(values[is_positive]))
+        self._negative.add(self._indices(-values[is_negative]))
+        self._zero_count += len(values) - int(is_positive.sum()) - int(is_negative.sum())
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Adds the values of another sketch to this sketch.
+
+        Returns:
+            QuantileSketch: The sketch itself, to allow chaining.
+
+        Raises:
+            ValueError: If the sketches have different relative accuracies.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+
+        self._positive.merge(other._positive)
+        self._negative.merge(other._negative)
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: ArrayLike) -> NDArray[np.float64]:
+        """Returns the estimated quantiles of the values.
+
+        Args:
+            q (ArrayLike): The quantiles to estimate, between 0 and 1.
+
+        Returns:
+            NDArray: The estimated quantiles, with the shape of `q`. The quantiles 0 and 1
+                are the exact minimum and maximum.
+
+        Raises:
+            ValueError: If the sketch is empty or `q` is not between 0 and 1.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            raise ValueError("Cannot estimate quantiles of an empty sketch.")
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be between 0 and 1.")
+
+        # Order the buckets from the most negative to the most positive values.
+        negative_indices, negative_counts = self._negative.nonzero()
+        positive_indices, positive_counts = self._positive.nonzero()
+        bucket_values = np.concatenate(
+            [
+                -self._bucket_values(negative_indices[::-1]),
+                [0.0],
+                self._bucket_values(positive_indices),
+            ]
+        )
+        bucket_counts = np.concatenate([negative_counts[::-1], [self._zero_count], positive_counts])
+
+        ranks = q * (self.count - 1)
+        buckets = np.searchsorted(np.cumsum(bucket_counts), ranks, side="right")
+        # The extreme values are tracked exactly.
+        estimates = np.clip(bucket_values[buckets], self.min, self.max)
+        return np.where(q == 0, self.min, np.where(q == 1, self.max, estimates))
@@ -0,0 +1,109 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor import BivariateGradient, HexCode
+
+black = HexCode("black", "#000000")
+white = HexCode("white", "#FFFFFF")
+red = HexCode("red", "#FF0000")
+blue = HexCode("blue", "#0000FF")
+
+
+@pytest.fixture
+def corners_gradient() -> BivariateGradient:
+    return BivariateGradient.from_corners("corners", [white, red, blue, black], shape=(8, 4))
+
+
+@pytest.mark.parametrize("interpolation", ["srgb", "cam02ucs", "oklab"])
+def test_from_corners(interpolation):
+    bivariate = BivariateGradient.from_corners(
+        "corners", [white, red, blue, black], interpolation=interpolation
+    )
+    lookup_table = bivariate.lookup_table()
+    assert lookup_table.shape == (64, 64, 4)
+    np.testing.assert_allclose(lookup_table[0, 0], [255, 255, 255, 255], atol=1)
+    np.testing.assert_allclose(lookup_table[-1, 0], [255, 0, 0, 255], atol=1)
+    np.testing.assert_allclose(lookup_table[0, -1], [0, 0, 255, 255], atol=1)
+    np.testing.assert_allclose(lookup_table[-1, -1], [0, 0, 0, 255], atol=1)
+
+
+def test_from_gradients():
+    x_gradient = apc.Gradient("whites_blues", [white, apc.aegean])
+    y_gradient = apc.Gradient("whites_reds", [white, apc.dragon])
+    bivariate = BivariateGradient.from_gradients("blue_red", x_gradient, y_gradient)
+
+    # The first row and column match the gradients, which start from the same color.
+    positions = np.linspace(0, 1, 64)
+    np.testing.assert_allclose(bivariate.colors[:, 0], x_gradient.sample(positions), atol=0.02)
+    np.testing.assert_allclose(bivariate.colors[0, :], y_gradient.sample(positions), atol=0.02)
+    # High values of both are darker than high values of either.
+    lightness = apc.colorspace.rgb1_to_cam02ucs(bivariate.colors)[..., 0]
+    assert lightness[-1, -1] < min(lightness[-1, 0], lightness[0, -1])
+
+    bivariate = BivariateGradient.from_gradients(
+        "blue_red", apc.gradients.blues.reverse(), apc.gradients.reds.reverse()
+    )
+    assert np.isfinite(bivariate.colors).all()
+
+
+def test_map_arrays(corners_gradient: BivariateGradient):
+    x_values = np.array([[0, 10], [10, np.nan]])
+    y_values = np.ma.masked_array([[0, 0], [5, 5]], mask=[[False, True], [False, False]])
+    colors = corners_gradient.map_arrays(x_values, y_values)
+
+    lookup_table = corners_gradient.lookup_table()
+    assert colors.shape == (2, 2, 4)
+    np.testing.assert_array_equal(colors[0, 0], lookup_table[0, 0])
+    np.testing.assert_array_equal(colors[1, 0], lookup_table[-1, -1])
+    # Pairs with a masked or NaN value are transparent.
+    np.testing.assert_array_equal(colors[0, 1], [0, 0, 0, 0])
+    np.testing.assert_array_equal(colors[1, 1], [0, 0, 0, 0])
+
+
+def test_map_arrays_matches_per_axis_indices(corners_gradient: BivariateGradient):
+    rng = np.random.default_rng(0)
+    x_values = rng.uniform(-1, 2, size=(100, 30))
+    y_values = rng.uniform(-1, 2, size=(100, 30)).astype(np.float32)
+    norm = apc.norms.LinearNorm(0, 1)
+    colors = corners_gradient.map_arrays(
+        x_values, y_values, x_norm=norm, y_norm=apc.norms.LinearNorm(0, 1), chunk_size=7, workers=3
+    )
+
+    x_indices = np.clip((norm(x_values) * 8).astype(int), 0, 7)
+    y_indices = np.clip((norm(y_values) * 4).astype(int), 0, 3)
+    expected = corners_gradient.lookup_table()[x_indices, y_indices]
+    np.testing.assert_array_equal(colors, expected)
+
+    out = np.empty((100, 30, 4), dtype=np.uint8)
+    assert corners_gradient.map_arrays(x_values, y_values, norm, norm, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_map_arrays_invalid(corners_gradient: BivariateGradient):
+    with pytest.raises(ValueError, match="same shape"):
+        corners_gradient.map_arrays(np.zeros(3), np.zeros(4))
+    with pytest.raises(ValueError, match="out must be"):
+        corners_gradient.map_arrays(np.arange(3), np.arange(3), out=np.empty((3, 3), np.uint8))
+
+
+def test_invalid_bivariate_gradient():
+    with pytest.raises(ValueError, match="shape"):
+        BivariateGradient("invalid", np.zeros((1, 4, 3)))
+    with pytest.raises(ValueError, match="four"):
+        BivariateGradient.from_corners("invalid", [white, black])
+    with pytest.raises(ValueError, match="Invalid interpolation"):
+        BivariateGradient.from_corners("invalid", [white, red, blue, black], interpolation="hsv")
+
+
+def test_legends(corners_gradient: BivariateGradient):
+    fig, ax = plt.subplots()
+    assert corners_gradient.plot_mpl_legend(ax, "x", "y", x_range=(0, 10)) is ax
+    assert ax.get_xlabel() == "x"
+    assert ax.images[0].get_extent() == [0, 10, 0, 1]
+    plt.close(fig)
+
+    legend = corners_gradient.to_plotly_legend("x", "y")
+    assert np.asarray(legend.data[0].z).shape == (4, 8, 4)
+    assert legend.layout.xaxis.title.text == "x"
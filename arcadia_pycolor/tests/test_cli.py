@@ -0,0 +1,103 @@
+import os
+import pickle
+
+import matplotlib
+import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+import pytest
+
+from arcadia_pycolor.cli import _initialize_worker, main
+
+
+@pytest.fixture
+def figure_dirpath(tmp_path):
+    dirpath = tmp_path / "figures"
+    dirpath.mkdir()
+
+    fig, ax = plt.subplots()
+    ax.plot([1, 2, 3], [1, 2, 3])
+    ax.set_xlabel("time")
+    with open(dirpath / "line.pkl", "wb") as file:
+        pickle.dump(fig, file)
+    plt.close(fig)
+
+    go.Figure(go.Bar(x=["a", "b"], y=[1, 2])).write_json(dirpath / "bars.json")
+    return dirpath
+
+
+def test_cli_exports_and_skips_up_to_date_outputs(figure_dirpath, tmp_path, capsys):
+    output_dirpath = tmp_path / "exports"
+    argv = [
+        str(figure_dirpath),
+        "--size",
+        "half_square",
+        "--formats",
+        "pdf",
+        "html",
+        "--output-dir",
+        str(output_dirpath),
+    ]
+
+    # Skip the static Plotly export (which requires Chrome) by only requesting HTML for it.
+    assert main([str(figure_dirpath / "*.json"), *argv[1:3], "--formats", "html", *argv[6:]]) == 0
+    assert main([str(figure_dirpath / "*.pkl"), *argv[1:]]) == 0
+    assert (output_dirpath / "bars.html").is_file()
+    assert (output_dirpath / "line.pdf").is_file()
+    assert not (output_dirpath / "line.html").exists()
+
+    capsys.readouterr()
+    assert main([str(figure_dirpath / "*.pkl"), *argv[1:]]) == 0
+    assert "Exported 0 figure(s), skipped 1 up-to-date" in capsys.readouterr().out
+
+
+def test_cli_reexports_stale_outputs(figure_dirpath, tmp_path, capsys):
+    argv = [str(figure_dirpath / "*.pkl"), "--size", "float", "--output-dir", str(tmp_path)]
+    argv += ["--workers", "2"]
+    assert main(argv) == 0
+
+    # Touch the source so that it is newer than its export.
+    output_mtime = (tmp_path / "line.png").stat().st_mtime
+    os.utime(figure_dirpath / "line.pkl", (output_mtime + 10, output_mtime + 10))
+
+    capsys.readouterr()
+    assert main(argv) == 0
+    assert "Exported 1 figure(s), skipped 0 up-to-date" in capsys.readouterr().out
+
+
+def test_cli_no_inputs(tmp_path):
+    assert main([str(tmp_path / "*.json"), "--size", "float"]) == 2
+
+
+def test_cli_rejects_figures_without_supported_formats(figure_dirpath, tmp_path, capsys):
+    output_dirpath = tmp_path / "exports"
+    argv = [str(figure_dirpath / "*.pkl"), "--size", "float", "--output-dir", str(output_dirpath)]
+    for extra_argv in ([], ["--force"]):
+        assert main([*argv, "--formats", "html", *extra_argv]) == 2
+        assert "no supported formats" in capsys.readouterr().err
+    assert not output_dirpath.exists()
+
+
+def test_cli_rejects_colliding_outputs(figure_dirpath, tmp_path, capsys):
+    go.Figure(go.Bar(x=["a"], y=[1])).write_json(figure_dirpath / "line.json")
+    assert main([str(figure_dirpath), "--size", "float", "--formats", "svg"]) == 2
+    assert "would both be exported to" in capsys.readouterr().err
+    assert not (figure_dirpath / "line.svg").exists()
+
+
+def test_cli_rejects_unknown_formats(figure_dirpath, tmp_path, capsys):
+    argv = [str(figure_dirpath / "*.pkl"), "--size", "float", "--output-dir", str(tmp_path)]
+    with pytest.raises(SystemExit) as exc_info:
+        main([*argv, "--formats", "png", "bmp"])
+    assert exc_info.value.code == 2
+    assert "invalid choice: 'bmp'" in capsys.readouterr().err
+
+    # Formats may be given with a leading dot.
+    assert main([*argv, "--formats", ".svg"]) == 0
+    assert (tmp_path / "line.svg").is_file()
+
+
+def test_cli_initializes_workers_with_agg_backend(monkeypatch):
+    backends = []
+    monkeypatch.setattr(matplotlib, "use", backends.append)
+    _initialize_worker()
+    assert backends == ["Agg"]
@@ -0,0 +1,78 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.color_assigner import ColorAssigner
+
+
+def test_color_assigner_is_deterministic():
+    labels = ["condition A", "condition B", "control"]
+    first = [ColorAssigner()[label] for label in labels]
+    assert [ColorAssigner()[label] for label in labels] == first
+
+    # The color of a new label depends only on the label and the colors already in use.
+    assert ColorAssigner()["condition B"] == ColorAssigner()["condition B"]
+    assert len(set(first)) == len(labels)
+
+
+def test_color_assigner_avoids_collisions():
+    assigner = ColorAssigner(apc.palettes.primary)
+    colors = [assigner[f"label {i}"] for i in range(len(apc.palettes.primary))]
+    assert sorted(colors) == sorted(apc.palettes.primary.colors)
+
+    # Once the palette is exhausted, colors are reused.
+    assert assigner["one more"] in apc.palettes.primary.colors
+    assert len(assigner) == len(apc.palettes.primary) + 1
+
+    # Existing labels keep their colors.
+    assert assigner["label 0"] == colors[0]
+
+
+def test_color_assigner_assign_many():
+    rng = np.random.default_rng(0)
+    labels = rng.choice(["a", "b", "c", "d"], size=(1000, 3))
+    assigner = ColorAssigner()
+    colors = assigner.assign_many(labels)
+
+    assert colors.shape == labels.shape
+    assert len(assigner) == 4
+    for label in "abcd":
+        assert (colors[labels == label] == assigner[label]).all()
+
+    np.testing.assert_array_equal(
+        assigner.assign_many([1, 2, 1]), [assigner["1"], assigner["2"], assigner["1"]]
+    )
+
+
+def _assign_in_worker(store_path, labels):
+    return {
+        label: color.hex_code
+        for label, color in zip(
+            labels, ColorAssigner(store_path=store_path).assign_many(labels), strict=True
+        )
+    }
+
+
+def test_color_assigner_store_is_shared(tmp_path):
+    store_path = tmp_path / "colors.json"
+    label_sets = [[f"label {i}" for i in range(start, start + 6)] for start in range(0, 12, 2)]
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(_assign_in_worker, [store_path] * len(label_sets), label_sets))
+
+    # Every worker sees the same color for each label, and so does a new assigner.
+    assignments = ColorAssigner(store_path=store_path).assignments
+    assert len(assignments) == 16
+    for result in results:
+        for label, hex_code in result.items():
+            assert assignments[label].hex_code == hex_code
+
+    # Colors are unique while the palette has unused colors.
+    hex_codes = [color.hex_code for color in assignments.values()]
+    assert len(set(hex_codes)) == len(apc.palettes.primary)
+
+
+def test_color_assigner_empty_palette():
+    with pytest.raises(ValueError):
+        ColorAssigner(apc.Palette("empty", []))
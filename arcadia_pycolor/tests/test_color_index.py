@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.color_index import ColorIndex, get_color_index, nearest
+from arcadia_pycolor.colorspace import rgb255_to_cam02ucs
+
+
+def test_nearest_hex_codes():
+    assert nearest(apc.aegean) is apc.aegean
+    assert nearest("#5088c4").name == "aegean"
+    assert nearest(["#5088c4", apc.rose.hex_code]) == [apc.aegean, apc.rose]
+
+    palette = apc.Palette("test", [apc.black, apc.white, apc.aegean])
+    assert nearest("#101010", k=2, palette=palette) == [apc.black, apc.aegean]
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.int64, np.float64])
+def test_nearest_matches_brute_force(dtype):
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(40, 50, 3))
+    colors = rgb / 255 if dtype == np.float64 else rgb.astype(dtype)
+
+    index = get_color_index()
+    distances, indices = index.query(colors, k=3)
+    assert distances.shape == indices.shape == (40, 50, 3)
+
+    expected = np.linalg.norm(
+        rgb255_to_cam02ucs(rgb.astype(np.uint8))[..., np.newaxis, :] - index.cam02ucs, axis=-1
+    )
+    np.testing.assert_allclose(distances, np.sort(expected, axis=-1)[..., :3])
+    np.testing.assert_array_equal(indices[..., 0], np.argmin(expected, axis=-1))
+
+    snapped = nearest(colors)
+    assert snapped.shape == (40, 50)
+    assert snapped[0, 0] is apc.palettes.all_colors[indices[0, 0, 0]]
+
+
+def test_get_color_index_is_cached():
+    assert get_color_index(apc.palettes.primary) is get_color_index(apc.palettes.primary)
+    assert get_color_index(apc.palettes.primary) is not get_color_index(apc.palettes.secondary)
+
+
+def test_color_index_invalid_arguments():
+    index = ColorIndex(apc.palettes.primary)
+    with pytest.raises(ValueError):
+        index.query("#000000", k=0)
+    with pytest.raises(ValueError):
+        index.query("#000000", k=len(index) + 1)
+    with pytest.raises(ValueError):
+        index.query(np.zeros((4, 2)))
+    with pytest.raises(ValueError):
+        ColorIndex(apc.Palette("empty", []))
+
+
+def test_quantize_image():
+    rng = np.random.default_rng(0)
+    palette = apc.palettes.primary
+    image = rng.integers(0, 256, size=(30, 40, 4), dtype=np.uint8)
+    image[0, :12, :3] = [color.to_rgb() for color in palette]
+
+    quantized = palette.quantize_image(image, workers=1)
+    assert quantized.shape == image.shape
+    np.testing.assert_array_equal(quantized[..., 3], image[..., 3])
+    np.testing.assert_array_equal(quantized[0, :12, :3], image[0, :12, :3])
+
+    palette_rgb = {tuple(color.to_rgb()) for color in palette}
+    assert {tuple(pixel) for pixel in quantized[..., :3].reshape(-1, 3)} <= palette_rgb
+
+    # Every pixel is the exact nearest palette color.
+    _, indices = get_color_index(palette).query(image)
+    exact = np.array([palette[i].to_rgb() for i in indices.ravel()]).reshape(30, 40, 3)
+    np.testing.assert_array_equal(quantized[..., :3], exact)
+
+    np.testing.assert_array_equal(palette.quantize_image(image[..., :3] / 255), quantized[..., :3])
+
+
+def test_lookup_table_is_exact():
+    rng = np.random.default_rng(1)
+    index = ColorIndex(apc.palettes.primary)
+    colors = rng.integers(0, 256, size=(20_000, 3), dtype=np.uint8)
+    # Colors straddling the boundary between two palette colors.
+    blue, red = (np.array(color.to_rgb()) for color in apc.palettes.primary[:2])
+    fractions = np.linspace(0, 1, 1000)[:, np.newaxis]
+    colors = np.concatenate([colors, np.round(blue * (1 - fractions) + red * fractions)])
+    colors = colors.astype(np.uint8)
+
+    cell_blocks, blocks = index.lookup_table()
+    assert cell_blocks.shape == (64, 64, 64)
+    assert blocks.shape[1:] == (4, 4, 4)
+    high, low = colors >> 2, colors & 3
+    table_indices = blocks[(cell_blocks[tuple(high.T)], *low.T)]
+    _, indices = index.query(colors)
+    np.testing.assert_array_equal(table_indices, indices)
+
+
+def test_quantize_image_memmap(tmp_path):
+    rng = np.random.default_rng(0)
+    image = np.lib.format.open_memmap(tmp_path / "in.npy", "w+", np.uint8, (50, 20, 3))
+    image[:] = rng.integers(0, 256, size=image.shape)
+    out = np.lib.format.open_memmap(tmp_path / "out.npy", "w+", np.uint8, image.shape)
+
+    result = apc.palettes.primary.quantize_image(image, tile_rows=7, workers=2, out=out)
+    assert result is out
+    np.testing.assert_array_equal(out, apc.palettes.primary.quantize_image(np.asarray(image)))
+
+
+def test_quantize_image_dither():
+    palette = apc.Palette("test", [apc.black, apc.white])
+    gray = np.repeat(np.linspace(0, 1, 64), 64).reshape(64, 64, 1).repeat(3, axis=2)
+
+    def block_error(quantized):
+        block_means = quantized.reshape(8, 8, 8, 8, 3).mean(axis=(1, 3)) / 255
+        return np.abs(block_means - gray.reshape(8, 8, 8, 8, 3).mean(axis=(1, 3))).mean()
+
+    assert block_error(palette.quantize_image(gray, dither=True)) < block_error(
+        palette.quantize_image(gray)
+    )
+
+
+def test_quantize_image_invalid_arguments():
+    with pytest.raises(ValueError):
+        apc.palettes.primary.quantize_image(np.zeros((4, 4)))
+    with pytest.raises(ValueError):
+        apc.palettes.primary.quantize_image(np.zeros((4, 4, 3)), out=np.zeros((4, 4, 4)))
+    with pytest.raises(ValueError):
+        apc.palettes.primary.quantize_image(np.zeros((4, 4, 3)), tile_rows=0)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.colorspace import ciede2000, pack_rgb255, to_rgb255, unpack_rgb255
+
+
+def test_to_rgb255():
+    np.testing.assert_array_equal(to_rgb255(apc.aegean), apc.aegean.to_rgb())
+    np.testing.assert_array_equal(to_rgb255(["#000000", "#ffffff"]), [[0, 0, 0], [255, 255, 255]])
+    np.testing.assert_array_equal(to_rgb255(np.array([[0.0, 0.5, 1.0, 0.2]])), [[0, 128, 255]])
+    np.testing.assert_array_equal(to_rgb255(np.array([[-1, 128, 300]])), [[0, 128, 255]])
+
+    with pytest.raises(ValueError):
+        to_rgb255(np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        to_rgb255("not a color")
+
+
+def test_pack_rgb255_roundtrip():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(10, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(unpack_rgb255(pack_rgb255(rgb)), rgb)
+
+
+def test_ciede2000_reference_values():
+    # Test pairs from Sharma et al. (2005), Table 1.
+    lab1 = np.array(
+        [[50, 2.6772, -79.7751], [50, 0, 0], [50, 2.5, 0], [60.2574, -34.0099, 36.2677]]
+    )
+    lab2 = np.array([[50, 0, -82.7485], [50, -1, 2], [73, 25, -18], [60.4626, -34.1751, 39.4387]])
+    expected = [2.0425, 2.3669, 27.1492, 1.2644]
+    np.testing.assert_allclose(ciede2000(lab1, lab2), expected, atol=1e-4)
+    np.testing.assert_allclose(ciede2000(lab2, lab1), expected, atol=1e-4)
+
+
+def test_oklab_reference_values_and_round_trip():
+    # Reference values from https://bottosson.github.io/posts/oklab/.
+    np.testing.assert_allclose(
+        apc.colorspace.rgb1_to_oklab(np.array([[1.0, 1.0, 1.0], [1.0, 0.0, 0.0]])),
+        [[1.0, 0.0, 0.0], [0.627955, 0.224863, 0.125846]],
+        atol=1e-6,
+    )
+    rgb1 = np.random.default_rng(0).random((100, 3))
+    np.testing.assert_allclose(
+        apc.colorspace.oklab_to_rgb1(apc.colorspace.rgb1_to_oklab(rgb1)), rgb1, atol=1e-5
+    )
+    np.testing.assert_allclose(
+        apc.colorspace.cam02ucs_to_rgb1(apc.colorspace.rgb1_to_cam02ucs(rgb1)), rgb1, atol=1e-10
+    )
@@ -0,0 +1,134 @@
+import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from matplotlib.figure import Figure
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.export_cache import ExportCache
+from arcadia_pycolor.mpl import _figure_spec
+
+
+def simple_plot(y_values):
+    fig = plt.figure(figsize=(3, 3))
+    plt.plot([1, 2, 3], y_values)
+    return fig
+
+
+def test_mpl_save_figure_cache_hit(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    filepath = tmp_path / "test.pdf"
+
+    fig = simple_plot([1, 2, 3])
+    apc.mpl.save_figure(str(filepath), size="half_square", filetypes=["png"], cache=cache)
+    assert cache.stats.misses == 2
+    assert cache.stats.hits == 0
+
+    filepath.unlink()
+    apc.mpl.save_figure(str(filepath), size="half_square", filetypes=["png"], cache=cache)
+    assert cache.stats.hits == 2
+    assert filepath.is_file()
+    assert (tmp_path / "test.png").is_file()
+    plt.close(fig)
+
+    # A different figure or different export parameters are cache misses.
+    fig = simple_plot([3, 2, 1])
+    apc.mpl.save_figure(str(filepath), size="half_square", cache=cache)
+    apc.mpl.save_figure(str(filepath), size="half_square", context="print", cache=cache)
+    assert cache.stats.misses == 4
+    plt.close(fig)
+
+
+def test_export_cache_eviction(tmp_path):
+    cache = ExportCache(tmp_path / "cache", max_bytes=0)
+    fig = simple_plot([1, 2, 3])
+    apc.mpl.save_figure(str(tmp_path / "test.png"), size="float", cache=cache)
+    plt.close(fig)
+
+    assert cache.stats.evictions == 1
+    assert cache.size_bytes() == 0
+
+
+def test_export_cache_clear(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    fig = simple_plot([1, 2, 3])
+    apc.mpl.save_figure(str(tmp_path / "test.png"), size="float", cache=cache)
+    plt.close(fig)
+
+    assert cache.size_bytes() > 0
+    cache.clear()
+    assert cache.size_bytes() == 0
+
+
+def test_plotly_save_figure_cache_hit(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_write_image(self, filepath, **kwargs):
+        calls.append(filepath)
+        with open(filepath, "w") as file:
+            file.write("image")
+
+    # Avoid the dependency on Chrome by replacing the renderer.
+    monkeypatch.setattr(go.Figure, "write_image", fake_write_image)
+
+    cache = ExportCache(tmp_path / "cache")
+    fig = go.Figure(go.Bar(x=["a", "b"], y=[1, 2]))
+    apc.plotly.save_figure(fig, str(tmp_path / "test.svg"), "float", cache=cache)
+    apc.plotly.save_figure(fig, str(tmp_path / "test.svg"), "float", cache=cache)
+
+    assert len(calls) == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_mpl_figure_spec_is_stable_and_sensitive():
+    def build_figure(y_values, title="Title"):
+        fig, ax = plt.subplots(figsize=(3, 3))
+        ax.plot([1, 2, 3], y_values, label="line")
+        points = ax.scatter([1, 2], [3, 4], c=[1, 2])
+        ax.set_title(title)
+        ax.legend()
+        fig.colorbar(points)
+        return fig
+
+    fig = build_figure([1, 2, 3])
+    spec = _figure_spec(fig)
+
+    # Drawing the figure does not change its spec, and identical figures have identical specs.
+    fig.canvas.draw()
+    assert _figure_spec(fig) == spec
+    assert _figure_spec(build_figure([1, 2, 3])) == spec
+
+    # Changes to data, text, and limits change the spec.
+    assert _figure_spec(build_figure([1, 2, 4])) != spec
+    assert _figure_spec(build_figure([1, 2, 3], title="Other")) != spec
+    fig.axes[0].set_xlim(0, 10)
+    assert _figure_spec(fig) != spec
+    plt.close("all")
+
+
+def test_mpl_save_figure_cache_misses_after_tick_label_change(tmp_path):
+    cache = ExportCache(tmp_path / "cache")
+    fig = simple_plot([1, 2, 3])
+    apc.mpl.save_figure(str(tmp_path / "test.png"), size="float", figure=fig, cache=cache)
+    original = (tmp_path / "test.png").read_bytes()
+
+    plt.setp(fig.axes[0].get_xticklabels(), rotation=90, color="red")
+    apc.mpl.save_figure(str(tmp_path / "test.png"), size="float", figure=fig, cache=cache)
+    plt.close(fig)
+
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+    assert (tmp_path / "test.png").read_bytes() != original
+
+
+def test_mpl_save_figure_cache_key_hit_does_not_render(tmp_path, monkeypatch):
+    cache = ExportCache(tmp_path / "cache")
+    fig = simple_plot([1, 2, 3])
+    filepath = str(tmp_path / "test.png")
+    apc.mpl.save_figure(filepath, size="float", figure=fig, cache=cache, cache_key="v1")
+
+    calls = []
+    monkeypatch.setattr(Figure, "savefig", lambda *args, **kwargs: calls.append(args))
+    apc.mpl.save_figure(filepath, size="float", figure=fig, cache=cache, cache_key="v1")
+    plt.close(fig)
+
+    assert cache.stats.hits == 1
+    assert calls == []
@@ -1,9 +1,13 @@
+import matplotlib.colors as mcolors
 import numpy as np
 import pytest
 
 import arcadia_pycolor as apc
 from arcadia_pycolor import Gradient, HexCode
 from arcadia_pycolor.colors import black, white
+from arcadia_pycolor.norms import EqualizeNorm, LinearNorm, LogNorm, PercentileNorm, TwoSlopeNorm
+from arcadia_pycolor.sketch import QuantileSketch
+from arcadia_pycolor.utils import is_non_decreasing
 
 from .test_hexcode import INVALID_HEXCODES
 
@@ -173,6 +177,73 @@ def test_map_values_invalid_cases(black_to_white_gradient: Gradient):
         black_to_white_gradient.map_values([0, 1], min_value=1, max_value=1)
 
 
+@pytest.mark.parametrize("gradient", apc.gradients.all_gradients)
+def test_map_array_matches_map_values(gradient: Gradient):
+    values = np.random.default_rng(0).normal(size=500)
+    colors = gradient.map_array(values, min_value=-2, max_value=2)
+    expected = [color.hex_code for color in gradient.map_values(values.tolist(), -2, 2)]
+    assert [mcolors.to_hex(color / 255) for color in colors] == expected
+
+
+def test_map_array_shapes_and_nan(black_to_white_gradient: Gradient):
+    colors = black_to_white_gradient.map_array(np.array([[0, np.nan], [0.5, 1]]))
+    assert colors.shape == (2, 2, 4)
+    np.testing.assert_array_equal(colors[0, 1], [0, 0, 0, 0])
+    np.testing.assert_array_equal(colors[1, 1], [255, 255, 255, 255])
+
+    np.testing.assert_array_equal(black_to_white_gradient.map_array(0.0, 0, 1), [0, 0, 0, 255])
+
+    with pytest.raises(ValueError, match="must be greater than"):
+        black_to_white_gradient.map_array([1, 1])
+    with pytest.raises(ValueError):
+        black_to_white_gradient.map_array([0, 1], out=np.empty((2, 3), dtype=np.uint8))
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_map_array_memmap(black_to_white_gradient: Gradient, tmp_path, workers):
+    values = np.lib.format.open_memmap(tmp_path / "values.npy", "w+", np.float32, (101, 7))
+    values[:] = np.random.default_rng(0).uniform(-5, 5, size=values.shape)
+    out = np.lib.format.open_memmap(tmp_path / "colors.npy", "w+", np.uint8, (101, 7, 4))
+
+    result = black_to_white_gradient.map_array(values, out=out, chunk_size=10, workers=workers)
+    assert result is out
+    np.testing.assert_array_equal(out, black_to_white_gradient.map_array(np.asarray(values)))
+
+
+def test_map_chunks(black_to_white_gradient: Gradient):
+    chunks = [np.array([0.0, 1.0]), np.array([2.0, 4.0])]
+    colors = list(black_to_white_gradient.map_chunks(chunks))
+    expected = black_to_white_gradient.map_array(np.concatenate(chunks))
+    np.testing.assert_array_equal(np.concatenate(colors), expected)
+
+    # A one-shot iterator can only be mapped with a known range.
+    colors = list(black_to_white_gradient.map_chunks(iter(chunks), min_value=0, max_value=4))
+    np.testing.assert_array_equal(np.concatenate(colors), expected)
+    with pytest.raises(ValueError, match="second pass"):
+        black_to_white_gradient.map_chunks(iter(chunks))
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_map_array_in_place(gradient_with_extremes: Gradient, dtype):
+    values = np.random.default_rng(0).uniform(-1, 2, size=(50, 3)).astype(dtype)
+    values[0, 0] = np.nan
+    values = np.ma.masked_array(values, mask=values > 1.9)
+    expected = gradient_with_extremes.map_array(values.copy(), 0, 1)
+
+    chunks = [values[:20].copy(), values[20:].copy()]
+    colors = gradient_with_extremes.map_array(values, 0, 1, chunk_size=7, in_place=True)
+    np.testing.assert_array_equal(colors, expected)
+    colors = list(gradient_with_extremes.map_chunks(chunks, 0, 1, in_place=True))
+    np.testing.assert_array_equal(np.concatenate(colors), expected)
+
+    with pytest.raises(ValueError, match="float32 or float64"):
+        gradient_with_extremes.map_array(np.arange(4), in_place=True)
+    read_only = np.linspace(0, 1, 4)
+    read_only.flags.writeable = False
+    with pytest.raises(ValueError, match="read-only"):
+        gradient_with_extremes.map_array(read_only, in_place=True)
+
+
 def test_gradient_num_anchors():
     """Test that a Gradient's num_anchors returns the expected count."""
     colors = [HexCode("white", "#FFFFFF"), HexCode("black", "#000000")]
@@ -222,3 +293,232 @@ def test_builtin_diverging_gradients_to_mpl_cmap(gradient):
     """Regression: all built-in diverging gradients must convert to a matplotlib colormap."""
     cmap = gradient.to_mpl_cmap()
     assert cmap is not None
+
+
+def test_map_array_with_norm(black_to_white_gradient: Gradient):
+    values = np.random.default_rng(0).lognormal(sigma=2, size=(100, 10))
+    norm = PercentileNorm(QuantileSketch().update(values), lower=5, upper=95)
+    expected = black_to_white_gradient.map_array(values, min_value=norm.vmin, max_value=norm.vmax)
+    np.testing.assert_array_equal(black_to_white_gradient.map_array(values, norm=norm), expected)
+
+    # Norms are applied to each chunk of a one-shot stream.
+    chunks = iter(list(values))
+    colors = np.stack(list(black_to_white_gradient.map_chunks(chunks, norm=norm)))
+    np.testing.assert_array_equal(colors, expected)
+
+    # An equalized image uses every part of the gradient about equally.
+    norm = EqualizeNorm(QuantileSketch().update(values))
+    gray_levels = black_to_white_gradient.map_array(values, norm=norm)[..., 0]
+    assert abs(np.median(gray_levels) - 128) < 10
+
+    # A norm without a range is scaled to the values.
+    colors = black_to_white_gradient.map_array([1.0, 3.0], norm=LinearNorm())
+    np.testing.assert_array_equal(colors[:, 0], [0, 255])
+
+    with pytest.raises(ValueError, match="not both"):
+        black_to_white_gradient.map_array(values, min_value=0, norm=norm)
+
+
+@pytest.mark.parametrize(
+    "norm, mpl_norm",
+    [
+        (TwoSlopeNorm(0, vmin=-1, vmax=4), mcolors.TwoSlopeNorm(0, vmin=-1, vmax=4)),
+        (LogNorm(0.1, 4), mcolors.LogNorm(0.1, 4)),
+    ],
+)
+def test_map_with_nonlinear_norms(norm, mpl_norm):
+    gradient = apc.gradients.red_blue
+    values = np.linspace(-1, 4, 501)
+    values = values[values > 0] if isinstance(norm, LogNorm) else values
+    expected = [mcolors.to_hex(color) for color in gradient.to_mpl_cmap()(mpl_norm(values))]
+
+    colors = gradient.map_array(values, norm=norm)
+    assert [mcolors.to_hex(color / 255) for color in colors] == expected
+    assert gradient.map_values(values.tolist(), norm=norm) == expected
+
+
+@pytest.fixture
+def gradient_with_extremes(black_to_white_gradient: Gradient) -> Gradient:
+    return Gradient(
+        "extremes",
+        black_to_white_gradient.anchor_colors,
+        under=HexCode("under", "#0000FF"),
+        over=HexCode("over", "#FF0000"),
+        bad=HexCode("bad", "#00FF00"),
+    )
+
+
+def test_map_array_extremes(black_to_white_gradient: Gradient, gradient_with_extremes: Gradient):
+    values = np.ma.masked_array([-1, 0, 1, 2, np.nan, 0.5], mask=[0, 0, 0, 0, 0, 1])
+    expected_hex_codes = ["#0000ff", "#000000", "#ffffff", "#ff0000", "#00ff00", "#00ff00"]
+
+    colors = gradient_with_extremes.map_array(values, min_value=0, max_value=1)
+    assert [mcolors.to_hex(color / 255) for color in colors] == expected_hex_codes
+    colors = gradient_with_extremes.map_values(values, min_value=0, max_value=1)
+    assert colors == expected_hex_codes
+
+    # By default, out-of-range values are clamped and bad values are transparent.
+    colors = black_to_white_gradient.map_array(values, min_value=0, max_value=1)
+    np.testing.assert_array_equal(colors[[0, 3]], [[0, 0, 0, 255], [255, 255, 255, 255]])
+    np.testing.assert_array_equal(colors[4:], 0)
+
+    # Masked values are ignored when computing the range.
+    values = np.ma.masked_array([0, 1, 100], mask=[0, 0, 1])
+    colors = black_to_white_gradient.map_array(values)
+    np.testing.assert_array_equal(colors[:2, 0], [0, 255])
+    colors = list(black_to_white_gradient.map_chunks([values[:2], values[2:]]))
+    np.testing.assert_array_equal(colors[0][:, 0], [0, 255])
+
+
+def test_extremes_in_derived_gradients_and_cmap(gradient_with_extremes: Gradient):
+    reversed_gradient = gradient_with_extremes.reverse()
+    assert (reversed_gradient.under.name, reversed_gradient.over.name) == ("over", "under")
+
+    combined = gradient_with_extremes + gradient_with_extremes.reverse()
+    assert (combined.under.name, combined.over.name, combined.bad.name) == (
+        "under",
+        "under",
+        "bad",
+    )
+
+    cmap = gradient_with_extremes.to_mpl_cmap()
+    assert mcolors.to_hex(cmap.get_under()) == "#0000ff"
+    assert mcolors.to_hex(cmap.get_over()) == "#ff0000"
+    assert mcolors.to_hex(cmap.get_bad()) == "#00ff00"
+
+    lightness_gradient = Gradient(
+        "extremes",
+        [black, HexCode("gray", "#808080"), white],
+        under=gradient_with_extremes.under,
+        over=gradient_with_extremes.over,
+        bad=gradient_with_extremes.bad,
+    ).interpolate_lightness()
+    assert (lightness_gradient.under, lightness_gradient.over, lightness_gradient.bad) == (
+        gradient_with_extremes.under,
+        gradient_with_extremes.over,
+        gradient_with_extremes.bad,
+    )
+
+    gradient = Gradient.from_dict(
+        "extremes", {"black": "#000000", "white": "#FFFFFF"}, under="#0000FF", bad="#00FF00"
+    )
+    assert gradient.under == HexCode("under", "#0000FF")
+    assert gradient.over is None
+    assert gradient.bad == HexCode("bad", "#00FF00")
+
+    with pytest.raises(ValueError, match="under, over, and bad"):
+        Gradient("invalid", gradient_with_extremes.anchor_colors, bad="#000000")  # type: ignore
+
+
+@pytest.mark.parametrize("interpolation", ["cam02ucs", "oklab"])
+def test_perceptual_interpolation(interpolation: str):
+    gradient = Gradient(
+        "perceptual",
+        [HexCode("blue", "#0000FF"), HexCode("yellow", "#FFFF00")],
+        interpolation=interpolation,
+    )
+    colors = gradient.perceptual_colors()
+    assert colors.shape == (apc.gradient.PERCEPTUAL_LOOKUP_TABLE_SIZE, 3)
+    assert gradient.perceptual_colors() is colors
+    np.testing.assert_allclose(colors[[0, -1]], [[0, 0, 1], [1, 1, 0]], atol=1e-5)
+
+    # The midpoint differs from the muddy sRGB midpoint.
+    srgb_midpoint = Gradient("srgb", gradient.anchor_colors).map_values([0.5], 0, 1)[0]
+    midpoint = gradient.map_values([0.5], 0, 1)[0]
+    assert midpoint != srgb_midpoint
+
+    # Every consumer reads the same colors.
+    values = np.linspace(0, 1, 1001)
+    hex_codes = [mcolors.to_hex(color / 255) for color in gradient.map_array(values)]
+    assert gradient.map_values(values) == hex_codes
+    expected_lookup_table = np.round(colors * 255)
+    np.testing.assert_array_equal(gradient.lookup_table()[:, :3], expected_lookup_table)
+    colorscale = gradient.to_plotly_colorscale()
+    assert colorscale[128][1] == mcolors.to_hex(gradient.to_mpl_cmap()(128 / 255))
+    assert gradient.reverse().interpolation == interpolation
+
+    # Derived gradients keep the interpolation.
+    three_colors = [black, HexCode("gray", "#808080"), white]
+    lightness_gradient = Gradient("perceptual", three_colors, interpolation=interpolation)
+    assert lightness_gradient.interpolate_lightness().interpolation == interpolation
+    colors = {color.name: color.hex_code for color in three_colors}
+    assert Gradient.from_dict("perceptual", colors, interpolation=interpolation).interpolation == (
+        interpolation
+    )
+
+
+def test_cam02ucs_interpolation_has_uniform_steps():
+    gradient = Gradient(
+        "perceptual",
+        [HexCode("dark", "#3B1F63"), HexCode("light", "#F4E3B1")],
+        interpolation="cam02ucs",
+    )
+    coordinates = apc.colorspace.rgb1_to_cam02ucs(gradient.perceptual_colors())
+    steps = np.linalg.norm(np.diff(coordinates, axis=0), axis=-1)
+    np.testing.assert_allclose(steps, steps.mean(), rtol=1e-6)
+
+
+def test_invalid_interpolation():
+    with pytest.raises(ValueError, match="Invalid interpolation"):
+        Gradient("invalid", [black, white], interpolation="hsv")
+    with pytest.raises(ValueError, match="sRGB"):
+        Gradient("srgb", [black, white]).perceptual_colors()
+
+
+@pytest.mark.parametrize("gradient", apc.gradients.all_gradients)
+def test_optimize_uniformity_all_gradients(gradient: Gradient):
+    result = gradient.optimize_uniformity()
+    assert result.after.objective() <= result.before.objective() + 1e-3
+    assert result.gradient.anchor_colors == gradient.anchor_colors
+    assert result.gradient.anchor_values[0] == 0 and result.gradient.anchor_values[-1] == 1
+    # The centers of diverging gradients stay in place.
+    if 0.5 in gradient.anchor_values:
+        assert result.gradient.anchor_values.count(0.5) == gradient.anchor_values.count(0.5)
+
+    result = gradient.optimize_uniformity(insert_anchors=2)
+    assert result.gradient.num_anchors == gradient.num_anchors + 2
+    assert is_non_decreasing(result.gradient.anchor_values)
+
+
+def test_optimize_uniformity_fixes_misplaced_anchor():
+    gray = HexCode("gray", mcolors.to_hex(Gradient("bw", [black, white]).sample([0.5])[0]))
+    gradient = Gradient("misplaced", [black, gray, white], [0, 0.15, 1])
+    result = gradient.optimize_uniformity(lightness_weight=1)
+
+    assert result.before.lightness_error > 0.1
+    assert result.after.lightness_error < 0.02
+    # The gray anchor moves to where the lightness would be linear.
+    lightness = [color.to_cam02ucs()[0] for color in (black, gray, white)]
+    expected_value = (lightness[1] - lightness[0]) / (lightness[2] - lightness[0])
+    assert result.gradient.anchor_values[1] == pytest.approx(expected_value, abs=0.03)
+    assert result.gradient.name == "misplaced_uniform"
+
+    with pytest.raises(ValueError, match="lightness_weight"):
+        gradient.optimize_uniformity(lightness_weight=2)
+    with pytest.raises(ValueError, match="insert_anchors"):
+        gradient.optimize_uniformity(insert_anchors=-1)
+
+
+def test_uniformity_metrics_of_perceptual_gradient():
+    gradient = Gradient("uniform", [black, white], interpolation="cam02ucs")
+    metrics = gradient.uniformity_metrics()
+    assert metrics.lightness_error < 1e-3
+    assert metrics.step_variation < 1e-3
+
+
+def test_quality_report():
+    report = Gradient("uniform", [black, white], interpolation="cam02ucs").quality_report()
+    assert report.normal.lightness_monotonicity == pytest.approx(1)
+    assert report.normal.lightness_reversals == 0
+    assert report.normal.step_variation < 1e-3
+    assert report.normal.min_lightness == pytest.approx(0, abs=0.01)
+    assert report.normal.max_lightness == pytest.approx(100, abs=0.01)
+    # Grays look the same with every type of color vision deficiency.
+    for metrics in report.cvd.values():
+        assert metrics.lightness_reversals == 0
+        assert metrics.max_lightness == pytest.approx(report.normal.max_lightness, abs=0.01)
+
+    report = apc.gradients.red_blue.quality_report(cvd=False)
+    assert report.normal.lightness_reversals == 1
+    assert report.normal.lightness_monotonicity < 0.1
+    assert report.cvd == {}
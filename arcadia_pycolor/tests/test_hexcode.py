@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 
 from arcadia_pycolor import HexCode
@@ -147,3 +149,10 @@ def test_hexcode_to_rgb(name, hex_code, rgb):
 )
 def test_hexcode_string(name, hex_code):
     assert str(HexCode(name, hex_code)) == hex_code
+
+
+def test_hexcode_pickle_roundtrip():
+    color = HexCode("white", "#FFFFFF")
+    unpickled = pickle.loads(pickle.dumps(color))
+    assert unpickled == color
+    assert unpickled.name == "white"
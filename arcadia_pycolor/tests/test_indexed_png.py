@@ -0,0 +1,68 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from PIL import Image
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.indexed_png import convert_to_indexed_png
+
+
+def line_plot():
+    fig, ax = plt.subplots(figsize=apc.mpl.get_figure_dimensions("float"))
+    rng = np.random.default_rng(0)
+    for color in apc.palettes.primary[:5]:
+        ax.plot(np.cumsum(rng.normal(size=200)), color=color)
+    ax.set_xlabel("time")
+    return fig
+
+
+def test_mpl_save_figure_indexed_png(tmp_path):
+    fig = line_plot()
+    apc.mpl.save_figure(tmp_path / "rgba.png", size="float", figure=fig)
+    apc.mpl.save_figure(tmp_path / "indexed.png", size="float", figure=fig, indexed_png=True)
+    plt.close(fig)
+
+    with Image.open(tmp_path / "rgba.png") as image:
+        assert image.mode == "RGBA"
+        rgba = np.asarray(image.convert("RGBA"), dtype=float)
+    with Image.open(tmp_path / "indexed.png") as image:
+        assert image.mode == "P"
+        indexed = np.asarray(image.convert("RGBA"), dtype=float)
+
+    assert rgba.shape == indexed.shape
+    assert (tmp_path / "indexed.png").stat().st_size < (tmp_path / "rgba.png").stat().st_size / 2
+
+    # Pixels drawn in the Arcadia colors keep their color exactly.
+    for color in apc.palettes.primary[:5]:
+        is_color = (rgba == [*color.to_rgb(), 255]).all(axis=-1)
+        assert is_color.any()
+        assert (indexed[is_color] == [*color.to_rgb(), 255]).all()
+
+
+def test_convert_to_indexed_png_exact_for_few_colors(tmp_path):
+    pixels = np.zeros((10, 10, 4), dtype=np.uint8)
+    pixels[:5] = [*apc.aegean.to_rgb(), 255]
+    pixels[5:] = [0, 0, 0, 0]
+    Image.fromarray(pixels).save(tmp_path / "test.png")
+
+    assert convert_to_indexed_png(tmp_path / "test.png")
+    with Image.open(tmp_path / "test.png") as image:
+        assert image.mode == "P"
+        assert np.array_equal(np.asarray(image.convert("RGBA")), pixels)
+
+
+def test_convert_to_indexed_png_keeps_file_above_max_delta_e(tmp_path):
+    # Random noise cannot be represented by a 256-color palette.
+    pixels = np.random.default_rng(0).integers(0, 256, size=(64, 64, 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    Image.fromarray(pixels).save(tmp_path / "noise.png")
+    original = (tmp_path / "noise.png").read_bytes()
+
+    assert not convert_to_indexed_png(tmp_path / "noise.png")
+    assert (tmp_path / "noise.png").read_bytes() == original
+
+
+def test_convert_to_indexed_png_invalid_ramp_steps(tmp_path):
+    Image.fromarray(np.zeros((2, 2, 4), dtype=np.uint8)).save(tmp_path / "test.png")
+    with pytest.raises(ValueError, match="ramp_steps"):
+        convert_to_indexed_png(tmp_path / "test.png", ramp_steps=0)
@@ -0,0 +1,104 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.mpl import density_scatter
+from arcadia_pycolor.norms import LinearNorm
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=100_000)
+    return x, x + rng.normal(size=100_000)
+
+
+@pytest.fixture
+def ax():
+    fig, ax = plt.subplots()
+    yield ax
+    plt.close(fig)
+
+
+def test_density_scatter_counts(ax):
+    # Points at the centers of bins, so that they are binned exactly.
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 40, size=10_000) + 0.5
+    y = rng.integers(0, 30, size=10_000) ** 2 / 30 + 0.5
+    gradient = apc.gradients.viridis
+    image = density_scatter(
+        ax, x, y, gradient=gradient, bins=(40, 30), norm="linear", x_range=(0, 40), y_range=(0, 30)
+    )
+
+    counts, _, _ = np.histogram2d(y, x, bins=(30, 40), range=((0, 30), (0, 40)))
+    expected = gradient.map_array(np.where(counts > 0, counts, np.nan), 0, counts.max())
+    np.testing.assert_array_equal(image.get_array(), expected)
+    # Empty bins are transparent.
+    assert (counts == 0).any()
+    assert (image.get_array()[counts == 0, 3] == 0).all()
+    assert len(ax.images) == 1 and not ax.collections
+
+
+def test_density_scatter_range(ax, points):
+    x, y = points
+    image = density_scatter(ax, x, y)
+    assert image.get_extent() == [x.min(), x.max(), y.min(), y.max()]
+
+
+@pytest.mark.parametrize("norm", ["eq_hist", "log", LinearNorm(0, 10)])
+def test_density_scatter_norms(ax, points, norm):
+    x, y = points
+    image = density_scatter(ax, x, y, bins=50, norm=norm, x_range=(-1, 1), y_range=(-1, 1))
+    assert image.get_array().shape == (50, 50, 4)
+    assert image.get_extent() == [-1, 1, -1, 1]
+
+
+def test_density_scatter_default_bins_match_axes(ax, points):
+    image = density_scatter(ax, *points)
+    bbox = ax.get_window_extent()
+    assert image.get_array().shape == (round(bbox.height), round(bbox.width), 4)
+
+
+def test_density_scatter_ignores_nan_and_single_point(ax):
+    image = density_scatter(ax, [0.0, np.nan], [1.0, 2.0], bins=3)
+    rgba = image.get_array()
+    # The only point is in the middle bin and gets the last color of the gradient.
+    np.testing.assert_array_equal(rgba[1, 1], apc.gradients.magma.lookup_table()[-1])
+    assert (rgba[..., 3] > 0).sum() == 1
+
+
+def test_density_scatter_counts_points_at_range_maximum(ax):
+    # Rounding places the maximum of some ranges slightly beyond the last bin.
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        x = rng.uniform(-1e3, 1e3, size=50)
+        y = rng.uniform(-1e-3, 1e-3, size=50)
+        bins = (int(rng.integers(1, 100)), int(rng.integers(1, 100)))
+        image = density_scatter(ax, x, y, bins=bins, norm=LinearNorm(0, 1))
+        counts, _, _ = np.histogram2d(x, y, bins=bins)
+        assert (image.get_array()[..., 3] > 0).sum() == np.count_nonzero(counts)
+
+
+def test_density_scatter_empty(ax):
+    for values in ([], [np.nan, np.nan]):
+        image = density_scatter(ax, values, values, bins=4)
+        assert image.get_extent() == [0, 1, 0, 1]
+        assert (image.get_array()[..., 3] == 0).all()
+
+    # Ranges can be given as arrays.
+    image = density_scatter(ax, [], [], bins=4, x_range=np.array([0, 4]))
+    assert image.get_extent() == [0, 4, 0, 1]
+
+
+def test_density_scatter_invalid(ax, points):
+    with pytest.raises(ValueError, match="same length"):
+        density_scatter(ax, [1, 2], [1])
+    with pytest.raises(ValueError, match="Invalid norm"):
+        density_scatter(ax, *points, norm="sqrt")
+    with pytest.raises(ValueError, match="bins"):
+        density_scatter(ax, *points, bins=0)
+    with pytest.raises(ValueError, match="y_range must be finite and increasing"):
+        density_scatter(ax, *points, y_range=(1, 0))
+    with pytest.raises(ValueError, match="x_range must be finite and increasing"):
+        density_scatter(ax, *points, x_range=(0, np.inf))
@@ -1,6 +1,7 @@
 import logging
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 
 import arcadia_pycolor as apc
@@ -93,3 +94,44 @@ def test_mpl_save_figure_no_filetype(tmp_path):
             size="half_square",
             filetypes=None,
         )
+
+
+@pytest.mark.parametrize("filetype", ["png", "pdf", "svg", "svgz", "eps", "ps"])
+def test_mpl_save_figure_deterministic(tmp_path, filetype):
+    """Re-exporting an identical figure in deterministic mode produces identical bytes."""
+    outputs = []
+    filepath = tmp_path / f"test.{filetype}"
+    for _ in range(2):
+        simple_plot()
+        plt.title("Deterministic")
+        apc.mpl.save_figure(filepath, size="half_square", deterministic=True)
+        plt.close()
+        outputs.append(filepath.read_bytes())
+
+    assert outputs[0] == outputs[1]
+    assert b"CreationDate" not in outputs[0] or b"1970" in outputs[0]
+
+
+def test_mpl_save_figure_rasterize_above(tmp_path, caplog):
+    rng = np.random.default_rng(0)
+    fig, ax = plt.subplots()
+    scatter = ax.scatter(rng.random(1_000), rng.random(1_000), label="dense")
+    (line,) = ax.plot([0, 1], [0, 1], label="sparse")
+    ax.legend()
+
+    dense_artists = apc.mpl.find_dense_artists(fig, threshold=500)
+    assert [dense_artist.artist for dense_artist in dense_artists] == [scatter]
+    assert dense_artists[0].num_elements == 1_000
+
+    with caplog.at_level(logging.INFO, logger="arcadia_pycolor.mpl"):
+        apc.mpl.save_figure(
+            tmp_path / "test.svg", size="half_square", figure=fig, rasterize_above=500
+        )
+
+    assert "PathCollection 'dense' (1,000 elements)" in caplog.text
+    assert "<image" in (tmp_path / "test.svg").read_text()
+
+    # The rasterization is only applied while saving.
+    assert not scatter.get_rasterized()
+    assert not line.get_rasterized()
+    plt.close(fig)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor import Gradient
+from arcadia_pycolor.multichannel import composite
+from arcadia_pycolor.norms import LinearNorm
+from arcadia_pycolor.utils import chunked_min_max
+
+GRADIENTS = [
+    Gradient(f"black_{color.name}", [apc.black, color])
+    for color in (apc.aegean, apc.dragon, apc.canary)
+]
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 4096, size=(3, 50, 70), dtype=np.uint16)
+
+
+def reference(stack, norms, blend):
+    colors = [
+        gradient.map_array(channel, norm=norm)[..., :3].astype(np.float64)
+        for channel, gradient, norm in zip(stack, GRADIENTS, norms, strict=True)
+    ]
+    if blend == "additive":
+        return np.minimum(np.sum(colors, axis=0), 255).astype(np.uint8)
+    return np.max(colors, axis=0).astype(np.uint8)
+
+
+@pytest.mark.parametrize("blend", ["additive", "max"])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_composite(stack, blend, workers):
+    norms = [LinearNorm(0, 4095), LinearNorm(100, 2000), LinearNorm(0, 1000)]
+    rgb = composite(stack, GRADIENTS, norms, blend=blend, tile_size=16, workers=workers)
+    assert rgb.shape == (50, 70, 3)
+    assert rgb.dtype == np.uint8
+    np.testing.assert_array_equal(rgb, reference(stack, norms, blend))
+
+
+def test_composite_autoscale_and_out(stack):
+    channels = [channel.astype(np.float32) for channel in stack]
+    channels[0][0, 0] = np.nan
+    out = np.empty((50, 70, 3), dtype=np.uint8)
+    assert composite(channels, GRADIENTS, out=out, tile_size=32) is out
+
+    norms = [LinearNorm(*chunked_min_max([channel])) for channel in channels]
+    np.testing.assert_array_equal(out, reference(channels, norms, "additive"))
+
+
+@pytest.mark.parametrize("norms", [None, [None, LinearNorm(0, 0), LinearNorm(7, 7)]])
+def test_composite_blank_and_constant_channels(stack, norms):
+    blank = np.zeros((50, 70), dtype=np.float32)
+    blank[0, 0] = np.nan
+    channels = [stack[0], blank, np.full_like(stack[2], 7)]
+    rgb = composite(channels, GRADIENTS, norms=norms)
+
+    # The blank and constant channels are mapped to black, the first color of their gradients.
+    np.testing.assert_array_equal(rgb, composite(stack[:1], GRADIENTS[:1]))
+    with pytest.raises(ValueError, match="must be greater than"):
+        composite(channels, GRADIENTS, norms=[None, None, LinearNorm(8, 7)])
+
+
+def test_composite_invalid(stack):
+    with pytest.raises(ValueError, match="Invalid blend"):
+        composite(stack, GRADIENTS, blend="screen")
+    with pytest.raises(ValueError, match="number of gradients"):
+        composite(stack, GRADIENTS[:2])
+    with pytest.raises(ValueError, match="number of norms"):
+        composite(stack, GRADIENTS, norms=[None])
+    with pytest.raises(ValueError, match="same shape"):
+        composite([stack[0], stack[1, :10], stack[2]], GRADIENTS)
+    with pytest.raises(ValueError, match="out must be"):
+        composite(stack, GRADIENTS, out=np.empty((50, 70, 4), dtype=np.uint8))
@@ -0,0 +1,133 @@
+import matplotlib.colors as mcolors
+import numpy as np
+import pytest
+
+from arcadia_pycolor.norms import (
+    EqualizeNorm,
+    LinearNorm,
+    LogNorm,
+    Norm,
+    PercentileNorm,
+    PowerNorm,
+    SymLogNorm,
+    TwoSlopeNorm,
+)
+from arcadia_pycolor.sketch import QuantileSketch
+
+
+def test_linear_norm():
+    norm = LinearNorm(2, 4)
+    np.testing.assert_allclose(norm([1, 2, 3, 4, np.nan]), [-0.5, 0, 0.5, 1, np.nan])
+    assert norm(np.array([3], dtype=np.float32)).dtype == np.float32
+    assert norm(np.array([3], dtype=np.uint16)).dtype == np.float32
+    assert norm(np.array([3], dtype=np.int64)).dtype == np.float64
+
+    # Normalize in place.
+    values = np.array([2.0, 4.0])
+    assert norm(values, out=values) is values
+    np.testing.assert_array_equal(values, [0, 1])
+
+    with pytest.raises(ValueError, match="must be greater than"):
+        LinearNorm(1, 1).validate()
+    with pytest.raises(ValueError, match="must be set"):
+        LinearNorm(1).validate()
+
+
+def test_percentile_norm_ignores_outliers():
+    values = np.concatenate([np.linspace(0, 1, 1000), [1e6]])
+    norm = PercentileNorm(QuantileSketch().update(values), lower=0, upper=99)
+    assert norm.vmin == 0
+    assert norm.vmax == pytest.approx(1, rel=0.01)
+
+    with pytest.raises(ValueError, match="percentiles"):
+        PercentileNorm(QuantileSketch().update(values), lower=50, upper=50)
+
+
+def test_equalize_norm_flattens_distribution():
+    values = np.random.default_rng(0).lognormal(sigma=2, size=100_000)
+    norm = EqualizeNorm(QuantileSketch().update(values))
+    positions = norm(values)
+
+    histogram, _ = np.histogram(positions, bins=10, range=(0, 1))
+    np.testing.assert_allclose(histogram / len(values), 0.1, atol=0.01)
+    assert norm(values.min() / 2) == -np.inf
+    assert np.isnan(norm(np.nan))
+
+    with pytest.raises(ValueError, match="all equal"):
+        EqualizeNorm(QuantileSketch().update([1, 1, 1])).validate()
+
+
+@pytest.mark.parametrize(
+    "norm, mpl_norm, values",
+    [
+        (LinearNorm(-3, 5), mcolors.Normalize(-3, 5), np.linspace(-3, 5, 1001)),
+        (LogNorm(1e-3, 1e4), mcolors.LogNorm(1e-3, 1e4), np.geomspace(1e-3, 1e4, 1001)),
+        (
+            SymLogNorm(0.1, linscale=0.5, vmin=-100, vmax=1000),
+            mcolors.SymLogNorm(0.1, linscale=0.5, vmin=-100, vmax=1000),
+            np.linspace(-100, 1000, 100_001),
+        ),
+        (
+            SymLogNorm(2, vmin=-50, vmax=50, base=2),
+            mcolors.SymLogNorm(2, vmin=-50, vmax=50, base=2),
+            np.linspace(-50, 50, 1001),
+        ),
+        (PowerNorm(0.5, 0, 4), mcolors.PowerNorm(0.5, 0, 4), np.linspace(0, 4, 1001)),
+        (
+            TwoSlopeNorm(0, vmin=-1, vmax=10),
+            mcolors.TwoSlopeNorm(0, vmin=-1, vmax=10),
+            np.linspace(-1, 10, 1001),
+        ),
+    ],
+)
+def test_norms_match_matplotlib(norm, mpl_norm, values):
+    np.testing.assert_allclose(norm(values), mpl_norm(values), atol=1e-12)
+    np.testing.assert_allclose(norm(values.astype(np.float32)), mpl_norm(values), atol=1e-5)
+    assert np.isnan(norm(np.nan))
+
+
+def test_norms_out_of_range_and_invalid_values():
+    # Out-of-range values stay out of range, so they can be mapped to the under or over color.
+    assert PowerNorm(2, 0, 1)(-1) < 0
+    assert TwoSlopeNorm(0, -1, 1)(np.array([-2, 2])).tolist() == [-0.5, 1.5]
+    assert np.isnan(LogNorm(1, 10)(np.array([0, -1]))).all()
+
+    with pytest.raises(ValueError, match="positive"):
+        LogNorm(0, 1).validate()
+    with pytest.raises(ValueError, match="ascending order"):
+        TwoSlopeNorm(2, 0, 1).validate()
+    with pytest.raises(ValueError, match="linthresh"):
+        SymLogNorm(0)
+
+
+def test_norm_autoscale():
+    norm = LogNorm()
+    norm.autoscale_chunks([np.array([-1.0, 0.0, 2.0]), np.array([np.nan, 8.0])])
+    assert (norm.vmin, norm.vmax) == (2, 8)
+
+    # A range on one side of the center is mirrored to the other side.
+    norm = TwoSlopeNorm(0)
+    norm.autoscale(1, 4)
+    assert (norm.vmin, norm.vmax) == (-4, 4)
+
+
+def test_norm_is_abstract():
+    with pytest.raises(TypeError, match="abstract"):
+        Norm()  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "norm",
+    [
+        LinearNorm(1, 100),
+        LogNorm(1, 100),
+        SymLogNorm(10, vmin=-100, vmax=100),
+        PowerNorm(2, 1, 100),
+        TwoSlopeNorm(50, 1, 100),
+    ],
+)
+def test_norm_in_place_float32(norm):
+    values = np.linspace(-100, 100, 21, dtype=np.float32)
+    expected = norm(values.astype(np.float64))
+    assert norm(values, out=values) is values
+    np.testing.assert_allclose(values, expected, atol=1e-6)
@@ -1,5 +1,10 @@
+import itertools
+
+import matplotlib.colors as mcolors
+import numpy as np
 import pytest
 
+import arcadia_pycolor as apc
 from arcadia_pycolor import HexCode, Palette
 
 from .test_hexcode import INVALID_HEXCODES
@@ -101,3 +106,196 @@ def test_palette_slicing():
 
     palette = Palette("test", colors)
     assert palette.reverse().colors == palette[::-1].colors
+
+
+@pytest.mark.parametrize("metric", ["cam02ucs", "ciede2000"])
+@pytest.mark.parametrize("cvd", [None, "d", "p", "t"])
+def test_palette_distance_matrix(metric, cvd):
+    palette = apc.palettes.primary
+    distances = palette.distance_matrix(metric=metric, cvd=cvd)
+
+    assert distances.shape == (len(palette), len(palette))
+    np.testing.assert_allclose(distances, distances.T)
+    np.testing.assert_array_equal(np.diag(distances), 0)
+    assert (distances[~np.eye(len(palette), dtype=bool)] > 0).all()
+    assert palette.distance_matrix(metric=metric, cvd=cvd) is distances
+    assert not distances.flags.writeable
+
+
+def test_palette_distance_matrix_matches_hexcode_cam02ucs():
+    palette = apc.palettes.secondary
+    coordinates = np.array([color.to_cam02ucs() for color in palette])
+    expected = np.linalg.norm(coordinates[:, np.newaxis] - coordinates, axis=-1)
+    np.testing.assert_allclose(palette.distance_matrix(), expected)
+
+
+def test_palette_distance_summary():
+    palette = Palette("test", [apc.black, apc.white, HexCode("near_black", "#050505")])
+    summary = palette.distance_summary()
+    assert summary.worst_pair == (apc.black, palette[2])
+    assert summary.min_distance == pytest.approx(palette.distance_matrix()[0, 2])
+
+    # Red and green are much less distinct with deuteranomaly.
+    palette = Palette("test", [HexCode("red", "#ff0000"), HexCode("green", "#00ff00")])
+    assert palette.distance_summary(cvd="d").min_distance < palette.distance_summary().min_distance
+
+
+def test_palette_distance_invalid_arguments():
+    with pytest.raises(ValueError):
+        apc.palettes.primary.distance_matrix(metric="invalid")
+    with pytest.raises(ValueError):
+        apc.palettes.primary.distance_matrix(cvd="x")
+    with pytest.raises(ValueError):
+        apc.palettes.primary[:1].distance_summary()
+
+
+def test_palette_extend_distinct_from_arcadia_colors():
+    palette = apc.palettes.primary.extend_distinct(20)
+    assert len(palette) == 20
+    assert palette.colors[:12] == apc.palettes.primary.colors
+    assert all(color in apc.palettes.all_colors.colors for color in palette)
+    assert len({color.hex_code for color in palette}) == 20
+
+    assert apc.palettes.primary.extend_distinct(5).colors == apc.palettes.primary.colors[:5]
+
+
+def test_palette_extend_distinct_is_greedy_farthest_point():
+    pool = apc.palettes.secondary
+    palette = Palette("seed", [apc.black]).extend_distinct(5, pool=pool, background=None)
+
+    # Pick the same colors by brute force.
+    picked = [apc.black]
+    for _ in range(4):
+        candidates = [color for color in pool if color not in picked]
+        picked.append(
+            max(
+                candidates,
+                key=lambda color: min(
+                    np.linalg.norm(np.subtract(color.to_cam02ucs(), other.to_cam02ucs()))
+                    for other in picked
+                ),
+            )
+        )
+    assert palette.colors == picked
+
+
+def test_palette_extend_distinct_constraints():
+    palette = Palette("empty", []).extend_distinct(
+        10, pool="gamut", lightness_range=(40, 70), cvd_types=["d", "p"]
+    )
+    assert len(palette) == 10
+    lightness = [color.to_cam02ucs()[0] for color in palette]
+    assert min(lightness) >= 40
+    assert max(lightness) <= 70
+
+    # Accounting for CVD makes the palette more distinct when viewed with deuteranomaly.
+    plain = Palette("empty", []).extend_distinct(10, pool="gamut", lightness_range=(40, 70))
+    assert (
+        palette.distance_summary(cvd="d").min_distance
+        > plain.distance_summary(cvd="d").min_distance
+    )
+
+
+def test_palette_extend_distinct_invalid_arguments():
+    with pytest.raises(ValueError):
+        apc.palettes.primary.extend_distinct(1000)
+    with pytest.raises(ValueError):
+        apc.palettes.primary.extend_distinct(20, pool="invalid")
+
+
+def _min_adjacent_distance(palette, distances):
+    indices = [apc.palettes.primary.colors.index(color) for color in palette]
+    return min(distances[a, b] for a, b in zip(indices[:-1], indices[1:], strict=True))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_palette_optimize_order(workers):
+    palette = apc.palettes.primary[:7]
+    optimized = palette.optimize_order(cvd_types=["d"], workers=workers, restarts=4)
+    assert sorted(optimized.colors) == sorted(palette.colors)
+
+    # Compare against the best of all orderings.
+    distances = np.minimum(
+        apc.palettes.primary.distance_matrix(), apc.palettes.primary.distance_matrix(cvd="d")
+    )
+    best = max(
+        _min_adjacent_distance([palette[i] for i in order], distances)
+        for order in itertools.permutations(range(len(palette)))
+    )
+    assert _min_adjacent_distance(optimized, distances) == pytest.approx(best)
+
+
+def test_palette_optimize_order_sum_objective():
+    palette = apc.palettes.secondary
+    optimized = palette.optimize_order(objective="sum", cvd_types=[])
+
+    def adjacent_sum(palette):
+        return sum(palette[i : i + 2].distance_matrix()[0, 1] for i in range(len(palette) - 1))
+
+    assert adjacent_sum(optimized) >= adjacent_sum(palette)
+
+
+def test_palette_optimize_order_invalid_arguments():
+    with pytest.raises(ValueError):
+        apc.palettes.primary.optimize_order(objective="max")
+    with pytest.raises(ValueError):
+        apc.palettes.primary.optimize_order(restarts=0)
+
+
+def test_palette_map_categories():
+    palette = apc.palettes.primary
+    colors = palette.map_categories(["b", "a", "b", None, float("nan")], output="hex")
+    assert colors.tolist() == [
+        palette[1].hex_code.lower(),
+        palette[0].hex_code.lower(),
+        palette[1].hex_code.lower(),
+        apc.chateau.hex_code.lower(),
+        apc.chateau.hex_code.lower(),
+    ]
+
+    rgba = palette.map_categories(np.array([["a", "b"], ["b", "a"]]))
+    assert rgba.shape == (2, 2, 4)
+    np.testing.assert_allclose(rgba[0, 0], mcolors.to_rgba(palette[0]))
+
+
+def test_palette_map_categories_mixed_types():
+    palette = apc.palettes.primary
+    colors = palette.map_categories(["a", 1, None, "a", 2.5, 1], output="hex")
+    hex_codes = [color.hex_code.lower() for color in palette[:3]]
+    fallback = apc.chateau.hex_code.lower()
+    # Labels that can't be sorted are assigned colors in order of first appearance.
+    assert colors.tolist() == [hex_codes[0], hex_codes[1], fallback, *hex_codes[:3:2], hex_codes[1]]
+
+    colors = palette.map_categories(["a", 1, "b"], order=[1, "b"], output="hex")
+    assert colors.tolist() == [fallback, *hex_codes[:2]]
+
+
+def test_palette_map_categories_all_missing_with_order():
+    palette = apc.palettes.primary
+    fallback = apc.chateau.hex_code.lower()
+    for labels in ([None, float("nan")], np.array([np.nan]), []):
+        colors = palette.map_categories(labels, order=["a", "b"], output="hex")
+        assert colors.tolist() == [fallback] * len(labels)
+
+
+def test_palette_map_categories_pandas():
+    pd = pytest.importorskip("pandas")
+    labels = pd.Series(["x", "y", None, "x"], dtype=pd.CategoricalDtype(["y", "x"]))
+    colors = apc.palettes.primary.map_categories(labels, output="hex", fallback="#000000")
+    assert colors.tolist() == ["#f28360", "#5088c5", "#000000", "#f28360"]
+
+    # A categorical without categories, or whose labels are all missing, gets the fallback.
+    for labels in (pd.Categorical([]), pd.Categorical([None, None], categories=["x"])):
+        colors = apc.palettes.primary.map_categories(labels, order=["x"], output="hex")
+        assert colors.tolist() == [apc.chateau.hex_code.lower()] * len(labels)
+
+
+def test_palette_map_categories_order_and_cycle():
+    palette = apc.Palette("test", [apc.black, apc.white])
+    colors = palette.map_categories(["c", "a", "d"], order=["a", "b", "c"], output="hex")
+    assert colors.tolist() == ["#000000", "#000000", apc.chateau.hex_code.lower()]
+
+    with pytest.raises(ValueError):
+        palette.map_categories(["a", "b", "c"], cycle=False)
+    with pytest.raises(ValueError):
+        palette.map_categories(["a"], output="rgb")
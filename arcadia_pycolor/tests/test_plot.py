@@ -0,0 +1,43 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.plot import compute_gradient_lightness, plot_gradient_lightness
+
+
+def test_compute_gradient_lightness():
+    data = compute_gradient_lightness([apc.gradients.viridis, "magma", "not_a_colormap"], steps=50)
+    assert data.names == ["viridis", "magma"]
+    assert data.positions.shape == (50,)
+    assert data.lightness.shape == (2, 50)
+    assert data.colors.shape == (2, 50, 3)
+    # Both gradients get lighter from start to end.
+    assert np.all(np.diff(data.lightness, axis=1) > 0)
+
+    expected = apc.colorspace.rgb1_to_cam02ucs(apc.gradients.viridis.sample(data.positions))
+    np.testing.assert_allclose(data.lightness[0], expected[:, 0])
+
+
+def test_compute_gradient_lightness_invalid():
+    with pytest.raises(TypeError):
+        compute_gradient_lightness([1])  # type: ignore
+
+
+def test_plot_gradient_lightness_on_axes():
+    fig, ax = plt.subplots()
+    data = plot_gradient_lightness(
+        [apc.gradients.viridis, apc.gradients.reds], ax=ax, show=False, return_lightness=True
+    )
+    assert isinstance(data, apc.plot.GradientLightness)
+    # All samples are drawn as a single collection.
+    assert len(ax.collections) == 1
+    assert len(ax.collections[0].get_offsets()) == 2 * 100
+    assert [label.get_text() for label in ax.get_xticklabels()] == ["viridis", "reds"]
+
+    # The computed lightness can be plotted again without being recomputed.
+    result = plot_gradient_lightness(data, show=False, return_fig=True, return_lightness=True)
+    replotted_fig, replotted = result  # type: ignore
+    assert replotted is data
+    assert replotted_fig is not fig
+    plt.close("all")
@@ -0,0 +1,90 @@
+import logging
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from plotly.subplots import make_subplots
+
+import arcadia_pycolor as apc
+
+
+def large_plot(num_points: int = 1000) -> go.Figure:
+    fig = make_subplots(rows=1, cols=2)
+    x = np.arange(num_points)
+    fig.add_trace(go.Scatter(x=[1, 2], y=[3, 4], name="small"), row=1, col=1)
+    fig.add_trace(
+        go.Scatter(x=x, y=x**2, mode="markers", marker_color=apc.aegean, name="large"),
+        row=1,
+        col=2,
+    )
+    fig.add_trace(go.Scatter(x=x, y=x, stackgroup="one", name="stacked"), row=1, col=1)
+    fig.add_trace(go.Histogram(x=x, name="histogram"), row=1, col=1)
+    return fig
+
+
+def test_promote_to_webgl(caplog):
+    fig = large_plot()
+    with caplog.at_level(logging.INFO, logger="arcadia_pycolor.plotly_utils"):
+        assert apc.plotly.promote_to_webgl(fig, threshold=100) == [1]
+
+    assert [type(trace).__name__ for trace in fig.data] == [
+        "Scatter",
+        "Scattergl",
+        "Scatter",
+        "Histogram",
+    ]
+    large = fig.data[1]
+    assert large.name == "large"
+    assert large.xaxis == "x2" and large.yaxis == "y2"
+    assert large.marker.color == apc.aegean.hex_code
+    np.testing.assert_array_equal(large.y, np.arange(1000) ** 2)
+    assert "Converted trace 1 ('large', 1,000 points)" in caplog.text
+    assert "Not converting trace 2 ('stacked')" in caplog.text
+
+
+def test_promote_to_webgl_below_threshold():
+    fig = large_plot()
+    assert apc.plotly.promote_to_webgl(fig) == []
+    assert all(type(trace) is not go.Scattergl for trace in fig.data)
+
+
+def test_style_plot_webgl_threshold():
+    fig = large_plot()
+    apc.plotly.style_plot(fig, monospaced_axes="y", webgl_threshold=100)
+    assert isinstance(fig.data[1], go.Scattergl)
+
+    fig = large_plot()
+    apc.plotly.style_plot(fig)
+    assert isinstance(fig.data[1], go.Scatter)
+
+
+def test_export_to_html_webgl_threshold(tmp_path):
+    fig = large_plot()
+    apc.plotly.export_to_html(fig, str(tmp_path / "plot.html"), webgl_threshold=100)
+    html = (tmp_path / "plot.html").read_text()
+    assert '"type":"scattergl"' in html
+    assert isinstance(fig.data[1], go.Scattergl)
+
+
+def test_save_figure_with_webgl_traces(tmp_path, monkeypatch):
+    exported_figures = []
+
+    def write_image(fig, filepath, **kwargs):
+        exported_figures.append(fig)
+        open(filepath, "wb").close()
+
+    monkeypatch.setattr(go.Figure, "write_image", write_image)
+    fig = large_plot()
+    apc.plotly.style_plot(fig, webgl_threshold=100)
+    apc.plotly.save_figure(fig, str(tmp_path / "plot.png"), "full_wide")
+
+    (exported,) = exported_figures
+    assert isinstance(exported.data[1], go.Scattergl)
+    assert exported.layout.margin.l == 0
+
+
+@pytest.mark.parametrize("threshold", [0, 10])
+def test_promote_to_webgl_keeps_trace_order(threshold):
+    fig = large_plot()
+    apc.plotly.promote_to_webgl(fig, threshold=threshold)
+    assert [trace.name for trace in fig.data] == ["small", "large", "stacked", "histogram"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from arcadia_pycolor.sketch import QuantileSketch
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.random.default_rng(0).lognormal(size=100_000),
+        np.random.default_rng(1).normal(size=100_000),
+        np.random.default_rng(2).uniform(-1e6, 1e3, size=100_000),
+    ],
+)
+def test_quantile_relative_accuracy(values):
+    sketch = QuantileSketch(relative_accuracy=0.01).update(values)
+    q = np.linspace(0, 1, 101)
+    expected = np.quantile(values, q, method="lower")
+    estimated = sketch.quantile(q)
+
+    assert sketch.count == len(values)
+    assert estimated.shape == q.shape
+    np.testing.assert_allclose(estimated, expected, rtol=0.0101)
+    assert estimated[0] == values.min()
+    assert estimated[-1] == values.max()
+
+
+def test_quantile_zeros_and_scalar():
+    sketch = QuantileSketch().update([0, 0, 0, 5])
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1) == 5
+
+
+def test_update_ignores_non_finite_and_masked_values():
+    sketch = QuantileSketch().update([1.0, np.nan, np.inf, -np.inf])
+    sketch.update(np.ma.masked_array([2.0, 1000.0], mask=[False, True]))
+    assert sketch.count == 2
+    assert sketch.max == 2
+
+
+def test_merge_matches_single_sketch():
+    values = np.random.default_rng(0).normal(size=10_000)
+    merged = QuantileSketch.from_chunks(np.array_split(values, 3)[:1])
+    merged.merge(QuantileSketch.from_chunks(np.array_split(values, 3)[1:]))
+    single = QuantileSketch().update(values)
+
+    q = np.linspace(0, 1, 11)
+    np.testing.assert_array_equal(merged.quantile(q), single.quantile(q))
+    assert merged.count == single.count
+
+    with pytest.raises(ValueError, match="same relative accuracy"):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_invalid_sketches():
+    with pytest.raises(ValueError):
+        QuantileSketch(relative_accuracy=0)
+    with pytest.raises(ValueError, match="empty"):
+        QuantileSketch().quantile(0.5)
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        QuantileSketch().update([1, 2]).quantile(1.5)
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import arcadia_pycolor as apc
+from arcadia_pycolor import tile_pyramid
+from arcadia_pycolor.norms import LinearNorm
+from arcadia_pycolor.tile_pyramid import _block_mean, _level_shapes, export_tile_pyramid
+
+
+def test_level_shapes():
+    assert _level_shapes(5, 3) == [(1, 1), (2, 1), (3, 2), (5, 3)]
+    assert _level_shapes(1, 1) == [(1, 1)]
+
+
+def test_block_mean():
+    values = np.array([[1, 3, 5], [np.nan, 2, 7], [4, 4, np.nan]])
+    np.testing.assert_allclose(_block_mean(values), [[2, 6], [4, np.nan]])
+
+
+@pytest.mark.parametrize("tile_format", ["png", "webp"])
+def test_export_tile_pyramid(tmp_path, monkeypatch, tile_format):
+    # Keep every level but the smallest ones in temporary memmaps.
+    monkeypatch.setattr(tile_pyramid, "IN_MEMORY_ELEMENTS", 16)
+    values = np.arange(40 * 70, dtype=np.float64).reshape(40, 70)
+    gradient = apc.gradients.viridis
+    manifest = export_tile_pyramid(
+        values, gradient, tmp_path, tile_size=32, tile_format=tile_format, workers=2
+    )
+
+    assert manifest["norm"] == {"type": "LinearNorm", "vmin": 0, "vmax": 40 * 70 - 1}
+    assert json.loads((tmp_path / "image.json").read_text()) == manifest
+    assert 'TileSize="32"' in (tmp_path / "image.dzi").read_text()
+    assert [level["width"] for level in manifest["levels"]] == [1, 2, 3, 5, 9, 18, 35, 70]
+    assert manifest["levels"][-1] == {
+        "level": 7,
+        "width": 70,
+        "height": 40,
+        "columns": 3,
+        "rows": 2,
+    }
+
+    # The full-resolution tiles are the mapped values.
+    norm = LinearNorm(0, 40 * 70 - 1)
+    with Image.open(tmp_path / "image_files" / "7" / f"2_1.{tile_format}") as image:
+        np.testing.assert_array_equal(
+            np.asarray(image.convert("RGBA")), gradient.map_array(values[32:, 64:], norm=norm)
+        )
+    # Lower levels are block means mapped with the same norm.
+    with Image.open(tmp_path / "image_files" / "6" / f"0_0.{tile_format}") as image:
+        expected = gradient.map_array(_block_mean(values)[:20, :32], norm=norm)
+        np.testing.assert_array_equal(np.asarray(image.convert("RGBA")), expected)
+    with Image.open(tmp_path / "image_files" / "0" / f"0_0.{tile_format}") as image:
+        assert image.size == (1, 1)
+
+
+def test_export_tile_pyramid_ignores_masked_values(tmp_path):
+    values = np.ma.masked_array([[0.0, 100.0], [1.0, 1.0]], mask=[[False, True], [False, False]])
+    manifest = export_tile_pyramid(values, apc.gradients.viridis, tmp_path)
+    assert manifest["norm"]["vmax"] == 1
+    with Image.open(tmp_path / "image_files" / "1" / "0_0.png") as image:
+        assert np.asarray(image.convert("RGBA"))[0, 1, 3] == 0
+    with Image.open(tmp_path / "image_files" / "0" / "0_0.png") as image:
+        expected = apc.gradients.viridis.map_array(np.array([2 / 3]), 0, 1)[0]
+        np.testing.assert_array_equal(np.asarray(image.convert("RGBA"))[0, 0], expected)
+
+
+def test_export_tile_pyramid_invalid(tmp_path):
+    with pytest.raises(ValueError, match="2D"):
+        export_tile_pyramid(np.zeros(5), apc.gradients.viridis, tmp_path)
+    with pytest.raises(ValueError, match="tile_format"):
+        export_tile_pyramid(np.zeros((5, 5)), apc.gradients.viridis, tmp_path, tile_format="gif")
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import arcadia_pycolor as apc
+from arcadia_pycolor.uniformity import pinned_anchor_indices, quality_reports, smooth_steps
+
+
+def test_pinned_anchor_indices():
+    # Endpoints, the lightness peak, and both anchors of the sharp transition are pinned.
+    lightness = [10, 20, 90, 80, 70, 60, 30]
+    values = [0, 0.2, 0.4, 0.6, 0.6, 0.8, 1]
+    np.testing.assert_array_equal(pinned_anchor_indices(lightness, values), [0, 2, 3, 4, 6])
+
+
+def test_smooth_steps():
+    positions = np.linspace(0, 1, 11)
+    keep = smooth_steps(positions, [0, 0.55, 0.55 + 1e-10, 1])
+    assert keep.tolist() == [True] * 5 + [False] + [True] * 4
+    assert smooth_steps(positions, [0, 0.5, 1]).all()
+
+
+def test_quality_reports_all_gradients():
+    reports = quality_reports()
+    assert [report.name for report in reports] == [g.name for g in apc.gradients.all_gradients]
+    for report in reports:
+        assert set(report.cvd) == {"d", "p", "t"}
+        assert 0 <= report.normal.min_lightness <= report.normal.max_lightness <= 100
+
+
+def test_quality_reports_workers():
+    gradients = apc.gradients.all_gradients[:5]
+    assert quality_reports(gradients, steps=64, workers=2) == quality_reports(
+        gradients, steps=64, workers=1
+    )
+
+
+def test_quality_reports_without_cvd():
+    (report,) = quality_reports([apc.gradients.viridis], cvd=False)
+    assert report.cvd == {}
+
+
+@pytest.mark.parametrize("kwargs", [{"steps": 1}, {"workers": 0}])
+def test_quality_reports_invalid(kwargs):
+    with pytest.raises(ValueError):
+        quality_reports([apc.gradients.viridis], **kwargs)
@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from arcadia_pycolor.utils import distribute_values
+from arcadia_pycolor.utils import chunked_min_max, distribute_values, iter_chunk_slices
 
 
 @pytest.mark.parametrize(
@@ -16,3 +17,17 @@ from arcadia_pycolor.utils import distribute_values
 )
 def test_distribute_values(n, min_val, max_val, expected):
     assert distribute_values(n, min_val, max_val) == expected
+
+
+def test_iter_chunk_slices():
+    assert list(iter_chunk_slices(5, 2)) == [slice(0, 2), slice(2, 4), slice(4, 5)]
+    assert list(iter_chunk_slices(0, 2)) == []
+    with pytest.raises(ValueError):
+        list(iter_chunk_slices(5, 0))
+
+
+def test_chunked_min_max():
+    chunks = [np.array([np.nan, 3.0]), np.array([]), np.array([[-1.0, np.inf]])]
+    assert chunked_min_max(chunks) == (-1.0, 3.0)
+    with pytest.raises(ValueError):
+        chunked_min_max([np.array([np.nan])])
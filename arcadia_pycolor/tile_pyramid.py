@@ -0,0 +1,260 @@
+import json
+import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+from arcadia_pycolor.gradient import DEFAULT_CHUNK_ELEMENTS, Gradient
+from arcadia_pycolor.norms import LinearNorm, Norm
+from arcadia_pycolor.utils import iter_chunk_slices
+
+# The version of the format of the manifest.
+MANIFEST_VERSION = 1
+
+# The image formats in which tiles can be written.
+TILE_FORMATS = ("png", "webp")
+
+# The default width and height of the tiles, which is the default of most deep-zoom viewers.
+DEFAULT_TILE_SIZE = 256
+
+# The width and height of the blocks of the output that are downsampled at once.
+DOWNSAMPLE_BLOCK_SIZE = 512
+
+# Levels with more values than this are kept in temporary memmaps instead of in memory.
+IN_MEMORY_ELEMENTS = 1 << 24
+
+
+def _level_shapes(height: int, width: int) -> list[tuple[int, int]]:
+    """Returns the shape of each level of a pyramid, from 1 x 1 to the full resolution.
+
+    As in Deep Zoom, each level is half the size of the next one, rounded up.
+    """
+    num_levels = math.ceil(math.log2(max(height, width, 1))) + 1
+    return [
+        (
+            math.ceil(height / 2 ** (num_levels - 1 - level)),
+            math.ceil(width / 2 ** (num_levels - 1 - level)),
+        )
+        for level in range(num_levels)
+    ]
+
+
+def _block_mean(values: NDArray) -> NDArray[np.float32]:
+    """Returns the mean of the finite values in each 2 x 2 block of a 2D array.
+
+    Arrays with an odd number of rows or columns are padded with NaN, so the blocks at the
+    edges average fewer values. Blocks without finite values are NaN.
+    """
+    values = np.ma.filled(np.ma.asarray(values, dtype=np.float32), np.nan)
+    height, width = values.shape
+    padded = np.full((height + height % 2, width + width % 2), np.nan, dtype=np.float32)
+    padded[:height, :width] = values
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+
+    is_finite = np.isfinite(blocks)
+    counts = is_finite.sum(axis=(1, 3), dtype=np.float32)
+    sums = np.where(is_finite, blocks, 0).sum(axis=(1, 3), dtype=np.float32)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _downsample(source: Any, target: NDArray[np.float32], block_size: int, workers: int) -> None:
+    """Writes the block mean of `source` into `target`, one block of the target at a time."""
+    blocks = [
+        (rows, cols)
+        for rows in iter_chunk_slices(target.shape[0], block_size)
+        for cols in iter_chunk_slices(target.shape[1], block_size)
+    ]
+
+    def downsample_block(block: tuple[slice, slice]) -> None:
+        rows, cols = block
+        source_rows = slice(2 * rows.start, min(2 * rows.stop, source.shape[0]))
+        source_cols = slice(2 * cols.start, min(2 * cols.stop, source.shape[1]))
+        target[rows, cols] = _block_mean(source[source_rows, source_cols])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(downsample_block, blocks):
+            pass
+
+
+def _write_tile(
+    values: Any,
+    gradient: Gradient,
+    norm: Norm,
+    filepath: Path,
+    tile_format: str,
+) -> None:
+    """Maps the values of a tile through the gradient and writes them as an RGBA image."""
+    rgba = gradient.map_array(values, norm=norm)
+    image = Image.fromarray(rgba, mode="RGBA")
+    if tile_format == "webp":
+        image.save(filepath, format="WEBP", lossless=True)
+    else:
+        image.save(filepath, format="PNG")
+
+
+def _write_dzi(filepath: Path, height: int, width: int, tile_size: int, tile_format: str) -> None:
+    """Writes a Deep Zoom descriptor, which viewers such as OpenSeadragon can open."""
+    filepath.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+        f'Format="{tile_format}" Overlap="0" TileSize="{tile_size}">\n'
+        f'  <Size Height="{height}" Width="{width}"/>\n'
+        "</Image>\n"
+    )
+
+
+def export_tile_pyramid(
+    values: Any,
+    gradient: Gradient,
+    output_dir: str | Path,
+    norm: Norm | None = None,
+    name: str = "image",
+    tile_size: int = DEFAULT_TILE_SIZE,
+    tile_format: str = "png",
+    workers: int = 1,
+    scratch_dir: str | Path | None = None,
+) -> dict[str, Any]:
+    """Exports a 2D array as a pyramid of gradient-mapped tiles for deep-zoom web viewers.
+
+    The full-resolution level is tiled directly from `values`, which can be a memmap
+    that is larger than memory. Each lower level is the block mean of the level above it,
+    computed block by block from that level rather than from the full-resolution array, and
+    levels too large to hold in memory are kept in temporary memmaps. NaN and masked values
+    are ignored by the means. Every level is mapped with the same norm and gradient,
+    so colors are consistent across zoom levels, and memory use is bounded by the tile and
+    block sizes rather than by the size of the array.
+
+    The tiles follow the Deep Zoom layout: `<output_dir>/<name>_files/<level>/<column>_<row>`,
+    where level 0 is a single pixel and the last level is the full resolution. A Deep Zoom
+    descriptor `<name>.dzi` and a JSON manifest `<name>.json`, which also records the
+    gradient and the range of the norm, are written next to them.
+
+    Example:
+    >>> import numpy as np
+    >>> import arcadia_pycolor as apc
+    >>> contacts = np.load("hic.npy", mmap_mode="r")
+    >>> sketch = apc.sketch.QuantileSketch.from_chunks(contacts[i : i + 1000] for i in ...)
+    >>> norm = apc.norms.PercentileNorm(sketch, upper=99.5)
+    >>> apc.tile_pyramid.export_tile_pyramid(
+    ...     contacts, apc.gradients.reds.reverse(), "tiles", norm=norm, workers=4
+    ... )
+
+    Args:
+        values: The 2D array to export, which may be a masked array or a memmap.
+        gradient (Gradient): The gradient that values are mapped through.
+        output_dir (str or Path): The directory to write the tiles into.
+            It is created if it doesn't exist.
+        norm (Norm, optional): A norm from `arcadia_pycolor.norms` that maps values to
+            positions along the gradient. If None or if it has no range, it is scaled to
+            the range of the finite values, computed in a first pass over `values`.
+        name (str): The name of the descriptor, the manifest, and the tile directory.
+        tile_size (int): The width and height of the tiles in pixels.
+        tile_format (str): The format of the tiles, 'png' or 'webp' (lossless).
+        workers (int): The number of threads that downsample blocks and write tiles.
+        scratch_dir (str or Path, optional): The directory in which to create the temporary
+            memmaps of large levels. If None, the system's temporary directory is used.
+
+    Returns:
+        dict: The manifest.
+
+    Raises:
+        ValueError: If `values` is not 2D or is empty, or if `tile_size`,
+            `tile_format`, or `workers` is invalid.
+    """
+    if len(values.shape) != 2 or 0 in values.shape:
+        raise ValueError(f"values must be a non-empty 2D array, got shape {values.shape}.")
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive.")
+    if tile_format not in TILE_FORMATS:
+        raise ValueError(
+            f"Invalid tile_format '{tile_format}'. Choose from {', '.join(TILE_FORMATS)}."
+        )
+    if workers < 1:
+        raise ValueError("workers must be positive.")
+
+    height, width = values.shape
+    norm = LinearNorm() if norm is None else norm
+    if not norm.scaled:
+        chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // width)
+        norm.autoscale_chunks(values[rows] for rows in iter_chunk_slices(height, chunk_size))
+    norm.validate()
+
+    output_dir = Path(output_dir)
+    tiles_dir = output_dir / f"{name}_files"
+    level_shapes = _level_shapes(height, width)
+
+    with (
+        tempfile.TemporaryDirectory(dir=scratch_dir) as tmp_dir,
+        ThreadPoolExecutor(max_workers=workers) as executor,
+    ):
+        level_values = values
+        levels: list[dict[str, int]] = []
+        for level in reversed(range(len(level_shapes))):
+            level_height, level_width = level_shapes[level]
+            if level < len(level_shapes) - 1:
+                # Each level is downsampled from the level above it.
+                source = level_values
+                if level_height * level_width > IN_MEMORY_ELEMENTS:
+                    level_values = np.lib.format.open_memmap(
+                        Path(tmp_dir) / f"{level}.npy",
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=(level_height, level_width),
+                    )
+                else:
+                    level_values = np.empty((level_height, level_width), dtype=np.float32)
+                _downsample(source, level_values, DOWNSAMPLE_BLOCK_SIZE, workers)
+
+            level_dir = tiles_dir / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            row_slices = list(iter_chunk_slices(level_height, tile_size))
+            col_slices = list(iter_chunk_slices(level_width, tile_size))
+            futures = [
+                executor.submit(
+                    _write_tile,
+                    level_values[rows, cols],
+                    gradient,
+                    norm,
+                    level_dir / f"{column}_{row}.{tile_format}",
+                    tile_format,
+                )
+                for row, rows in enumerate(row_slices)
+                for column, cols in enumerate(col_slices)
+            ]
+            for future in futures:
+                future.result()
+
+            levels.append(
+                {
+                    "level": level,
+                    "width": level_width,
+                    "height": level_height,
+                    "columns": len(col_slices),
+                    "rows": len(row_slices),
+                }
+            )
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "width": width,
+        "height": height,
+        "tile_size": tile_size,
+        "format": tile_format,
+        "tile_path": f"{name}_files/{{level}}/{{column}}_{{row}}.{tile_format}",
+        "gradient": gradient.name,
+        "norm": {
+            "type": type(norm).__name__,
+            "vmin": float(norm.vmin),  # type: ignore
+            "vmax": float(norm.vmax),  # type: ignore
+        },
+        "levels": levels[::-1],
+    }
+    (output_dir / f"{name}.json").write_text(json.dumps(manifest, indent=2))
+    _write_dzi(output_dir / f"{name}.dzi", height, width, tile_size, tile_format)
+    return manifest
@@ -0,0 +1,411 @@
+from __future__ import annotations
+import os
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from arcadia_pycolor import colorspace
+
+if TYPE_CHECKING:
+    from arcadia_pycolor.gradient import Gradient
+
+# The default weight of the lightness error, relative to the step variation, when optimizing.
+DEFAULT_LIGHTNESS_WEIGHT = 0.5
+
+# Segments between anchors that are at most this wide are sharp transitions.
+SHARP_TRANSITION_WIDTH = 1e-9
+
+# Changes in lightness (J') smaller than this between consecutive samples are ignored
+# when counting changes of direction, since they are not perceptible.
+LIGHTNESS_TOLERANCE = 0.01
+
+
+@dataclass(frozen=True)
+class UniformityMetrics:
+    """Measures how perceptually uniform a gradient is. Smaller values are more uniform.
+
+    The lightness of a gradient should change linearly between its endpoints and any anchors
+    where the lightness changes direction (such as the center of a diverging gradient), and
+    the perceived color difference between evenly spaced samples should be constant.
+
+    Attributes:
+        lightness_error (float): The root-mean-square deviation of the lightness (J') from
+            the piecewise-linear target, relative to the lightness range of the anchors.
+        step_variation (float): The coefficient of variation of the CAM02-UCS color
+            differences between consecutive, evenly spaced samples.
+    """
+
+    lightness_error: float
+    step_variation: float
+
+    def objective(self, lightness_weight: float = DEFAULT_LIGHTNESS_WEIGHT) -> float:
+        """Returns the weighted sum of the metrics that `Gradient.optimize_uniformity` minimizes."""
+        return (
+            lightness_weight * self.lightness_error + (1 - lightness_weight) * self.step_variation
+        )
+
+
+@dataclass(frozen=True)
+class UniformityOptimization:
+    """The result of `Gradient.optimize_uniformity`.
+
+    Attributes:
+        gradient (Gradient): The optimized gradient.
+        before (UniformityMetrics): The metrics of the original gradient.
+        after (UniformityMetrics): The metrics of the optimized gradient.
+    """
+
+    gradient: Gradient
+    before: UniformityMetrics
+    after: UniformityMetrics
+
+
+def pinned_anchor_indices(lightness: NDArray, values: NDArray) -> NDArray[np.intp]:
+    """Returns the indices of the anchors whose positions must not move.
+
+    These are the endpoints, the anchors where the lightness changes direction,
+    and the anchors at both ends of a sharp transition (two anchors at the same position).
+    """
+    lightness = np.asarray(lightness, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    is_pinned = np.zeros(len(values), dtype=bool)
+    is_pinned[[0, -1]] = True
+
+    lightness_steps = np.diff(lightness)
+    is_pinned[1:-1] |= lightness_steps[:-1] * lightness_steps[1:] < 0
+
+    # Duplicate anchor values may have been nudged apart by a negligible epsilon.
+    is_sharp = np.diff(values) <= SHARP_TRANSITION_WIDTH
+    is_pinned[:-1] |= is_sharp
+    is_pinned[1:] |= is_sharp
+    return np.flatnonzero(is_pinned)
+
+
+def smooth_steps(positions: NDArray, anchor_values: NDArray) -> NDArray[np.bool_]:
+    """Returns which steps between consecutive sample positions don't cross a sharp transition.
+
+    The color difference across a sharp transition is intentional, so it is excluded from the
+    step variation.
+    """
+    anchor_values = np.asarray(anchor_values, dtype=np.float64)
+    is_sharp = np.diff(anchor_values) <= SHARP_TRANSITION_WIDTH
+    keep = np.ones(len(positions) - 1, dtype=bool)
+    for start, end in zip(anchor_values[:-1][is_sharp], anchor_values[1:][is_sharp], strict=True):
+        keep &= (positions[:-1] > end) | (positions[1:] < start)
+    return keep
+
+
+def lightness_scale(anchor_lightness: NDArray) -> float:
+    """Returns the lightness range used to normalize lightness errors, which is at least 1."""
+    return max(float(np.ptp(anchor_lightness)), 1.0)
+
+
+def evaluate(
+    cam02ucs: NDArray,
+    positions: NDArray,
+    pinned_values: NDArray,
+    pinned_lightness: NDArray,
+    lightness_scale: float,
+    step_mask: NDArray[np.bool_] | None = None,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Returns the lightness errors and step variations of batches of sampled gradients.
+
+    Args:
+        cam02ucs (NDArray): The CAM02-UCS coordinates of the samples, with shape (..., T, 3).
+        positions (NDArray): The positions of the T samples, evenly spaced from 0 to 1.
+        pinned_values (NDArray): The positions of the pinned anchors, with shape (..., P).
+        pinned_lightness (NDArray): The lightness of the pinned anchors, with shape (P,).
+        lightness_scale (float): The lightness range that lightness errors are relative to.
+        step_mask (NDArray, optional): Which of the T - 1 steps to include in the step variation.
+
+    Returns:
+        The lightness errors and step variations, each with shape (...).
+    """
+    pinned_values = np.asarray(pinned_values, dtype=np.float64)
+    flat_values = pinned_values.reshape(-1, pinned_values.shape[-1])
+    target = np.stack([np.interp(positions, values, pinned_lightness) for values in flat_values])
+    target = target.reshape((*pinned_values.shape[:-1], len(positions)))
+
+    lightness_error = np.sqrt(np.mean((cam02ucs[..., 0] - target) ** 2, axis=-1)) / lightness_scale
+    steps = np.linalg.norm(np.diff(cam02ucs, axis=-2), axis=-1)
+    if step_mask is not None:
+        steps = steps[..., step_mask]
+    step_variation = np.std(steps, axis=-1) / np.maximum(np.mean(steps, axis=-1), 1e-12)
+    return lightness_error, step_variation
+
+
+def _sample_segments(
+    segment_cam02ucs: NDArray, anchor_values: NDArray, positions: NDArray
+) -> NDArray[np.float64]:
+    """Samples gradients with the same segments but different anchor positions.
+
+    Args:
+        segment_cam02ucs (NDArray): The CAM02-UCS coordinates of each of the K segments between
+            anchors, densely sampled at M evenly spaced points, with shape (K, M, 3).
+        anchor_values (NDArray): The candidate anchor positions, with shape (C, K + 1).
+        positions (NDArray): The T positions to sample.
+
+    Returns:
+        NDArray: The sampled coordinates, with shape (C, T, 3).
+    """
+    num_segments, num_points, _ = segment_cam02ucs.shape
+    # The segment of each sample is the number of interior anchors at or before it.
+    segments = np.sum(
+        positions[np.newaxis, :, np.newaxis] >= anchor_values[:, np.newaxis, 1:-1], -1
+    )
+    starts = np.take_along_axis(anchor_values, segments, axis=-1)
+    widths = np.take_along_axis(np.diff(anchor_values, axis=-1), segments, axis=-1)
+    fractions = np.clip((positions - starts) / np.maximum(widths, 1e-12), 0, 1)
+
+    points = fractions * (num_points - 1)
+    lower_points = np.minimum(points.astype(np.intp), num_points - 2)
+    weights = (points - lower_points)[..., np.newaxis]
+    lower = segment_cam02ucs[segments, lower_points]
+    upper = segment_cam02ucs[segments, lower_points + 1]
+    return lower * (1 - weights) + upper * weights
+
+
+def optimize_anchor_values(
+    segment_cam02ucs: NDArray,
+    anchor_values: NDArray,
+    anchor_lightness: NDArray,
+    lightness_weight: float = DEFAULT_LIGHTNESS_WEIGHT,
+    num_samples: int = 256,
+    max_iterations: int = 200,
+) -> NDArray[np.float64]:
+    """Returns anchor positions that make a gradient more perceptually uniform.
+
+    The pinned anchors (see `pinned_anchor_indices`) stay in place. The positions of the
+    other anchors are parameterized by the log-widths of the segments between pinned anchors,
+    and optimized by a compass search: each iteration evaluates moving every parameter up and
+    down by the step size in one vectorized batch, takes the best move, and halves the step
+    size if no move improves the objective. The objective is evaluated on gradients sampled
+    from `segment_cam02ucs`, so no color conversions are needed while optimizing.
+
+    Args:
+        segment_cam02ucs (NDArray): The densely sampled segments, with shape (K, M, 3).
+        anchor_values (NDArray): The current anchor positions, with shape (K + 1,).
+        anchor_lightness (NDArray): The lightness of the anchors, with shape (K + 1,).
+        lightness_weight (float): The weight of the lightness error, from 0 to 1.
+            The step variation has a weight of `1 - lightness_weight`.
+        num_samples (int): The number of evenly spaced samples to evaluate.
+        max_iterations (int): The maximum number of iterations.
+
+    Returns:
+        NDArray: The optimized anchor positions.
+    """
+    anchor_values = np.asarray(anchor_values, dtype=np.float64)
+    anchor_lightness = np.asarray(anchor_lightness, dtype=np.float64)
+    pinned = pinned_anchor_indices(anchor_lightness, anchor_values)
+    pinned_lightness = anchor_lightness[pinned]
+    scale = lightness_scale(anchor_lightness)
+    positions = np.linspace(0, 1, num_samples)
+    step_mask = smooth_steps(positions, anchor_values)
+
+    # The groups of segments between consecutive pinned anchors that contain free anchors.
+    groups = [
+        (start, end) for start, end in zip(pinned[:-1], pinned[1:], strict=True) if end - start > 1
+    ]
+    if not groups:
+        return anchor_values
+
+    widths = np.diff(anchor_values)
+    parameters = np.concatenate([np.log(widths[start:end]) for start, end in groups])
+
+    def to_anchor_values(parameters: NDArray) -> NDArray:
+        """Converts batches of log-widths with shape (C, N) to anchor positions (C, K + 1)."""
+        candidates = np.broadcast_to(anchor_values, (len(parameters), len(anchor_values))).copy()
+        offset = 0
+        for start, end in groups:
+            group_parameters = parameters[:, offset : offset + end - start]
+            offset += end - start
+            group_widths = np.exp(group_parameters - group_parameters.max(-1, keepdims=True))
+            group_widths /= group_widths.sum(-1, keepdims=True)
+            span = anchor_values[end] - anchor_values[start]
+            candidates[:, start + 1 : end] = anchor_values[start] + span * np.cumsum(
+                group_widths[:, :-1], axis=-1
+            )
+        return candidates
+
+    def objectives(parameters: NDArray) -> NDArray:
+        candidates = to_anchor_values(parameters)
+        cam02ucs = _sample_segments(segment_cam02ucs, candidates, positions)
+        lightness_error, step_variation = evaluate(
+            cam02ucs, positions, candidates[:, pinned], pinned_lightness, scale, step_mask
+        )
+        return lightness_weight * lightness_error + (1 - lightness_weight) * step_variation
+
+    # Start from the current positions or from positions proportional to the perceptual
+    # length of each segment, whichever is better.
+    arc_lengths = np.linalg.norm(np.diff(segment_cam02ucs, axis=1), axis=-1).sum(-1)
+    arc_parameters = np.concatenate(
+        [np.log(np.maximum(arc_lengths[start:end], 1e-6)) for start, end in groups]
+    )
+    starts = np.stack([parameters, arc_parameters])
+    start_objectives = objectives(starts)
+    best = int(np.argmin(start_objectives))
+    parameters, objective = starts[best], start_objectives[best]
+
+    num_parameters = len(parameters)
+    directions = np.concatenate([np.eye(num_parameters), -np.eye(num_parameters)])
+    step = 1.0
+    for _ in range(max_iterations):
+        candidates = parameters + step * directions
+        candidate_objectives = objectives(candidates)
+        best = int(np.argmin(candidate_objectives))
+        if candidate_objectives[best] < objective - 1e-12:
+            parameters, objective = candidates[best], candidate_objectives[best]
+        else:
+            step /= 2
+            if step < 1e-3:
+                break
+
+    return to_anchor_values(parameters[np.newaxis])[0]
+
+
+@dataclass(frozen=True)
+class GradientQualityMetrics:
+    """Measures of the quality of a gradient as seen with one type of color vision.
+
+    Attributes:
+        lightness_monotonicity (float): The net change in lightness divided by the total
+            change in lightness between consecutive samples. It is 1 if the lightness
+            only increases or only decreases.
+        lightness_reversals (int): The number of times the lightness changes direction,
+            such as 1 for a diverging gradient with a light or dark center.
+        step_variation (float): The coefficient of variation of the CAM02-UCS color
+            differences between consecutive samples, excluding sharp transitions.
+            It is 0 if the gradient is perceptually uniform.
+        min_lightness (float): The minimum lightness (J'), from 0 to 100.
+        max_lightness (float): The maximum lightness (J'), from 0 to 100.
+    """
+
+    lightness_monotonicity: float
+    lightness_reversals: int
+    step_variation: float
+    min_lightness: float
+    max_lightness: float
+
+
+@dataclass(frozen=True)
+class GradientQualityReport:
+    """The quality metrics of a gradient, from `Gradient.quality_report` or `quality_reports`.
+
+    Attributes:
+        name (str): The name of the gradient.
+        normal (GradientQualityMetrics): The metrics with normal color vision.
+        cvd (dict[str, GradientQualityMetrics]): The metrics with each type of color vision
+            deficiency, keyed by 'd', 'p', and 't'. Empty if CVD was not evaluated.
+    """
+
+    name: str
+    normal: GradientQualityMetrics
+    cvd: dict[str, GradientQualityMetrics] = field(default_factory=dict)
+
+
+def _quality_metrics(cam02ucs: NDArray, step_mask: NDArray[np.bool_]) -> GradientQualityMetrics:
+    """Returns the quality metrics of one sampled gradient with shape (T, 3)."""
+    lightness = cam02ucs[:, 0]
+    lightness_steps = np.diff(lightness)
+    total_change = np.abs(lightness_steps).sum()
+    monotonicity = abs(lightness_steps.sum()) / total_change if total_change > 0 else 1.0
+
+    directions = np.sign(lightness_steps[np.abs(lightness_steps) > LIGHTNESS_TOLERANCE])
+    reversals = int(np.count_nonzero(directions[1:] != directions[:-1]))
+
+    steps = np.linalg.norm(np.diff(cam02ucs, axis=0), axis=-1)[step_mask]
+    step_variation = float(np.std(steps) / max(np.mean(steps), 1e-12)) if len(steps) else 0.0
+    return GradientQualityMetrics(
+        lightness_monotonicity=float(monotonicity),
+        lightness_reversals=reversals,
+        step_variation=step_variation,
+        min_lightness=float(lightness.min()),
+        max_lightness=float(lightness.max()),
+    )
+
+
+def _quality_report_batch(
+    gradients: Sequence[Gradient], steps: int, cvd: bool, severity: float
+) -> list[GradientQualityReport]:
+    """Returns the quality reports of gradients, converting all of their samples at once."""
+    positions = np.linspace(0, 1, steps)
+    rgb1 = np.stack([gradient.sample(positions) for gradient in gradients])
+    cvd_types = list(colorspace.CVD_TYPES) if cvd else []
+    visions = [rgb1] + [colorspace.simulate_cvd(rgb1, cvd_type, severity) for cvd_type in cvd_types]
+    cam02ucs = colorspace.rgb1_to_cam02ucs(np.stack(visions, axis=1))
+
+    reports = []
+    for gradient, gradient_cam02ucs in zip(gradients, cam02ucs, strict=True):
+        step_mask = smooth_steps(positions, gradient._adjusted_anchor_values())
+        metrics = [_quality_metrics(vision, step_mask) for vision in gradient_cam02ucs]
+        reports.append(
+            GradientQualityReport(
+                name=gradient.name,
+                normal=metrics[0],
+                cvd=dict(zip(cvd_types, metrics[1:], strict=True)),
+            )
+        )
+    return reports
+
+
+def quality_reports(
+    gradients: Sequence[Gradient] | None = None,
+    steps: int = 1024,
+    cvd: bool = True,
+    severity: float = 100,
+    workers: int | None = None,
+) -> list[GradientQualityReport]:
+    """Returns the quality reports of many gradients, without plotting.
+
+    The gradients are split into one batch per worker. The samples of each batch, including
+    their simulations of color vision deficiency, are converted to CAM02-UCS in one
+    vectorized conversion, and the batches are evaluated on a thread pool. Evaluating every
+    gradient in `gradients.all_gradients` takes a fraction of a second, so this is suitable
+    for checking gradients in continuous integration.
+
+    Example:
+    >>> for report in apc.uniformity.quality_reports():
+    ...     assert report.normal.step_variation < 0.5, report.name
+
+    Args:
+        gradients (Sequence[Gradient], optional): The gradients to evaluate.
+            If None, `gradients.all_gradients` are evaluated.
+        steps (int): The number of evenly spaced samples of each gradient.
+        cvd (bool): Whether to also evaluate each type of color vision deficiency.
+        severity (float): The severity of the simulated color vision deficiency, from 0 to 100.
+        workers (int, optional): The number of threads. If None, the number of CPUs is used.
+
+    Returns:
+        list[GradientQualityReport]: The reports, in the order of the gradients.
+
+    Raises:
+        ValueError: If `steps` is less than 2 or `workers` is not positive.
+    """
+    if gradients is None:
+        from arcadia_pycolor.gradients import all_gradients
+
+        gradients = all_gradients
+    if steps < 2:
+        raise ValueError("steps must be at least 2.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be positive.")
+    if not gradients:
+        return []
+
+    num_batches = min(workers or os.cpu_count() or 1, len(gradients))
+    batches = [
+        [gradients[index] for index in batch]
+        for batch in np.array_split(np.arange(len(gradients)), num_batches)
+    ]
+    if num_batches == 1:
+        return _quality_report_batch(batches[0], steps, cvd, severity)
+
+    with ThreadPoolExecutor(max_workers=num_batches) as executor:
+        results = executor.map(
+            lambda batch: _quality_report_batch(batch, steps, cvd, severity), batches
+        )
+        return [report for batch_reports in results for report in batch_reports]
@@ -1,6 +1,7 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
 
 import numpy as np
+from numpy.typing import ArrayLike
 
 NumericSequence = Sequence[int] | Sequence[float]
 
@@ -73,3 +74,37 @@ def rescale_and_concatenate_values(list1: list[float], list2: list[float]) -> li
     rescaled_list1 = [0.5 * x for x in list1]
     rescaled_list2 = [0.5 * x + 0.5 for x in list2]
     return rescaled_list1 + rescaled_list2
+
+
+def iter_chunk_slices(length: int, chunk_size: int) -> Iterator[slice]:
+    """Yields slices that split a sequence of length `length` into chunks of `chunk_size`.
+
+    Raises:
+        ValueError: If `chunk_size` is not positive.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+    for start in range(0, length, chunk_size):
+        yield slice(start, min(start + chunk_size, length))
+
+
+def chunked_min_max(chunks: Iterable[ArrayLike]) -> tuple[float, float]:
+    """Returns the minimum and maximum of the finite values in a sequence of array chunks.
+
+    Only one chunk is held in memory at a time. Masked values are ignored.
+
+    Raises:
+        ValueError: If there are no finite values.
+    """
+    min_value = np.inf
+    max_value = -np.inf
+    for chunk in chunks:
+        chunk = np.ma.compressed(chunk)
+        finite_values = chunk[np.isfinite(chunk)]
+        if finite_values.size:
+            min_value = min(min_value, float(finite_values.min()))
+            max_value = max(max_value, float(finite_values.max()))
+
+    if min_value > max_value:
+        raise ValueError("The values must contain at least one finite value.")
+    return min_value, max_value